@@ -0,0 +1,239 @@
+"""
+Anexo consolidado montado de forma incremental.
+
+Em vez de varrer a pasta e mesclar todos os PDFs no fim (`merge_pdfs_in_folder`),
+cada extrato é acrescentado ao Anexo assim que é gerado:
+
+    anexo = AnexoIncremental("./saida_extratos/Anexo EXTRATO DB FU IP.pdf")
+    anexo.adicionar("1429240", pdf_do_extrato)
+
+- Acréscimo: usa a atualização incremental do PDF (pypdf `incremental=True`),
+  que grava só os objetos novos no fim do arquivo, sem reprocessar as seções
+  já incluídas.
+- Manifesto: um JSON ao lado do Anexo registra, para cada NS/BM, a ordem, o
+  número de páginas e o hash do PDF de origem. Reenviar o mesmo PDF não faz
+  nada.
+- Substituição: se o NS/BM já está no Anexo com outro conteúdo, só as páginas
+  daquela seção são trocadas, na mesma posição; o sumário (outline) é refeito
+  a partir do manifesto.
+- Compactação: cada acréscimo traz suas próprias fontes; `compactar()` reescreve
+  o Anexo unificando os objetos repetidos (antes de enviar ao SEI, por exemplo).
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import List, Optional
+
+from pypdf import PdfReader, PdfWriter
+from pypdf.generic import NameObject
+
+from pdf_generator import RelatorioTamanho, compact_writer, outline_title
+
+
+class AnexoError(Exception):
+    """Anexo e manifesto fora de sincronia."""
+
+
+@dataclass
+class SecaoAnexo:
+    ns: str
+    titulo: str
+    paginas: int
+    sha256: str
+    origem: str
+
+
+def _sha256(path: Path) -> str:
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for bloco in iter(lambda: f.read(1 << 16), b""):
+            h.update(bloco)
+    return h.hexdigest()
+
+
+def _titulo(ns: str) -> str:
+    """Título da seção no sumário, no formato de pdf_generator.outline_title."""
+    return outline_title({"nsbm": ns})
+
+
+class AnexoIncremental:
+    """Anexo PDF + manifesto JSON (`<anexo>.manifesto.json`)."""
+
+    def __init__(self, path: str | Path, manifesto: str | Path | None = None) -> None:
+        self.path = Path(path)
+        self.manifesto = Path(manifesto) if manifesto else self.caminho_manifesto(self.path)
+        self.secoes: List[SecaoAnexo] = []
+
+        if self.path.exists() and self.manifesto.exists():
+            dados = json.loads(self.manifesto.read_text(encoding="utf-8"))
+            self.secoes = [SecaoAnexo(**s) for s in dados.get("secoes", [])]
+            total = len(PdfReader(self.path).pages)
+            if total != sum(s.paginas for s in self.secoes):
+                raise AnexoError(
+                    f"{self.path.name} tem {total} páginas, mas o manifesto registra "
+                    f"{sum(s.paginas for s in self.secoes)}. Remova os dois para recomeçar."
+                )
+        elif self.path.exists():
+            raise AnexoError(f"{self.path.name} existe sem manifesto ({self.manifesto.name}).")
+
+    @staticmethod
+    def caminho_manifesto(path: str | Path) -> Path:
+        return Path(path).with_suffix(".manifesto.json")
+
+    @classmethod
+    def invalidar(cls, path: str | Path, manifesto: str | Path | None = None) -> None:
+        """
+        Remove o manifesto de um Anexo que vai ser regerado por fora (`generate_pdf_batch`).
+        Até o próximo `adotar`, abrir o Anexo falha ("existe sem manifesto") em vez de
+        confiar em intervalos de páginas que já não existem.
+        """
+        Path(manifesto or cls.caminho_manifesto(path)).unlink(missing_ok=True)
+
+    @classmethod
+    def adotar(cls, path: str | Path, nss: List[str], manifesto: str | Path | None = None) -> "AnexoIncremental":
+        """
+        Cria o manifesto de um Anexo gerado de uma vez (`generate_pdf_batch`),
+        usando o sumário do PDF para achar onde começa cada NS/BM. As seções
+        ficam sem hash: o próximo `adicionar` do mesmo NS/BM substitui a seção.
+
+        Um lote de um extrato só sai sem sumário: a seção é o PDF inteiro e a
+        entrada do sumário é acrescentada aqui, para os próximos `adicionar`.
+        """
+        anexo = cls.__new__(cls)
+        anexo.path = Path(path)
+        anexo.manifesto = Path(manifesto) if manifesto else cls.caminho_manifesto(anexo.path)
+
+        reader = PdfReader(anexo.path)
+        itens = [o for o in reader.outline if not isinstance(o, list)]
+        sem_sumario = not itens and len(nss) == 1
+        if sem_sumario:
+            inicios = [0, len(reader.pages)]
+        elif len(itens) == len(nss):
+            inicios = [reader.get_destination_page_number(o) for o in itens] + [len(reader.pages)]
+        else:
+            raise AnexoError(
+                f"{anexo.path.name} tem {len(itens)} seções no sumário, mas foram informados {len(nss)} NS/BM."
+            )
+
+        anexo.secoes = [
+            SecaoAnexo(str(ns), _titulo(ns), inicios[i + 1] - inicios[i], "", anexo.path.name)
+            for i, ns in enumerate(nss)
+        ]
+
+        if sem_sumario:
+            writer = PdfWriter(anexo.path, incremental=True)
+            writer.add_outline_item(anexo.secoes[0].titulo, 0)
+            anexo._gravar(writer)
+        else:
+            os.replace(anexo._gravar_manifesto(), anexo.manifesto)
+        return anexo
+
+    def __contains__(self, ns: str) -> bool:
+        return self._indice(ns) is not None
+
+    def __len__(self) -> int:
+        return len(self.secoes)
+
+    def _indice(self, ns: str) -> Optional[int]:
+        for i, s in enumerate(self.secoes):
+            if s.ns == ns:
+                return i
+        return None
+
+    def pagina_inicial(self, ns: str) -> Optional[int]:
+        """Página (base 0) onde começa a seção do NS/BM no Anexo."""
+        i = self._indice(ns)
+        return None if i is None else sum(s.paginas for s in self.secoes[:i])
+
+    def adicionar(self, ns: str, pdf: str | Path, titulo: Optional[str] = None) -> str:
+        """
+        Inclui o extrato do NS/BM no Anexo.
+
+        Retorna "incluido", "substituido" ou "inalterado" (mesmo PDF já incluído).
+        """
+        ns = str(ns)
+        pdf = Path(pdf)
+        sha = _sha256(pdf)
+        paginas = len(PdfReader(pdf).pages)
+        secao = SecaoAnexo(ns, titulo or _titulo(ns), paginas, sha, pdf.name)
+
+        i = self._indice(ns)
+        if i is None:
+            self._acrescentar(secao, pdf)
+            return "incluido"
+        if self.secoes[i].sha256 == sha:
+            return "inalterado"
+        self._substituir(i, secao, pdf)
+        return "substituido"
+
+    def _acrescentar(self, secao: SecaoAnexo, pdf: Path) -> None:
+        if self.path.exists():
+            writer = PdfWriter(self.path, incremental=True)
+        else:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            writer = PdfWriter()
+
+        inicio = len(writer.pages)
+        writer.append(pdf, import_outline=False)
+        writer.add_outline_item(secao.titulo, inicio)
+
+        self.secoes.append(secao)
+        self._gravar(writer)
+
+    def _substituir(self, i: int, secao: SecaoAnexo, pdf: Path) -> None:
+        inicio = sum(s.paginas for s in self.secoes[:i])
+        writer = PdfWriter(clone_from=self.path)
+
+        for _ in range(self.secoes[i].paginas):
+            writer.remove_page(inicio)
+        writer.merge(inicio, pdf, import_outline=False)
+
+        self.secoes[i] = secao
+
+        # Os destinos do sumário antigo apontam para páginas removidas
+        writer.root_object.pop(NameObject("/Outlines"), None)
+        pagina = 0
+        for s in self.secoes:
+            writer.add_outline_item(s.titulo, pagina)
+            pagina += s.paginas
+
+        # Já é uma reescrita completa: aproveita para remover o que ficou órfão
+        compact_writer(writer)
+        self._gravar(writer)
+
+    def compactar(self) -> RelatorioTamanho:
+        """Reescreve o Anexo sem duplicatas (fontes/recursos de cada extrato) nem histórico incremental."""
+        antes = self.path.stat().st_size
+        writer = PdfWriter(clone_from=self.path)
+        compact_writer(writer)
+        self._gravar(writer)
+        return RelatorioTamanho(self.path, antes, self.path.stat().st_size)
+
+    def _gravar(self, writer: PdfWriter) -> None:
+        # Grava em arquivos temporários e troca, para não deixar Anexo e
+        # manifesto pela metade se o processo cair no meio
+        tmp_pdf = self.path.with_name(self.path.name + ".tmp")
+        with open(tmp_pdf, "wb") as f:
+            writer.write(f)
+        tmp_man = self._gravar_manifesto()
+
+        os.replace(tmp_pdf, self.path)
+        os.replace(tmp_man, self.manifesto)
+
+    def _gravar_manifesto(self) -> Path:
+        """Grava o manifesto num arquivo temporário e devolve o caminho dele."""
+        tmp = self.manifesto.with_name(self.manifesto.name + ".tmp")
+        tmp.write_text(
+            json.dumps(
+                {"anexo": self.path.name, "secoes": [asdict(s) for s in self.secoes]},
+                ensure_ascii=False,
+                indent=2,
+            ),
+            encoding="utf-8",
+        )
+        return tmp
@@ -0,0 +1,80 @@
+"""
+Compara o mask_sensitive antigo (4 passadas de re.sub) com o MaskEngine
+(alternação única compilada) e com o modo em lote.
+
+Uso:
+    python benchmarks/bench_mask.py [--telas 4000] [--repeticoes 5]
+"""
+
+from __future__ import annotations
+
+import argparse
+import re
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from pdf_generator import mask_sensitive, mask_sensitive_batch  # noqa: E402
+
+TELA_EXEMPLO = (
+    "S58CBMMG -        SISTEMAGESTODEPESSOAS              PRODEMGE06/02/2026\n"
+    "                                                SIGP    10:20:07\n"
+    "                                         SERVIDOR:142924-0-CAP     -QOBM      -C\n"
+    "UM.REGISTRO GERAL :MG-19674285         ORGAO EMISSOR R.G.:SSP-MG       DATA EMIS\n"
+    "OR.:3471621301-41       SECAO216 ZONA :102          NUMERO CPF ........:087.617.246-02\n"
+    "246-02  NUMERO PIS/PASEP:1292809110-8DATA RECADASTRAMENTO:  /  /           CBO..\n"
+    "          NUM.BANCO / AGENCIA:341/7958   -BELO HORIZONTE-SHOPPICONTA :12725   5D\n"
+    "     PF1- HELP                                                       PF12- SAIR"
+)
+
+
+def mask_sensitive_legado(text: str) -> str:
+    """Implementação anterior, mantida só como referência de desempenho."""
+    text = re.sub(r"\b\d{3}\.\d{3}\.\d{3}-\d{2}\b", "***.***.***-**", text)
+    text = re.sub(r"\b\d{10}-\d\b", "**********-*", text)
+
+    def rg_mask(m: re.Match) -> str:
+        uf = m.group(1)
+        num = m.group(2)
+        return f"{uf}-******{num[-2:]}" if len(num) >= 2 else f"{uf}-******"
+
+    text = re.sub(r"\b([A-Z]{1,3})-?(\d{4,10})\b", rg_mask, text)
+    text = re.sub(r"(CONTA\s*:)\s*\d+", r"\1 ****", text, flags=re.IGNORECASE)
+    return text
+
+
+def _melhor_tempo(fn, repeticoes: int) -> float:
+    melhor = float("inf")
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        fn()
+        melhor = min(melhor, time.perf_counter() - inicio)
+    return melhor
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description="Benchmark do mascaramento de telas")
+    ap.add_argument("--telas", type=int, default=4000)
+    ap.add_argument("--repeticoes", type=int, default=5)
+    args = ap.parse_args()
+
+    telas = [TELA_EXEMPLO.replace("142924", f"{i:06d}") for i in range(args.telas)]
+
+    casos = {
+        "legado (4 passadas)": lambda: [mask_sensitive_legado(t) for t in telas],
+        "MaskEngine (1 passada)": lambda: [mask_sensitive(t) for t in telas],
+        "MaskEngine lote": lambda: mask_sensitive_batch(telas),
+    }
+
+    base = None
+    print(f"{args.telas} telas, melhor de {args.repeticoes} execuções")
+    for nome, fn in casos.items():
+        t = _melhor_tempo(fn, args.repeticoes)
+        base = base or t
+        print(f"  {nome:<24} {t * 1000:8.1f} ms   {base / t:5.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,54 @@
+"""
+Compara os modos de renderização do ExtratoRenderer ("platypus" x "canvas")
+num lote de extratos sintéticos.
+
+Uso:
+    python benchmarks/bench_render.py [--extratos 300]
+"""
+
+from __future__ import annotations
+
+import argparse
+import shutil
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from corpus import gerar_corpus  # noqa: E402
+from pdf_generator import ExtratoRenderer  # noqa: E402
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description="Benchmark dos modos de renderização de extratos")
+    ap.add_argument("--extratos", type=int, default=300)
+    args = ap.parse_args()
+
+    corpus = gerar_corpus(args.extratos)
+    base = None
+
+    print(f"{args.extratos} extratos")
+    for mode in ExtratoRenderer.RENDER_MODES:
+        renderer = ExtratoRenderer(mode=mode)
+        saida = Path(tempfile.mkdtemp(prefix=f"bench_{mode}_"))
+        try:
+            inicio = time.perf_counter()
+            for i, screens in enumerate(corpus):
+                renderer.render(screens, saida, nsbm_override=str(i))
+            t = time.perf_counter() - inicio
+            tamanho = sum(f.stat().st_size for f in saida.iterdir())
+        finally:
+            shutil.rmtree(saida, ignore_errors=True)
+
+        base = base or t
+        print(
+            f"  {mode:<9} {t:7.2f} s   {args.extratos / t:7.1f} extratos/s   "
+            f"{base / t:5.2f}x   {tamanho / 1024:8.0f} KiB"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,191 @@
+"""
+Suíte de benchmarks do pdf_generator com corpus sintético (benchmarks/corpus.py).
+
+Para cada volume, mede cada etapa do pipeline:
+    mask_sensitive, format_terminal_text, extract_metadata,
+    generate_pdf_from_screens (platypus / canvas), generate_pdf_batch,
+    merge_pdfs_in_folder e export_extratos (NDJSON)
+
+- tempo: melhor de N execuções sem tracemalloc (que distorce o tempo)
+- memória: pico do tracemalloc numa execução extra da mesma etapa
+- resultado: JSON em benchmarks/resultados/ (ou --saida); com --base, compara
+  com uma execução anterior e aponta etapas mais lentas que a tolerância
+
+Uso:
+    python benchmarks/bench_suite.py [--volumes 100 1000] [--etapas mask pdf_canvas]
+                                     [--base resultados/anterior.json] [--tolerancia 0.2]
+"""
+
+from __future__ import annotations
+
+import argparse
+import io
+import json
+import os
+import platform
+import shutil
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, Dict, List
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from corpus import gerar_corpus  # noqa: E402
+from extract_export import export_extratos  # noqa: E402
+from pdf_generator import (  # noqa: E402
+    format_terminal_text,
+    generate_pdf_batch,
+    generate_pdf_from_screens,
+    mask_sensitive,
+    merge_pdfs_in_folder,
+    normalize_screen_text,
+)
+from screen_metadata import extract_metadata  # noqa: E402
+
+RESULTADOS = Path(__file__).resolve().parent / "resultados"
+
+
+def _etapas(
+    corpus: List[Dict[str, str]], tmp: Path
+) -> tuple[Dict[str, Callable[[], None]], Dict[str, Callable[[], None]]]:
+    """(etapas medidas, preparação fora da medição por etapa)"""
+    telas = [t for screens in corpus for t in screens.values()]
+    normalizadas = [normalize_screen_text(t, mask=False) for t in telas]
+    pasta_merge = tmp / "merge"
+
+    def pdfs(mode: str) -> Callable[[], None]:
+        def run():
+            saida = tmp / mode
+            shutil.rmtree(saida, ignore_errors=True)
+            for i, screens in enumerate(corpus):
+                generate_pdf_from_screens(screens, saida, nsbm_override=str(i), render_mode=mode, use_cache=False)
+        return run
+
+    def preparar_merge():
+        for i, screens in enumerate(corpus):
+            generate_pdf_from_screens(screens, pasta_merge, nsbm_override=str(i), render_mode="canvas", use_cache=False)
+
+    def merge():
+        stdout, sys.stdout = sys.stdout, io.StringIO()  # merge_pdfs_in_folder imprime cada arquivo
+        try:
+            merge_pdfs_in_folder(pasta_merge, "Anexo.pdf")
+        finally:
+            sys.stdout = stdout
+
+    etapas = {
+        "mask": lambda: [mask_sensitive(t) for t in telas],
+        "format": lambda: [format_terminal_text(t) for t in normalizadas],
+        "metadata": lambda: [extract_metadata(s) for s in corpus],
+        "pdf_platypus": pdfs("platypus"),
+        "pdf_canvas": pdfs("canvas"),
+        "batch": lambda: generate_pdf_batch(corpus, tmp / "batch.pdf"),
+        "merge": merge,
+        "export": lambda: export_extratos(corpus, tmp / "extratos.ndjson"),
+    }
+    return etapas, {"merge": preparar_merge}
+
+
+def _medir(fn: Callable[[], None], repeticoes: int) -> tuple[float, int]:
+    """Melhor tempo de `repeticoes` execuções + pico de memória de mais uma."""
+    segundos = float("inf")
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        fn()
+        segundos = min(segundos, time.perf_counter() - inicio)
+
+    tracemalloc.start()
+    try:
+        fn()
+        _, pico = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return segundos, pico
+
+
+def _comparar(resultados: List[dict], base_path: Path, tolerancia: float) -> List[str]:
+    base = json.loads(base_path.read_text(encoding="utf-8"))
+    anteriores = {(r["etapa"], r["volume"]): r for r in base["resultados"]}
+    alertas = []
+    for r in resultados:
+        b = anteriores.get((r["etapa"], r["volume"]))
+        if b and b["segundos"] > 0 and r["segundos"] > b["segundos"] * (1 + tolerancia):
+            alertas.append(
+                f"{r['etapa']} ({r['volume']}): {b['segundos']:.3f} s -> {r['segundos']:.3f} s "
+                f"(+{r['segundos'] / b['segundos'] - 1:.0%})"
+            )
+    return alertas
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description="Suíte de benchmarks do pdf_generator")
+    ap.add_argument("--volumes", type=int, nargs="+", default=[100, 1000])
+    ap.add_argument("--etapas", nargs="+", help="Subconjunto das etapas (padrão: todas)")
+    ap.add_argument("--repeticoes", type=int, default=3, help="Melhor de N execuções por etapa")
+    ap.add_argument("--seed", type=int, default=0)
+    ap.add_argument("--saida", help="Arquivo JSON de resultado (padrão: benchmarks/resultados/bench_<data>.json)")
+    ap.add_argument("--base", help="JSON de uma execução anterior para comparar")
+    ap.add_argument("--tolerancia", type=float, default=0.2, help="Lentidão aceita em relação à base (0.2 = 20%%)")
+    args = ap.parse_args()
+
+    resultados = []
+    for volume in args.volumes:
+        corpus = gerar_corpus(volume, seed=args.seed)
+        tmp = Path(tempfile.mkdtemp(prefix="bench_suite_"))
+        try:
+            etapas, preparar = _etapas(corpus, tmp)
+            for nome in args.etapas or etapas:
+                if nome not in etapas:
+                    ap.error(f"Etapa desconhecida: {nome} (use {', '.join(etapas)})")
+                if nome in preparar:
+                    preparar[nome]()
+                segundos, pico = _medir(etapas[nome], args.repeticoes)
+                r = {
+                    "etapa": nome,
+                    "volume": volume,
+                    "segundos": round(segundos, 4),
+                    "ms_por_extrato": round(segundos * 1000 / volume, 3),
+                    "pico_kib": round(pico / 1024, 1),
+                }
+                resultados.append(r)
+                print(
+                    f"  {nome:<13} {volume:>6} extratos  {segundos:8.3f} s  "
+                    f"{r['ms_por_extrato']:8.3f} ms/extrato  {r['pico_kib']:10.1f} KiB pico"
+                )
+        finally:
+            shutil.rmtree(tmp, ignore_errors=True)
+
+    saida = Path(args.saida) if args.saida else RESULTADOS / f"bench_{datetime.now():%Y-%m-%d_%H-%M-%S}.json"
+    saida.parent.mkdir(parents=True, exist_ok=True)
+    saida.write_text(
+        json.dumps(
+            {
+                "gerado_em": datetime.now().isoformat(timespec="seconds"),
+                "python": platform.python_version(),
+                "plataforma": platform.platform(),
+                "cpus": os.cpu_count(),
+                "seed": args.seed,
+                "repeticoes": args.repeticoes,
+                "resultados": resultados,
+            },
+            ensure_ascii=False,
+            indent=2,
+        ),
+        encoding="utf-8",
+    )
+    print(f"Resultados: {saida}")
+
+    if args.base:
+        alertas = _comparar(resultados, Path(args.base), args.tolerancia)
+        for a in alertas:
+            print(f"  REGRESSÃO {a}")
+        if alertas:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
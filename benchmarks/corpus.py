@@ -0,0 +1,113 @@
+"""
+Corpus sintético de telas do SIGP para benchmarks.
+
+As telas seguem o layout do exemplo `telas_dict` de pdf_generator.py: o
+conteúdo de cada tela é um fluxo contínuo quebrado a cada 80 colunas e com
+as linhas sem espaços à direita, como devolvido por `tools.get_tela_atual`.
+"""
+
+from __future__ import annotations
+
+import random
+from datetime import datetime, timedelta
+from typing import Dict, List
+
+COLUNAS_TERMINAL = 80
+
+POSTOS = ["CEL", "TENCEL", "MAJ", "CAP", "1TEN", "2TEN", "SUBTEN", "1SGT", "2SGT", "3SGT", "CB"]
+NOMES = ["CLEYTON", "MARIA", "JOAO", "ANA", "PEDRO", "PAULA", "CARLOS", "JULIANA", "RAFAEL", "BRUNO"]
+SOBRENOMES = ["BATISTA", "SILVA", "SOUZA", "OLIVEIRA", "SANTOS", "PEREIRA", "COSTA", "CARMO", "JESUS"]
+UNIDADES = [
+    "000009405-DLF/SDTS2 TELECOMUNICACOES CHEFE ADJ AUX",
+    "000001203-1 BBM BELO HORIZONTE",
+    "000004410-5 COB UBERLANDIA SECAO ADM",
+]
+
+
+def _quebrar(fluxo: str, colunas: int = COLUNAS_TERMINAL) -> str:
+    """Quebra o fluxo em linhas de `colunas` e remove espaços à direita (como get_tela_atual)."""
+    linhas = [fluxo[i: i + colunas].rstrip() for i in range(0, len(fluxo), colunas)]
+    return "\n".join(linhas).lstrip("\n").rstrip()
+
+
+def _campos(rng: random.Random, base_dt: datetime) -> Dict[str, str]:
+    ns = rng.randint(100000, 999999)
+    dt = base_dt + timedelta(seconds=rng.randint(0, 86400 * 30))
+    nome = f"{rng.choice(NOMES)} {rng.choice(SOBRENOMES)} DE {rng.choice(SOBRENOMES)}"
+    return {
+        "ns": str(ns),
+        "dv": str(rng.randint(0, 9)),
+        "posto": rng.choice(POSTOS),
+        "nome": nome,
+        "unidade": rng.choice(UNIDADES),
+        "data": dt.strftime("%d/%m/%Y"),
+        "hora": dt.strftime("%H:%M:%S"),
+        "cpf": f"{rng.randint(0, 999):03d}.{rng.randint(0, 999):03d}.{rng.randint(0, 999):03d}-{rng.randint(0, 99):02d}",
+        "rg": f"MG-{rng.randint(1000000, 99999999)}",
+        "pis": f"{rng.randint(10**9, 10**10 - 1)}-{rng.randint(0, 9)}",
+        "conta": str(rng.randint(1000, 99999)),
+        "ade": f"{rng.choice([0, 10, 20, 30, 40]):>3},00",
+        "quinq": f"{rng.randint(0, 7):02d}/00",
+    }
+
+
+def _cabecalho(tela: str, c: Dict[str, str]) -> str:
+    return (
+        f"{'':>79}N"
+        f"S99CBMMG -        SISTEMAGESTODEPESSOAS              PRODEMGE{c['data']}{'':>8}"
+        f"{'':>48}SIGP    {c['hora']}{'':>16}"
+        f" {tela:<40}PESQUISA1{'':>30}"
+        f"{'':>46}SERVIDOR:{c['ns'][:6]}-{c['dv']}-{c['posto']:<6}-QOBM"
+        f"   -{c['nome']:<28}UNIDADE:{c['unidade']}"
+    )
+
+
+def gerar_telas(rng: random.Random, base_dt: datetime = datetime(2026, 2, 1)) -> Dict[str, str]:
+    """Um dicionário {"Tela IP", "Tela DB", "Tela FU", "Tela FU 2"} sintético."""
+    c = _campos(rng, base_dt)
+    rodape = f"{'':>39}PF1- HELP   PF7- PRIMEIRA TELA      PF8-TELA POSTERIOR   PF12- SAIR"
+
+    ip = (
+        _cabecalho("INFORMACAO DE PAGAMENTO", c)
+        + "             DATA INFORMACAO DE PAGAMENTO :01/12/2025PERCENTUAL CORRECAO URV :"
+        + "      PASEP EM FOLHA (S/N) ? ..... :S            IND AUX. INVALIDEZ (S/N):"
+        + "      DATA ISENTO IMPOSTO DE RENDA :  /  /    DESCONTA IPSM (S/N) ? ..:S"
+        + " DATA IMUNE CONTRIBUICAO PREV.:  /  /    PERC. DESC. IPSM........:  8,00"
+        + "IND. GRAT. TRINT. ESP. (S/N) :N            VALOR DA QUOTA .........:"
+        + f"      QUANTIDADE QUINQ. ADM/MAG  :{c['quinq']}         ADIC.TRINTENARIO (S/N) .:N"
+        + f"      CODIGO TIPO BOLETIM        :4            PERCENTUAL ADIC. DESEMP :{c['ade']}"
+        + rodape
+    )
+    db = (
+        _cabecalho("DADOS BASICOS", c)
+        + f"{'':>24}NOME SERVIDOR .....:{c['nome']}{'':>20}"
+        + "       ESTADO CIVIL ......:1SOLTEIRO             NUMERO DO CONJUGE :      -0   "
+        + f"NUM.REGISTRO GERAL :{c['rg']}         ORGAO EMISSOR R.G.:SSP-MG       "
+        + f"NUMERO CPF ........:{c['cpf']}  NUMERO PIS/PASEP:{c['pis']}DATA RECADASTRAMENTO:  /  /"
+        + rodape
+    )
+    fu = (
+        _cabecalho("DADOS BASICOS", c)
+        + f"          NUM.BANCO / AGENCIA:341/7958   -BELO HORIZONTE-SHOPPICONTA :{c['conta']}   5D"
+        + "EP. ABONO FAMILIA :                         DEP. IMPOSTO RENDA :"
+        + rodape
+    )
+    fu2 = (
+        _cabecalho("CARGOS/FUNCOES/ENCARGOS DO SERVIDOR", c)
+        + f"{'':>31}DATA DE INICIO.........: <18/04/2024>     TIPO BOLETIM NOMEACAO :4"
+        + f"{'':>20}DESC LOCAL ...............:GERENCIA DE SISTEMAS{'':>20}"
+        + f"{'':>54}ENTER- CONTINUAR PF12- MENU PRINCIPAL"
+    )
+
+    return {
+        "Tela IP": _quebrar(ip),
+        "Tela DB": _quebrar(db),
+        "Tela FU": _quebrar(fu),
+        "Tela FU 2": _quebrar(fu2),
+    }
+
+
+def gerar_corpus(quantidade: int, seed: int = 0) -> List[Dict[str, str]]:
+    """`quantidade` extratos sintéticos, reprodutíveis pela `seed`."""
+    rng = random.Random(seed)
+    return [gerar_telas(rng) for _ in range(quantidade)]
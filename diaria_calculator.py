@@ -17,16 +17,41 @@ O script:
 - Você precisa informar/fornecer a tabela de "valor-dia" por graduação (o que a planilha pega por VLOOKUP na aba DADOS).
   Você pode preencher o dicionário VALOR_DIA_POR_GRADUACAO com seus valores reais.
 - Municípios especiais: lista embutida no código (conforme relação fornecida).
+- Para muitas viagens de uma vez, `calcular_diarias_lote` faz o mesmo cálculo
+  em colunas NumPy (numpy está nas dependências do projeto, mas só é importado
+  quando o cálculo em lote é usado).
+- Valor-dia, pisos e municípios especiais vêm da tabela vigente na data de
+  início da viagem (arquivos em tabelas_diarias/, ver tabelas_diarias.py);
+  as constantes abaixo são a tabela embutida, usada quando não há arquivos
+  e para datas anteriores à primeira vigência dos arquivos.
+
+Uso:
+    python diaria_calculator.py --graduacao CAP --municipio Betim --inicio "2026-01-05 08:00" --fim "2026-01-07 18:00"
+    python diaria_calculator.py lote viagens.csv --saida resultados.csv
+    cat viagens.ndjson | python diaria_calculator.py lote - --formato ndjson
 """
 
 from __future__ import annotations
 
 import argparse
+import csv
+import itertools
+import json
+import logging
+import math
 import re
-from dataclasses import dataclass
-from datetime import datetime, timedelta
+import sys
+from contextlib import nullcontext
+from dataclasses import dataclass, field
+from datetime import date, datetime, timedelta
 from pathlib import Path
-from typing import Dict, Set, Tuple
+from typing import IO, TYPE_CHECKING, Any, Dict, Iterable, Iterator, List, Mapping, Optional, Set, Tuple
+
+from municipios import APELIDOS, IndiceMunicipios, carregar_municipios, dobrar, uf
+from tabelas_diarias import LOCALIDADES, TabelaDiarias, get_tabelas
+
+if TYPE_CHECKING:
+    import numpy as np
 
 
 # ----------------------------
@@ -104,6 +129,12 @@ MUNICIPIOS_ESPECIAIS_MG = {
     "vicosa",
 }
 
+# ----------------------------
+# Índice de municípios (MG + capitais): acentos, UF, apelidos ("BH") e erros
+# de digitação -> chave canônica. Montado uma vez; ver municipios.py
+# ----------------------------
+INDICE_MUNICIPIOS = IndiceMunicipios([*carregar_municipios(), *CAPITAIS_BR], APELIDOS)
+
 # ----------------------------
 # TABELA: valor-dia por graduação/posto (você deve preencher!)
 # Na planilha isso vem de: VLOOKUP(GRAD, DADOS!D2:F22, 3)
@@ -134,6 +165,37 @@ VALOR_DIA_POR_GRADUACAO: Dict[str, float] = {
     "CHEM": 1684.83,
 }
 
+# Tabela embutida (constantes acima), usada quando não há diretório de tabelas
+# e antes da primeira vigência dos arquivos
+TABELA_EMBUTIDA = TabelaDiarias(
+    vigencia=date.min,
+    valor_dia_por_graduacao=VALOR_DIA_POR_GRADUACAO,
+    pisos_localidade=PISOS_LOCALIDADE,
+    municipios_especiais_mg=frozenset(MUNICIPIOS_ESPECIAIS_MG),
+    descricao="Constantes de diaria_calculator",
+    origem="diaria_calculator.py",
+)
+
+
+def tabela_vigente(data: date | datetime) -> TabelaDiarias:
+    """Tabela de diárias vigente em `data` (ver tabelas_diarias.py); a embutida antes da primeira vigência."""
+    tabelas = get_tabelas()
+    if tabelas is None:
+        return TABELA_EMBUTIDA
+    try:
+        return tabelas.vigente(data)
+    except LookupError:
+        return TABELA_EMBUTIDA
+
+
+def _versoes_tabelas() -> Tuple[Tuple[date, ...], Tuple[TabelaDiarias, ...]]:
+    """(vigências, versões) com a tabela embutida cobrindo as datas anteriores à primeira versão."""
+    tabelas = get_tabelas()
+    if tabelas is None:
+        return (TABELA_EMBUTIDA.vigencia,), (TABELA_EMBUTIDA,)
+    vigencias, versoes = tabelas.versoes()
+    return (TABELA_EMBUTIDA.vigencia, *vigencias), (TABELA_EMBUTIDA, *versoes)
+
 
 # ----------------------------
 # Utilidades
@@ -170,8 +232,16 @@ def classificar_destino(municipio: str, outro_estado: bool, especiais_mg: Set[st
     - Se NÃO está em especiais e NÃO está em capitais e outro_estado == True  => Município Especial
     - Se está em capitais => Capital
     - Senão => Município Especial
+
+    O nome é resolvido pelo INDICE_MUNICIPIOS ("Uberlândia", "BH",
+    "Teofilo Otôni/MG"); se não for reconhecido, vale o nome sem acentos.
+    UF diferente de MG no nome ("Mariana/SP") conta como outro estado, mesmo
+    com outro_estado=False: o índice ignora a UF e acharia o município de MG.
     """
-    m = norm(municipio)
+    estado = uf(municipio)
+    if estado is not None and estado != "MG":
+        outro_estado = True
+    m = INDICE_MUNICIPIOS.resolver(municipio) or dobrar(municipio)
     in_especiais = m in especiais_mg
     in_capitais = m in CAPITAIS_BR
 
@@ -256,7 +326,13 @@ def calc_h(tipo_trintenario: str, g: float) -> float:
 # ----------------------------
 # Valor unitário K e Total - réplica da planilha
 # ----------------------------
-def calcular_k(graduacao: str, localidade: str, h: float, valor_dia_por_grad: Dict[str, float]) -> float:
+def calcular_k(
+    graduacao: str,
+    localidade: str,
+    h: float,
+    valor_dia_por_grad: Dict[str, float],
+    pisos_localidade: Dict[str, float] | None = None,
+) -> float:
     grad = norm_grad_key(graduacao)
     if grad not in valor_dia_por_grad:
         raise KeyError(
@@ -265,7 +341,7 @@ def calcular_k(graduacao: str, localidade: str, h: float, valor_dia_por_grad: Di
         )
     valor_dia = float(valor_dia_por_grad[grad])
     j = round(h * valor_dia, 2)
-    piso = float(PISOS_LOCALIDADE[localidade])
+    piso = float((pisos_localidade or PISOS_LOCALIDADE)[localidade])
     return round(max(piso, j), 2)
 
 
@@ -308,19 +384,16 @@ def calcular_diarias(
     ajuda_custo: float = 74.98,
     valor_dia_por_graduacao: Dict[str, float] | None = None,
     municipios_especiais_mg: Set[str] | None = None,
+    pisos_localidade: Dict[str, float] | None = None,
 ) -> Resultado:
     """Calcula diárias replicando a planilha.
 
     Parâmetros equivalentes aos do CLI.
     - `inicio` e `fim` podem ser `datetime` ou string no formato `YYYY-MM-DD HH:MM`.
-    - `valor_dia_por_graduacao` e `municipios_especiais_mg` permitem sobrescrever tabelas.
+    - `valor_dia_por_graduacao`, `municipios_especiais_mg` e `pisos_localidade`
+      permitem sobrescrever tabelas; as omitidas vêm da tabela vigente em `inicio`.
     """
 
-    if valor_dia_por_graduacao is None:
-        valor_dia_por_graduacao = VALOR_DIA_POR_GRADUACAO
-    if municipios_especiais_mg is None:
-        municipios_especiais_mg = MUNICIPIOS_ESPECIAIS_MG
-
     if isinstance(inicio, str):
         inicio_dt = parse_dt(inicio)
     else:
@@ -330,6 +403,15 @@ def calcular_diarias(
     else:
         fim_dt = fim
 
+    if valor_dia_por_graduacao is None or municipios_especiais_mg is None or pisos_localidade is None:
+        tabela = tabela_vigente(inicio_dt)
+        if valor_dia_por_graduacao is None:
+            valor_dia_por_graduacao = tabela.valor_dia_por_graduacao
+        if municipios_especiais_mg is None:
+            municipios_especiais_mg = tabela.municipios_especiais_mg
+        if pisos_localidade is None:
+            pisos_localidade = tabela.pisos_localidade
+
     localidade = classificar_destino(municipio, bool(outro_estado), municipios_especiais_mg)
 
     di, pa = calcular_di_pa_planilha(inicio_dt, fim_dt)
@@ -338,7 +420,7 @@ def calcular_diarias(
     g = calc_g(int(quinquenios), ade)
     h = calc_h(trintenario, g)
 
-    k = calcular_k(graduacao, localidade, h, valor_dia_por_graduacao)
+    k = calcular_k(graduacao, localidade, h, valor_dia_por_graduacao, pisos_localidade)
     total = calcular_total(k, l_diarias, m_pas, n_pp, float(ajuda_custo))
 
     return Resultado(
@@ -355,8 +437,541 @@ def calcular_diarias(
     )
 
 
-def main() -> None:
-    ap = argparse.ArgumentParser(description="Cálculo de diárias (réplica da planilha) - CBMMG")
+# ----------------------------
+# Cálculo em lote (colunas NumPy) - mesmos resultados de calcular_diarias
+# ----------------------------
+TRINTENARIOS: Tuple[str, ...] = ("Não", "Sim - anterior a 1ºSet07", "Sim - Posterior a 1ºSet07")
+
+
+def _numpy():
+    try:
+        import numpy
+    except ImportError as e:
+        raise ImportError("calcular_diarias_lote requer numpy (pip install -r requirements.txt)") from e
+    return numpy
+
+
+def _limiar_pa_us() -> int:
+    """
+    Menor resto (em microssegundos) que a planilha conta como PA:
+    round(resto/3600, 2) >= 6.0. O arredondamento do Python não é o mesmo
+    do NumPy perto de x,xx5, então o limiar é calculado uma vez, em inteiros.
+    """
+    def conta(us: int) -> bool:
+        return round(timedelta(microseconds=us).total_seconds() / 3600.0, 2) >= 6.0
+
+    lo, hi = 5 * 3600 * 10**6, 6 * 3600 * 10**6  # conta(lo) é falso, conta(hi) é verdadeiro
+    while hi - lo > 1:
+        meio = (lo + hi) // 2
+        if conta(meio):
+            hi = meio
+        else:
+            lo = meio
+    return hi
+
+
+_PA_LIMIAR_US = _limiar_pa_us()
+
+
+def _round2(np, x: "np.ndarray") -> "np.ndarray":
+    """round(x, 2) do Python, elemento a elemento.
+
+    O Python arredonda o valor binário exato de x (metade para o par);
+    np.round(x, 2) arredonda x*100 já com erro e diverge em valores como
+    k/2 = x,xx5. Aqui x*200 é comparado exatamente com o ponto médio 2c+1
+    (x é dividido em duas metades de 26 bits, cujos produtos por 200 são exatos).
+    """
+    c = np.floor(x * 100.0)
+    t = x * 134217729.0
+    alto = t - (t - x)
+    diff = (alto * 200.0 - (2.0 * c + 1.0)) + (x - alto) * 200.0
+    sobe = (diff > 0) | ((diff == 0) & (c % 2 == 1))
+    return (c + sobe) / 100.0
+
+
+def _codificar(np, valores: Any, tabela: Tuple[str, ...], chave, n: int) -> "np.ndarray":
+    """Códigos (índices em `tabela`) a partir de códigos inteiros ou textos; -1 se desconhecido."""
+    arr = np.asarray(valores)
+    if arr.dtype.kind in "iu":
+        codigos = arr.astype(np.intp)
+        codigos = np.where((codigos >= 0) & (codigos < len(tabela)), codigos, -1)
+    else:
+        indice = {chave(t): i for i, t in enumerate(tabela)}
+        unicos, inversos = np.unique(arr.astype(str), return_inverse=True)
+        codigos = np.array([indice.get(chave(u), -1) for u in unicos], dtype=np.intp)[inversos]
+    return np.broadcast_to(codigos.reshape(-1), (n,))
+
+
+def _indices_vigencia(np, datas: "np.ndarray") -> Tuple[Tuple[TabelaDiarias, ...], "np.ndarray"]:
+    """Versões das tabelas e o índice da vigente em cada data (-1 = nenhuma): bisect vetorizado."""
+    vigencias, versoes = _versoes_tabelas()
+    idx = np.searchsorted(np.array(vigencias, dtype="datetime64[D]"), datas.astype("datetime64[D]"), side="right") - 1
+    return versoes, idx
+
+
+def classificar_destinos(
+    municipios: Iterable[str],
+    outro_estado: Any = False,
+    municipios_especiais_mg: Set[str] | None = None,
+    datas: Any = None,
+) -> "np.ndarray":
+    """
+    Códigos de LOCALIDADES para uma coluna de municípios (cada par distinto é classificado uma vez).
+
+    Sem `municipios_especiais_mg`, vale a relação da tabela vigente em cada
+    data de `datas` (coluna de datas de início; omitida = hoje).
+    """
+    np = _numpy()
+    mun = np.array(list(municipios), dtype=str)
+    fora = np.broadcast_to(np.asarray(outro_estado, dtype=bool), mun.shape)
+    if municipios_especiais_mg is not None:
+        conjuntos, idx = [municipios_especiais_mg], np.zeros(mun.shape, dtype=np.intp)
+    else:
+        datas = np.asarray(date.today() if datas is None else datas, dtype="datetime64[us]").reshape(-1)
+        versoes, idx = _indices_vigencia(np, np.broadcast_to(datas, mun.shape))
+        conjuntos = [v.municipios_especiais_mg for v in versoes]
+        idx = np.maximum(idx, 0)  # sem tabela vigente: o erro aparece em calcular_diarias_lote
+
+    prefixo = np.char.add(idx.astype(str), np.where(fora, "|1", "|0"))
+    pares, inversos = np.unique(np.char.add(prefixo, mun), return_inverse=True)
+    codigos = []
+    for p in pares:
+        versao, resto = p.split("|", 1)
+        localidade = classificar_destino(resto[1:], resto[0] == "1", conjuntos[int(versao)])
+        codigos.append(LOCALIDADES.index(localidade))
+    return np.array(codigos, dtype=np.intp)[inversos].reshape(-1)
+
+
+@dataclass
+class ResultadoLote:
+    """Resultados de calcular_diarias_lote, em colunas (uma posição por viagem)."""
+
+    localidade: "np.ndarray"  # códigos de LOCALIDADES
+    di: "np.ndarray"
+    pa: "np.ndarray"
+    L_diarias: "np.ndarray"
+    M_pas: "np.ndarray"
+    N_pp: "np.ndarray"
+    g: "np.ndarray"
+    h: "np.ndarray"
+    k: "np.ndarray"
+    total: "np.ndarray"
+    erros: Dict[int, str] = field(default_factory=dict)  # só com estrito=False (k/total = NaN)
+
+    def __len__(self) -> int:
+        return len(self.total)
+
+    def linha(self, i: int) -> Resultado:
+        """Viagem `i` no formato de calcular_diarias."""
+        if i in self.erros:
+            raise ValueError(f"Viagem {i}: {self.erros[i]}")
+        return Resultado(
+            localidade=LOCALIDADES[int(self.localidade[i])],
+            di=int(self.di[i]),
+            pa=int(self.pa[i]),
+            L_diarias=int(self.L_diarias[i]),
+            M_pas=int(self.M_pas[i]),
+            N_pp=int(self.N_pp[i]),
+            g=float(self.g[i]),
+            h=float(self.h[i]),
+            k=float(self.k[i]),
+            total=float(self.total[i]),
+        )
+
+
+def calcular_diarias_lote(
+    *,
+    graduacao: Any,
+    localidade: Any,
+    inicio: Any,
+    fim: Any,
+    quinquenios: Any = 0,
+    ade: Any = None,
+    trintenario: Any = "Não",
+    pousada: Any = False,
+    ajuda_custo: Any = 74.98,
+    valor_dia_por_graduacao: Dict[str, float] | None = None,
+    pisos_localidade: Dict[str, float] | None = None,
+    estrito: bool = True,
+) -> ResultadoLote:
+    """Calcula diárias de várias viagens de uma vez, com operações NumPy por coluna.
+
+    Cada parâmetro é uma coluna (lista/array, uma posição por viagem) ou um
+    valor único para todas:
+    - `graduacao`: texto (como em calcular_diarias) ou código = índice em
+      valor_dia_por_graduacao (se informado) ou em VALOR_DIA_POR_GRADUACAO
+    - `localidade`: nome ou código de LOCALIDADES (ver classificar_destinos)
+    - `inicio`/`fim`: datetime64, datetime ou texto `YYYY-MM-DD HH:MM`
+    - `ade`: NaN/None = sem ADE (usa quinquênios)
+    - `trintenario`: texto ou código de TRINTENARIOS
+
+    Tabelas omitidas vêm da versão vigente na data de início de cada viagem
+    (uma busca binária vetorizada sobre as vigências). Os valores são
+    idênticos aos de calcular_diarias viagem a viagem.
+    Viagem inválida (fim <= inicio, graduação/localidade desconhecida, sem
+    tabela vigente) levanta erro com estrito=True; com estrito=False ela fica
+    em `erros` e as demais são calculadas normalmente.
+    """
+    np = _numpy()
+
+    ini = np.asarray(inicio, dtype="datetime64[us]").reshape(-1)
+    fim_ = np.asarray(fim, dtype="datetime64[us]").reshape(-1)
+    graduacao, localidade = np.asarray(graduacao), np.asarray(localidade)
+    n = max(ini.size, fim_.size, graduacao.size, localidade.size)
+    ini, fim_ = np.broadcast_to(ini, (n,)), np.broadcast_to(fim_, (n,))
+
+    # Tabelas: uma linha por versão usada, colunas por graduação / localidade
+    if valor_dia_por_graduacao is None or pisos_localidade is None:
+        versoes, versao = _indices_vigencia(np, ini)
+    else:
+        versoes, versao = (TABELA_EMBUTIDA,), np.zeros(n, dtype=np.intp)
+    valores_dia = [valor_dia_por_graduacao or v.valor_dia_por_graduacao for v in versoes]
+    pisos_versao = [pisos_localidade or v.pisos_localidade for v in versoes]
+    if valor_dia_por_graduacao is not None:
+        grads = tuple(valor_dia_por_graduacao)
+    else:
+        grads = tuple(dict.fromkeys([*VALOR_DIA_POR_GRADUACAO, *(g for t in valores_dia for g in t)]))
+    tabela_valor = np.array([[float(t.get(g, np.nan)) for g in grads] for t in valores_dia])
+    tabela_piso = np.array([[float(p[loc]) for loc in LOCALIDADES] for p in pisos_versao])
+
+    cod_grad = _codificar(np, graduacao, grads, norm_grad_key, n)
+    cod_loc = _codificar(np, localidade, LOCALIDADES, str.strip, n)
+    cod_trint = np.maximum(_codificar(np, trintenario, TRINTENARIOS, str.strip, n), 0)  # outro texto -> "Não"
+
+    # DI / PA (calcular_di_pa_planilha)
+    invalido = ~(fim_ > ini)  # também pega NaT
+    delta = np.where(invalido, 0, (fim_ - ini).astype(np.int64))
+    dias, resto = np.divmod(delta, 86400 * 10**6)
+    hora_ini = (ini - ini.astype("datetime64[D]")).astype(np.int64)
+    hora_fim = (fim_ - fim_.astype("datetime64[D]")).astype(np.int64)
+    vira_dia = hora_fim < hora_ini
+    di = dias + vira_dia
+    pa = ((~vira_dia) & (resto >= _PA_LIMIAR_US)).astype(np.int64)
+
+    # L / M / N (distribuir_quantidades)
+    n_pp = np.where(np.broadcast_to(np.asarray(pousada, dtype=bool), (n,)), di, 0)
+
+    # G / H (calc_g, calc_h)
+    quinq = np.broadcast_to(np.asarray(quinquenios).astype(np.int64).astype(float), (n,))
+    ade_ = np.broadcast_to(np.asarray(np.nan if ade is None else ade, dtype=float), (n,))
+    g = np.where(np.isnan(ade_), quinq, ade_ / 10.0)
+    h = np.select(
+        [cod_trint == 1, cod_trint == 2],
+        [(1.0 + g / 10.0) * 1.1, 1.1 + g / 10.0],
+        1.0 + g / 10.0,
+    )
+
+    # K e total (calcular_k, calcular_total)
+    sem_tabela = versao < 0
+    valor_dia = tabela_valor[np.maximum(versao, 0), np.maximum(cod_grad, 0)]
+    erros: Dict[int, str] = {}
+    falhas = [
+        (invalido, ValueError, "fim deve ser maior que inicio"),
+        (sem_tabela, LookupError, "nenhuma tabela de diárias vigente na data de início"),
+        ((cod_grad < 0) | np.isnan(valor_dia), KeyError, "graduação não encontrada na tabela VALOR_DIA_POR_GRADUACAO"),
+        (cod_loc < 0, KeyError, f"localidade inválida (use {', '.join(LOCALIDADES)})"),
+    ]
+    for mascara, erro, msg in falhas:
+        for i in np.flatnonzero(mascara):
+            if estrito:
+                raise erro(f"Viagem {i}: {msg}")
+            erros.setdefault(int(i), msg)
+    ruim = np.zeros(n, dtype=bool)
+    if erros:
+        ruim[list(erros)] = True
+
+    valor_dia = np.where(ruim, 0.0, valor_dia)
+    piso = tabela_piso[np.where(ruim, 0, versao), np.where(ruim, 0, cod_loc)]
+    k = _round2(np, np.maximum(piso, _round2(np, h * valor_dia)))
+
+    ajuda = np.broadcast_to(np.asarray(ajuda_custo, dtype=float), (n,))
+    parte_pa = _round2(np, k / 2.0 - ajuda) * pa
+    parte_di = _round2(np, k - ajuda) * di
+    parte_pp = _round2(np, k / 2.0) * n_pp
+    total = _round2(np, parte_pa + parte_di + parte_pp)
+
+    if erros:
+        di, pa, n_pp = (np.where(ruim, 0, a) for a in (di, pa, n_pp))
+        k, total = np.where(ruim, np.nan, k), np.where(ruim, np.nan, total)
+    return ResultadoLote(
+        localidade=np.where(ruim, 0, cod_loc),
+        di=di,
+        pa=pa,
+        L_diarias=di,
+        M_pas=pa,
+        N_pp=n_pp,
+        g=g,
+        h=h,
+        k=k,
+        total=total,
+        erros=erros,
+    )
+
+
+# ----------------------------
+# Lote em fluxo (CSV / NDJSON) - usado pelo subcomando "lote"
+# ----------------------------
+FORMATOS_LOTE = ("csv", "ndjson")
+CAMPOS_RESULTADO = tuple(Resultado.__dataclass_fields__)
+
+_VERDADEIRO = {"1", "true", "sim", "s", "x", "yes", "y"}
+_FALSO = {"", "0", "false", "nao", "não", "n", "no"}
+
+
+def _bool(valor: Any, campo: str) -> bool:
+    if valor is None or isinstance(valor, bool):
+        return bool(valor)
+    v = str(valor).strip().lower()
+    if v in _VERDADEIRO:
+        return True
+    if v in _FALSO:
+        return False
+    raise ValueError(f"{campo}: valor booleano inválido {valor!r}")
+
+
+_LIMITE_INT64 = 2**63 - 1
+
+
+def _numero(valor: Any, campo: str, tipo=float):
+    """Número de um campo de texto/JSON; fora do que as colunas int64/float do lote comportam é erro da linha."""
+    try:
+        n = tipo(str(valor).strip().replace(",", ".")) if isinstance(valor, str) else tipo(valor)
+    except (TypeError, ValueError, OverflowError):
+        raise ValueError(f"{campo}: número inválido {valor!r}") from None
+    if abs(n) > _LIMITE_INT64 if tipo is int else not math.isfinite(n):
+        raise ValueError(f"{campo}: número fora do intervalo aceito {valor!r}")
+    return n
+
+
+def _data_hora(valor: Any, campo: str) -> datetime:
+    if not isinstance(valor, datetime):
+        try:
+            valor = datetime.fromisoformat(str(valor).strip())  # aceita o formato de parse_dt, bem mais rápido
+        except ValueError:
+            raise ValueError(f"{campo}: data/hora inválida {valor!r} (use YYYY-MM-DD HH:MM)") from None
+    if valor.tzinfo is not None:
+        # calcular_diarias compara horários locais (sem fuso), como a planilha
+        raise ValueError(f"{campo}: data/hora com fuso horário não é aceita {valor.isoformat()!r} (use YYYY-MM-DD HH:MM)")
+    return valor
+
+
+def viagem_kwargs(registro: Mapping[str, Any]) -> Dict[str, Any]:
+    """
+    Parâmetros de calcular_diarias a partir de um registro de texto (linha de
+    CSV ou objeto JSON com os mesmos nomes). Aceita vírgula decimal e
+    sim/não/1/0 nos campos booleanos; campo vazio = valor padrão.
+    """
+    def campo(nome: str) -> Any:
+        v = registro.get(nome)
+        return None if v is None or (isinstance(v, str) and not v.strip()) else v
+
+    for obrigatorio in ("graduacao", "municipio", "inicio", "fim"):
+        if campo(obrigatorio) is None:
+            raise ValueError(f"campo obrigatório ausente: {obrigatorio}")
+
+    ade = campo("ade")
+    quinq = campo("quinquenios")
+    ajuda = campo("ajuda_custo")
+    return {
+        "graduacao": str(campo("graduacao")),
+        "municipio": str(campo("municipio")),
+        "inicio": _data_hora(campo("inicio"), "inicio"),
+        "fim": _data_hora(campo("fim"), "fim"),
+        "quinquenios": 0 if quinq is None else _numero(quinq, "quinquenios", int),
+        "ade": None if ade is None else _numero(ade, "ade"),
+        "trintenario": str(campo("trintenario") or "Não"),
+        "outro_estado": _bool(campo("outro_estado"), "outro_estado"),
+        "pousada": _bool(campo("pousada"), "pousada"),
+        "ajuda_custo": 74.98 if ajuda is None else _numero(ajuda, "ajuda_custo"),
+    }
+
+
+def _calcular_bloco(
+    viagens: List[Dict[str, Any]],
+    valor_dia_por_graduacao: Dict[str, float] | None,
+    municipios_especiais_mg: Set[str] | None,
+) -> List[Tuple[Optional[Resultado], Optional[str]]]:
+    """
+    (resultado, erro) de cada viagem; usa calcular_diarias_lote se houver numpy.
+    Se o bloco falhar por inteiro, ele é refeito viagem a viagem, para que o
+    erro fique só na linha que o causou.
+    """
+    try:
+        _numpy()
+    except ImportError:
+        return _calcular_uma_a_uma(viagens, valor_dia_por_graduacao, municipios_especiais_mg)
+
+    try:
+        return _calcular_colunas(viagens, valor_dia_por_graduacao, municipios_especiais_mg)
+    except Exception:
+        logging.exception("Falha no cálculo em lote; refazendo o bloco viagem a viagem")
+        return _calcular_uma_a_uma(viagens, valor_dia_por_graduacao, municipios_especiais_mg)
+
+
+def _calcular_uma_a_uma(
+    viagens: List[Dict[str, Any]],
+    valor_dia_por_graduacao: Dict[str, float] | None,
+    municipios_especiais_mg: Set[str] | None,
+) -> List[Tuple[Optional[Resultado], Optional[str]]]:
+    saida = []
+    for v in viagens:
+        try:
+            saida.append((calcular_diarias(
+                **v,
+                valor_dia_por_graduacao=valor_dia_por_graduacao,
+                municipios_especiais_mg=municipios_especiais_mg,
+            ), None))
+        except (LookupError, ValueError, TypeError, OverflowError) as e:
+            saida.append((None, e.args[0] if e.args else str(e)))
+    return saida
+
+
+def _calcular_colunas(
+    viagens: List[Dict[str, Any]],
+    valor_dia_por_graduacao: Dict[str, float] | None,
+    municipios_especiais_mg: Set[str] | None,
+) -> List[Tuple[Optional[Resultado], Optional[str]]]:
+    colunas = {nome: [v[nome] for v in viagens] for nome in viagens[0]}
+    res = calcular_diarias_lote(
+        graduacao=colunas["graduacao"],
+        localidade=classificar_destinos(
+            colunas["municipio"], colunas["outro_estado"], municipios_especiais_mg, datas=colunas["inicio"]
+        ),
+        inicio=colunas["inicio"],
+        fim=colunas["fim"],
+        quinquenios=colunas["quinquenios"],
+        ade=[float("nan") if a is None else a for a in colunas["ade"]],
+        trintenario=colunas["trintenario"],
+        pousada=colunas["pousada"],
+        ajuda_custo=colunas["ajuda_custo"],
+        valor_dia_por_graduacao=valor_dia_por_graduacao,
+        estrito=False,
+    )
+    return [(None, res.erros[i]) if i in res.erros else (res.linha(i), None) for i in range(len(res))]
+
+
+def processar_viagens(
+    registros: Iterable[Mapping[str, Any] | Exception],
+    *,
+    bloco: int = 1000,
+    valor_dia_por_graduacao: Dict[str, float] | None = None,
+    municipios_especiais_mg: Set[str] | None = None,
+) -> Iterator[Dict[str, Any]]:
+    """
+    Calcula as diárias de um fluxo de registros, `bloco` viagens por vez.
+
+    Para cada entrada devolve, na mesma ordem, o registro original com o
+    número da linha, os campos de Resultado e "erro" (None se deu certo).
+    Cada registro é validado e convertido antes de entrar nas colunas do
+    bloco: um registro inválido (ou uma exceção vinda do leitor) vira uma
+    linha com "erro" e não interrompe o lote; a memória usada é a de um bloco.
+    """
+    numerados = enumerate(registros, start=1)
+    while True:
+        lote = list(itertools.islice(numerados, bloco))
+        if not lote:
+            return
+
+        viagens: List[Dict[str, Any]] = []
+        erros: Dict[int, str] = {}
+        for pos, (_, registro) in enumerate(lote):
+            try:
+                if isinstance(registro, Exception):
+                    raise registro
+                if not isinstance(registro, Mapping):
+                    raise ValueError("esperado um objeto com os campos da viagem")
+                viagens.append(viagem_kwargs(registro))
+            except ValueError as e:
+                erros[pos] = str(e)
+
+        calculados = iter(
+            _calcular_bloco(viagens, valor_dia_por_graduacao, municipios_especiais_mg) if viagens else []
+        )
+        for pos, (linha, registro) in enumerate(lote):
+            saida: Dict[str, Any] = {"linha": linha}
+            if isinstance(registro, Mapping):
+                saida.update(registro)
+            resultado, erro = (None, erros[pos]) if pos in erros else next(calculados)
+            for nome in CAMPOS_RESULTADO:
+                saida[nome] = getattr(resultado, nome, None)
+            saida["erro"] = erro
+            yield saida
+
+
+def ler_viagens(entrada: IO[str], formato: str, delimitador: Optional[str] = None) -> Iterator[Mapping[str, Any] | Exception]:
+    """
+    Registros de viagem de um CSV (com cabeçalho; "," ou ";" detectado pelo
+    cabeçalho) ou NDJSON (um objeto por linha; linha inválida vira ValueError).
+    """
+    if formato == "csv":
+        cabecalho = entrada.readline()
+        if delimitador is None:
+            delimitador = ";" if cabecalho.count(";") > cabecalho.count(",") else ","
+        yield from csv.DictReader(itertools.chain([cabecalho], entrada), delimiter=delimitador)
+        return
+
+    for n, linha in enumerate(entrada, start=1):
+        if not linha.strip():
+            continue
+        try:
+            registro = json.loads(linha)
+        except json.JSONDecodeError as e:
+            yield ValueError(f"JSON inválido na linha {n}: {e.msg}")
+            continue
+        yield registro if isinstance(registro, dict) else ValueError(f"linha {n}: esperado um objeto JSON")
+
+
+def _formato_por_nome(caminho: str, padrao: str) -> str:
+    ext = Path(caminho).suffix.lower()
+    return "csv" if ext == ".csv" else "ndjson" if ext in (".ndjson", ".jsonl", ".json") else padrao
+
+
+def main_lote(argv: Optional[List[str]] = None) -> int:
+    ap = argparse.ArgumentParser(
+        prog="diaria_calculator.py lote",
+        description="Cálculo de diárias em lote: viagens de um CSV/NDJSON, um resultado por linha",
+    )
+    ap.add_argument("entrada", help='Arquivo CSV/NDJSON ("-" para stdin)')
+    ap.add_argument("--formato", choices=FORMATOS_LOTE, help="Formato da entrada (padrão: pela extensão; stdin = ndjson)")
+    ap.add_argument("--saida", default="-", help='Arquivo de saída ("-" para stdout)')
+    ap.add_argument("--formato-saida", choices=FORMATOS_LOTE, help="Formato da saída (padrão: pela extensão, ou o da entrada)")
+    ap.add_argument("--delimitador", help="Delimitador do CSV de entrada (padrão: detectado)")
+    ap.add_argument("--bloco", type=int, default=1000, help="Viagens calculadas por vez")
+    args = ap.parse_args(argv)
+
+    formato = args.formato or _formato_por_nome(args.entrada, "ndjson")
+    formato_saida = args.formato_saida or _formato_por_nome(args.saida, formato)
+
+    ctx_entrada = nullcontext(sys.stdin) if args.entrada == "-" else open(args.entrada, encoding="utf-8-sig", newline="")
+    ctx_saida = nullcontext(sys.stdout) if args.saida == "-" else open(args.saida, "w", encoding="utf-8", newline="")
+
+    total = com_erro = 0
+    with ctx_entrada as entrada, ctx_saida as saida:
+        escritor = None
+        for r in processar_viagens(ler_viagens(entrada, formato, args.delimitador), bloco=args.bloco):
+            total += 1
+            com_erro += r["erro"] is not None
+            if formato_saida == "ndjson":
+                saida.write(json.dumps(r, ensure_ascii=False) + "\n")
+                continue
+            if escritor is None:
+                escritor = csv.DictWriter(saida, fieldnames=list(r), extrasaction="ignore", lineterminator="\n")
+                escritor.writeheader()
+            escritor.writerow(r)
+
+    print(f"{total} viagens calculadas, {com_erro} com erro.", file=sys.stderr)
+    return 1 if com_erro else 0
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    argv = sys.argv[1:] if argv is None else argv
+    if argv[:1] == ["lote"]:
+        sys.exit(main_lote(argv[1:]))
+
+    ap = argparse.ArgumentParser(
+        description="Cálculo de diárias (réplica da planilha) - CBMMG",
+        epilog='Várias viagens de uma vez: "diaria_calculator.py lote viagens.csv" (ver "lote --help").',
+    )
     ap.add_argument("--graduacao", required=True, help="Ex: CAP, TEN, SGT, CB...")
     ap.add_argument("--quinquenios", type=int, default=0, help="Qtd quinquênios (usado se ADE não informado)")
     ap.add_argument("--ade", type=float, default=None, help="ADE numérico (se informado, substitui quinquênios; vira ADE/10)")
@@ -373,7 +988,7 @@ def main() -> None:
     ap.add_argument("--pousada", action="store_true", help="Marque se há pousada/pernoite (B5='Sim')")
     ap.add_argument("--ajuda-custo", type=float, default=74.98, help="Ajuda de custo (planilha ~74,98)")
 
-    args = ap.parse_args()
+    args = ap.parse_args(argv)
 
     res = calcular_diarias(
         graduacao=args.graduacao,
@@ -0,0 +1,259 @@
+"""
+Diárias de um itinerário com vários trechos (relatório de viagem do SEI).
+
+`sei_automate.extrair_detalhes_viagem` devolve os trechos de um militar:
+
+    {"01": {"l_partida": "Belo horizonte", "d_partida": "23/12/2025", "h_partida": "10:01",
+            "l_destino": "Teófilo Otoni", "d_destino": "23/12/2025", "h_destino": "11:24"},
+     "02": {...}, ...}
+
+Em vez de digitar cada viagem em `calcular_diarias`, o itinerário inteiro é
+calculado de uma vez:
+
+- os trechos são divididos em viagens a cada retorno à sede;
+- o tempo de cada viagem é atribuído aos lugares: de uma partida até a
+  partida seguinte, conta para o destino do trecho (o trecho de volta à sede
+  conta para o lugar de onde o militar sai);
+- as horas são somadas por localidade (Capital / Município Especial /
+  Demais Municípios) e a viagem, da primeira partida à última chegada, é
+  calculada com a localidade predominante (mais horas; no empate, o maior
+  piso) e o município onde ficou mais tempo nela.
+"""
+
+from __future__ import annotations
+
+import unicodedata
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any, Dict, List, Mapping, Optional, Set
+
+from diaria_calculator import (
+    INDICE_MUNICIPIOS,
+    Resultado,
+    calcular_diarias,
+    classificar_destino,
+    norm_grad_key,
+    tabela_vigente,
+)
+from municipios import dobrar, uf
+
+# Posto/graduação por extenso (campo "posto_grad" do SEI) -> chave de VALOR_DIA_POR_GRADUACAO
+GRADUACOES_SEI = {
+    "CORONEL": "CEL",
+    "TENENTECORONEL": "TENCEL",
+    "MAJOR": "MAJ",
+    "CAPITAO": "CAP",
+    "1TENENTE": "1TEN",
+    "2TENENTE": "2TEN",
+    "ASPIRANTE": "ASP",
+    "ASPIRANTEAOFICIAL": "ASP",
+    "SUBTENENTE": "SUBTEN",
+    "1SARGENTO": "1SGT",
+    "2SARGENTO": "2SGT",
+    "3SARGENTO": "3SGT",
+    "CABO": "CB",
+    "SOLDADO1CLASSE": "SD1CL",
+    "SOLDADODE1CLASSE": "SD1CL",
+    "SOLDADO2CLASSE": "SD2CL",
+    "SOLDADODE2CLASSE": "SD2CL",
+}
+
+# Postos que o relatório pode trazer sem o ordinal/classe ("Sargento"): não há
+# como escolher a chave de VALOR_DIA_POR_GRADUACAO sem a graduação informada
+GRADUACOES_AMBIGUAS = {
+    "TENENTE": ("1TEN", "2TEN"),
+    "SARGENTO": ("1SGT", "2SGT", "3SGT"),
+    "SOLDADO": ("SD1CL", "SD2CL"),
+}
+
+
+@dataclass
+class Trecho:
+    seq: str
+    partida: str
+    saida: datetime
+    destino: str
+    chegada: datetime
+
+
+@dataclass
+class ViagemItinerario:
+    trechos: List[Trecho]
+    horas_por_localidade: Dict[str, float]
+    localidade: str
+    municipio: str  # município de referência do cálculo
+    resultado: Resultado
+
+
+@dataclass
+class ResultadoItinerario:
+    viagens: List[ViagemItinerario] = field(default_factory=list)
+
+    @property
+    def total(self) -> float:
+        return round(sum(v.resultado.total for v in self.viagens), 2)
+
+
+def graduacao_sei(posto_grad: str) -> str:
+    """
+    "1° Tenente" -> "1TEN", "Capitão" -> "CAP"; abreviações ("Cap", "1ºTen") passam direto.
+    Posto sem ordinal/classe ("Sargento", "Tenente", "Soldado") levanta ValueError.
+    """
+    sem_acento = "".join(
+        c for c in unicodedata.normalize("NFD", posto_grad) if not unicodedata.combining(c)
+    )
+    chave = norm_grad_key(sem_acento)
+    if chave in GRADUACOES_AMBIGUAS:
+        raise ValueError(
+            f"Posto/graduação {posto_grad!r} sem o ordinal/classe: informe a graduação "
+            f"({' ou '.join(GRADUACOES_AMBIGUAS[chave])})"
+        )
+    return GRADUACOES_SEI.get(chave, chave)
+
+
+def _data_hora(data: str, hora: str, seq: str, campo: str) -> datetime:
+    texto = f"{(data or '').strip()} {(hora or '').strip()}"
+    for formato in ("%d/%m/%Y %H:%M", "%d/%m/%Y %H:%M:%S"):
+        try:
+            return datetime.strptime(texto, formato)
+        except ValueError:
+            pass
+    raise ValueError(f"Trecho {seq}: data/hora de {campo} inválida ({texto.strip()!r})")
+
+
+def trechos_do_relatorio(detalhes: Mapping[str, Mapping[str, str]]) -> List[Trecho]:
+    """Trechos de extrair_detalhes_viagem, na ordem do relatório, com datas validadas."""
+    trechos = []
+    for seq in sorted(detalhes):
+        d = detalhes[seq]
+        trecho = Trecho(
+            seq=seq,
+            partida=d.get("l_partida", ""),
+            saida=_data_hora(d.get("d_partida", ""), d.get("h_partida", ""), seq, "partida"),
+            destino=d.get("l_destino", ""),
+            chegada=_data_hora(d.get("d_destino", ""), d.get("h_destino", ""), seq, "destino"),
+        )
+        if trecho.chegada < trecho.saida:
+            raise ValueError(f"Trecho {seq}: chegada antes da partida")
+        if trechos and trecho.saida < trechos[-1].chegada:
+            raise ValueError(f"Trecho {seq}: partida antes da chegada do trecho {trechos[-1].seq}")
+        trechos.append(trecho)
+    return trechos
+
+
+def _chave(municipio: str) -> str:
+    return INDICE_MUNICIPIOS.resolver(municipio) or dobrar(municipio)
+
+
+def _fora_de_mg(municipio: str) -> bool:
+    """Só a UF explícita ("Vitória/ES") indica outro estado; sem UF, vale MG."""
+    estado = uf(municipio)
+    return estado is not None and estado != "MG"
+
+
+def _dividir_viagens(trechos: List[Trecho], sede: str) -> List[List[Trecho]]:
+    """Uma viagem termina a cada chegada à sede."""
+    viagens: List[List[Trecho]] = [[]]
+    for t in trechos:
+        viagens[-1].append(t)
+        if _chave(t.destino) == sede:
+            viagens.append([])
+    return [v for v in viagens if v]
+
+
+def _horas_por_lugar(trechos: List[Trecho], sede: str) -> Dict[str, float]:
+    horas: Dict[str, float] = {}
+    for i, t in enumerate(trechos):
+        fim = trechos[i + 1].saida if i + 1 < len(trechos) else t.chegada
+        lugar = t.partida if _chave(t.destino) == sede and _chave(t.partida) != sede else t.destino
+        horas[lugar] = horas.get(lugar, 0.0) + (fim - t.saida).total_seconds() / 3600.0
+    return horas
+
+
+def calcular_itinerario(
+    detalhes: Mapping[str, Mapping[str, str]],
+    *,
+    graduacao: str,
+    sede: Optional[str] = None,
+    quinquenios: int = 0,
+    ade: float | None = None,
+    trintenario: str = "Não",
+    pousada: bool = False,
+    ajuda_custo: float = 74.98,
+    valor_dia_por_graduacao: Dict[str, float] | None = None,
+    municipios_especiais_mg: Set[str] | None = None,
+) -> ResultadoItinerario:
+    """
+    Calcula as diárias de todos os trechos de um militar (ver o topo do módulo).
+
+    `sede` é o município de lotação; se omitido, é a partida do primeiro
+    trecho. Os demais parâmetros são os de calcular_diarias e valem para
+    todas as viagens do itinerário; tabelas omitidas vêm da versão vigente na
+    partida de cada viagem.
+    """
+    trechos = trechos_do_relatorio(detalhes)
+    if not trechos:
+        raise ValueError("Itinerário sem trechos")
+    chave_sede = _chave(sede or trechos[0].partida)
+
+    resultado = ResultadoItinerario()
+    for viagem in _dividir_viagens(trechos, chave_sede):
+        horas_lugar = _horas_por_lugar(viagem, chave_sede)
+        tabela = tabela_vigente(viagem[0].saida)
+        especiais = tabela.municipios_especiais_mg if municipios_especiais_mg is None else municipios_especiais_mg
+
+        horas_localidade: Dict[str, float] = {}
+        localidade_de = {
+            lugar: classificar_destino(lugar, _fora_de_mg(lugar), especiais) for lugar in horas_lugar
+        }
+        for lugar, h in horas_lugar.items():
+            horas_localidade[localidade_de[lugar]] = horas_localidade.get(localidade_de[lugar], 0.0) + h
+
+        localidade = max(horas_localidade, key=lambda loc: (horas_localidade[loc], tabela.pisos_localidade[loc]))
+        municipio = max((lugar for lugar in horas_lugar if localidade_de[lugar] == localidade), key=horas_lugar.get)
+
+        res = calcular_diarias(
+            graduacao=graduacao,
+            municipio=municipio,
+            inicio=viagem[0].saida,
+            fim=viagem[-1].chegada,
+            quinquenios=quinquenios,
+            ade=ade,
+            trintenario=trintenario,
+            outro_estado=_fora_de_mg(municipio),
+            pousada=pousada,
+            ajuda_custo=ajuda_custo,
+            valor_dia_por_graduacao=valor_dia_por_graduacao,
+            municipios_especiais_mg=especiais,
+            pisos_localidade=tabela.pisos_localidade,
+        )
+        resultado.viagens.append(
+            ViagemItinerario(
+                trechos=viagem,
+                horas_por_localidade={loc: round(h, 2) for loc, h in horas_localidade.items()},
+                localidade=localidade,
+                municipio=municipio,
+                resultado=res,
+            )
+        )
+    return resultado
+
+
+def calcular_itinerario_militar(militar: Mapping[str, Any], **kwargs: Any) -> ResultadoItinerario:
+    """
+    Itinerário de um militar do dicionário montado em sei_automate
+    ("details", "posto_grad", "sede"). Parâmetros explícitos têm prioridade;
+    se o relatório traz só "Sargento", "Tenente" ou "Soldado", passe
+    `graduacao=`.
+    """
+    if not militar.get("details"):
+        raise ValueError(f"Militar {militar.get('numero', '?')} sem detalhes de viagem")
+    if "graduacao" not in kwargs:
+        if not militar.get("posto_grad"):
+            raise ValueError(f"Militar {militar.get('numero', '?')} sem posto/graduação")
+        try:
+            kwargs["graduacao"] = graduacao_sei(militar["posto_grad"])
+        except ValueError as e:
+            raise ValueError(f"Militar {militar.get('numero', '?')}: {e}") from None
+    kwargs.setdefault("sede", militar.get("sede") or None)
+    return calcular_itinerario(militar["details"], **kwargs)
@@ -0,0 +1,152 @@
+"""
+Cálculo de diárias em lote a partir das telas do SIGP.
+
+As entradas que antes eram digitadas à mão em `calcular_diarias`
+(graduação, quinquênios, ADE e trintenário) são lidas das telas capturadas
+por `tools.capturar_telas` (IP / DB / FU):
+
+    SERVIDOR:142924-0-CAP            -> NS 1429240, graduação CAP
+    QUANTIDADE QUINQ. ADM/MAG  :04/00 -> quinquênios 4
+    PERCENTUAL ADIC. DESEMP : 30,00  -> ADE 30
+    ADIC.TRINTENARIO (S/N) .:S       -> "Sim - anterior a 1ºSet07"
+    ADIC.TRINT EC59 (S/N) :S         -> "Sim - Posterior a 1ºSet07"
+
+O texto da tela vem quebrado a cada 80 colunas, então as linhas são unidas
+(screen_reflow.unwrap_text) antes da busca: um campo pode começar numa linha
+e terminar na seguinte.
+"""
+
+from __future__ import annotations
+
+import re
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Iterable, List, Mapping, Optional
+
+from diaria_calculator import Resultado, calcular_diarias, norm_grad_key
+from screen_reflow import unwrap_text
+
+RE_SERVIDOR = re.compile(r"SERVIDOR:\s*(\d{3,})-(\d)-\s*([A-Z0-9]+)")
+RE_QUINQ = re.compile(r"QUANTIDADE QUINQ\.\s*ADM/MAG\s*:\s*(\d*)\s*/\s*(\d*)")
+RE_ADE = re.compile(r"PERCENTUAL ADIC\.\s*DESEMP\s*:\s*(\d{1,3}(?:,\d{1,2})?)")
+RE_TRINT = re.compile(r"ADIC\.TRINTENARIO\s*\(S/N\)\s*\.*:\s*([SN])(?![A-Z])")
+RE_TRINT_EC59 = re.compile(r"ADIC\.TRINT EC59\s*\(S/N\)\s*\.*:\s*([SN])(?![A-Z])")
+
+# Abreviações do SIGP que não batem com as chaves de VALOR_DIA_POR_GRADUACAO
+ALIASES_GRADUACAO_SIGP = {
+    "TC": "TENCEL",
+    "ST": "SUBTEN",
+}
+
+
+@dataclass
+class DadosSIGP:
+    ns: Optional[str]
+    graduacao: Optional[str]
+    quinquenios: int = 0
+    ade: Optional[float] = None
+    trintenario: str = "Não"
+
+
+@dataclass
+class ResultadoServidor:
+    ns: str
+    dados: Optional[DadosSIGP]
+    resultado: Optional[Resultado]
+    erro: Optional[str] = None
+
+
+def _unir_linhas(texto: str) -> str:
+    """
+    Desfaz a quebra de 80 colunas: as linhas físicas formam um fluxo contínuo.
+    Cada linha é completada até 80 colunas antes da junção, devolvendo o espaço
+    aparado no fim da linha ("PERCENTUAL" + "ADIC." -> "PERCENTUAL ADIC.").
+    """
+    return unwrap_text(texto)
+
+
+def extrair_dados_sigp(screens: Mapping[str, str]) -> DadosSIGP:
+    """
+    Lê NS, graduação, quinquênios, ADE e trintenário das telas de um servidor.
+
+    A tela IP tem os campos de pagamento; o SERVIDOR aparece em todas.
+    """
+    ordem = ["Tela IP"] + [k for k in screens if k != "Tela IP"]
+    textos = [_unir_linhas(screens.get(k, "")) for k in ordem]
+
+    ns = graduacao = None
+    for txt in textos:
+        m = RE_SERVIDOR.search(txt)
+        if m:
+            ns = f"{m.group(1)}{m.group(2)}"
+            grad = norm_grad_key(m.group(3))
+            graduacao = ALIASES_GRADUACAO_SIGP.get(grad, grad)
+            break
+
+    dados = DadosSIGP(ns=ns, graduacao=graduacao)
+
+    ip = textos[0]
+    m = RE_QUINQ.search(ip)
+    if m:
+        dados.quinquenios = sum(int(v) for v in m.groups() if v)
+
+    m = RE_ADE.search(ip)
+    if m:
+        ade = float(m.group(1).replace(",", "."))
+        dados.ade = ade if ade > 0 else None
+
+    if (m := RE_TRINT.search(ip)) and m.group(1) == "S":
+        dados.trintenario = "Sim - anterior a 1ºSet07"
+    elif (m := RE_TRINT_EC59.search(ip)) and m.group(1) == "S":
+        dados.trintenario = "Sim - Posterior a 1ºSet07"
+
+    return dados
+
+
+def calcular_diarias_servidores(
+    viagens: Iterable[Mapping[str, Any]],
+    telas_por_ns: Optional[Mapping[str, Mapping[str, str]]] = None,
+    capturar: Optional[Callable[[str], Optional[Mapping[str, str]]]] = None,
+) -> List[ResultadoServidor]:
+    """
+    Calcula as diárias de uma lista de viagens, uma por servidor/viagem.
+
+    Cada viagem é um dict com "ns" e os parâmetros da viagem aceitos por
+    `calcular_diarias` (municipio, inicio, fim, outro_estado, pousada,
+    ajuda_custo...). Valores explícitos na viagem têm prioridade sobre os
+    lidos do SIGP.
+
+    As telas vêm de `telas_por_ns`; se o NS não estiver lá e `capturar` for
+    informado (ex.: `tools.capturar_telas`), a captura é feita uma única vez
+    por NS. Erros de um servidor não interrompem o lote: ficam em `erro`.
+    """
+    cache: Dict[str, DadosSIGP] = {}
+    telas_por_ns = telas_por_ns or {}
+    resultados: List[ResultadoServidor] = []
+
+    for viagem in viagens:
+        params = dict(viagem)
+        ns = str(params.pop("ns"))
+
+        try:
+            dados = cache.get(ns)
+            if dados is None:
+                screens = telas_por_ns.get(ns)
+                if screens is None and capturar is not None:
+                    screens = capturar(ns)
+                if not screens:
+                    raise LookupError(f"Telas do SIGP não encontradas para o NS/BM {ns}")
+                dados = cache[ns] = extrair_dados_sigp(screens)
+
+            if not dados.graduacao and "graduacao" not in params:
+                raise ValueError(f"Graduação não encontrada nas telas do NS/BM {ns}")
+
+            params.setdefault("graduacao", dados.graduacao)
+            params.setdefault("quinquenios", dados.quinquenios)
+            params.setdefault("ade", dados.ade)
+            params.setdefault("trintenario", dados.trintenario)
+
+            resultados.append(ResultadoServidor(ns, dados, calcular_diarias(**params)))
+        except (LookupError, ValueError, TypeError) as e:
+            resultados.append(ResultadoServidor(ns, cache.get(ns), None, str(e)))
+
+    return resultados
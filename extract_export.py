@@ -0,0 +1,130 @@
+"""
+Exportação dos extratos em JSON / NDJSON, sem montar PDF.
+
+Cada registro traz as telas já tratadas como no PDF (reflow de 80 colunas +
+máscara de CPF/RG/PIS/conta) e os metadados do cabeçalho:
+
+    {"nsbm": "1429240", "capturado_em": "2026-02-06T10:20:03",
+     "servidor": "142924-0-CAP -QOBM -CLEYTON", "unidade": "...",
+     "telas": {"Tela IP": "...", "Tela DB": "...", ...}}
+
+Os registros são gravados um a um (o lote pode vir de um gerador ou do
+arquivo .sgpa), então a memória não cresce com o tamanho do lote.
+
+Uso:
+    python extract_export.py capturas/telas_sigp.sgpa --formato ndjson --saida -
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+from contextlib import nullcontext
+from pathlib import Path
+from typing import IO, Any, Dict, Iterable, Mapping, Optional
+
+from pdf_generator import mask_sensitive, normalize_screen_text
+from screen_archive import ScreenArchive
+from screen_metadata import extract_metadata
+from screen_reflow import reflow_lines
+
+FORMATOS = ("ndjson", "json")
+
+
+def preparar_tela(texto: str) -> str:
+    """Tela com as quebras de 80 colunas reunidas e dados sensíveis mascarados."""
+    texto = normalize_screen_text(texto, mask=False)
+    return mask_sensitive("\n".join(line.rstrip() for line in reflow_lines(texto)))
+
+
+def extrato_record(screens: Mapping[str, str], nsbm_override: Optional[str] = None) -> Dict[str, Any]:
+    """Registro JSON de um extrato (mesmos dados do PDF)."""
+    telas = {nome: preparar_tela(texto) for nome, texto in screens.items()}
+    meta = extract_metadata(telas)
+    return {
+        "nsbm": nsbm_override or meta.nsbm or "SEM_REFERENCIA",
+        "capturado_em": meta.sigp_dt.isoformat() if meta.sigp_dt else None,
+        "servidor": meta.servidor,
+        "unidade": meta.unidade,
+        "telas": telas,
+    }
+
+
+def write_records(
+    registros: Iterable[Mapping[str, Any]],
+    destino: str | Path | IO[str] = "-",
+    formato: str = "ndjson",
+) -> int:
+    """
+    Grava os registros em `destino` (caminho, arquivo aberto ou "-" para stdout)
+    e devolve quantos foram escritos.
+
+    formato:
+      "ndjson" -> um registro por linha
+      "json"   -> uma lista JSON, escrita registro a registro
+    """
+    if formato not in FORMATOS:
+        raise ValueError(f"Formato inválido: {formato!r} (use {', '.join(FORMATOS)})")
+
+    if destino == "-":
+        ctx = nullcontext(sys.stdout)
+    elif hasattr(destino, "write"):
+        ctx = nullcontext(destino)
+    else:
+        destino = Path(destino)
+        destino.parent.mkdir(parents=True, exist_ok=True)
+        ctx = open(destino, "w", encoding="utf-8", newline="\n")
+
+    total = 0
+    with ctx as out:
+        if formato == "json":
+            out.write("[")
+        for registro in registros:
+            linha = json.dumps(registro, ensure_ascii=False)
+            if formato == "json":
+                out.write(("," if total else "") + "\n" + linha)
+            else:
+                out.write(linha + "\n")
+            total += 1
+        if formato == "json":
+            out.write("\n]\n" if total else "]\n")
+        out.flush()
+    return total
+
+
+def export_extratos(
+    screens_list: Iterable[Mapping[str, str]],
+    destino: str | Path | IO[str] = "-",
+    formato: str = "ndjson",
+    nsbm_overrides: Optional[Iterable[Optional[str]]] = None,
+) -> int:
+    """Exporta um lote de extratos (dicionários de telas) com write_records."""
+    if nsbm_overrides is None:
+        registros = (extrato_record(screens) for screens in screens_list)
+    else:
+        registros = (extrato_record(screens, ns) for screens, ns in zip(screens_list, nsbm_overrides))
+    return write_records(registros, destino, formato)
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description="Exporta extratos do arquivo de telas (.sgpa) em JSON/NDJSON")
+    ap.add_argument("arquivo", help="Arquivo de telas .sgpa (ver tools.ARQUIVO_TELAS)")
+    ap.add_argument("--formato", choices=FORMATOS, default="ndjson")
+    ap.add_argument("--saida", default="-", help='Arquivo de saída ("-" para stdout)')
+    ap.add_argument("--ns", nargs="*", help="Somente estes NS/BM (última captura de cada)")
+    args = ap.parse_args()
+
+    with ScreenArchive(args.arquivo) as arquivo:
+        if args.ns:
+            capturas = (c for c in (arquivo.ultima(ns) for ns in args.ns) if c is not None)
+        else:
+            capturas = iter(arquivo)
+        # As capturas são descomprimidas uma a uma, durante a escrita
+        total = write_records((extrato_record(c.telas, c.ns) for c in capturas), args.saida, args.formato)
+
+    print(f"{total} extratos exportados.", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,188 @@
+"""
+Pool de hosts do SIGP (mainframe PRODEMGE) para as sessões c3270.
+
+Configuração pela variável de ambiente SIGP_HOSTS, separada por vírgula:
+
+    SIGP_HOSTS=192.168.2.1,192.168.2.2:23
+
+- health check: tempo de conexão TCP até cada host, refeito sob demanda só
+  para os hosts medidos há mais de `intervalo_check` segundos; os hosts são
+  medidos em paralelo, então a espera fica limitada a `timeout`
+- seleção: sorteio ponderado pelo inverso da latência média (EWMA)
+- failover: hosts que falham ficam fora do sorteio por `cooldown` segundos
+  e `candidatos()` devolve a ordem de tentativa para a próxima sessão
+"""
+
+from __future__ import annotations
+
+import logging
+import os
+import random
+import socket
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Iterable, List, Optional
+
+HOST_PADRAO = "192.168.2.1"
+PORTA_TN3270 = 23
+
+
+@dataclass
+class HostSIGP:
+    endereco: str
+    porta: int = PORTA_TN3270
+    latencia: Optional[float] = None  # segundos (média móvel exponencial)
+    falhas: int = 0
+    indisponivel_ate: float = 0.0
+    medido_em: Optional[float] = None  # time.monotonic() do último health check
+
+    @property
+    def alvo_c3270(self) -> str:
+        """Formato aceito pelo c3270: host ou host:porta."""
+        if self.porta == PORTA_TN3270:
+            return self.endereco
+        return f"{self.endereco}:{self.porta}"
+
+    def disponivel(self, agora: float) -> bool:
+        return agora >= self.indisponivel_ate
+
+
+def parse_hosts(valor: str) -> List[HostSIGP]:
+    """ "h1,h2:992" -> [HostSIGP("h1"), HostSIGP("h2", 992)] """
+    hosts: List[HostSIGP] = []
+    for item in valor.split(","):
+        item = item.strip()
+        if not item:
+            continue
+        endereco, _, porta = item.partition(":")
+        hosts.append(HostSIGP(endereco, int(porta) if porta else PORTA_TN3270))
+    return hosts
+
+
+class HostPool:
+    def __init__(
+        self,
+        hosts: Iterable[HostSIGP],
+        timeout: float = 3.0,
+        cooldown: float = 60.0,
+        intervalo_check: float = 30.0,
+        alpha: float = 0.3,
+    ) -> None:
+        self.hosts = list(hosts)
+        if not self.hosts:
+            raise ValueError("HostPool precisa de pelo menos um host")
+        self.timeout = timeout
+        self.cooldown = cooldown
+        self.intervalo_check = intervalo_check
+        self.alpha = alpha
+        self._lock = threading.Lock()
+        self._lock_check = threading.Lock()
+
+    @classmethod
+    def from_env(cls, var: str = "SIGP_HOSTS", default: str = HOST_PADRAO, **kwargs) -> "HostPool":
+        return cls(parse_hosts(os.getenv(var) or default), **kwargs)
+
+    # ----------------------------
+    # Health check
+    # ----------------------------
+    def _medir(self, host: HostSIGP) -> Optional[float]:
+        inicio = time.perf_counter()
+        try:
+            with socket.create_connection((host.endereco, host.porta), timeout=self.timeout):
+                pass
+        except OSError as e:
+            logging.warning(f"Host {host.alvo_c3270} sem resposta: {e}")
+            return None
+        return time.perf_counter() - inicio
+
+    def health_check(self, hosts: Optional[Iterable[HostSIGP]] = None) -> None:
+        """
+        Mede a latência dos hosts (todos, por padrão) e atualiza o estado do
+        pool. As conexões são feitas em paralelo: a espera total fica
+        limitada a `timeout`, não a `timeout` por host.
+        """
+        hosts = list(self.hosts if hosts is None else hosts)
+        if not hosts:
+            return
+        with ThreadPoolExecutor(max_workers=len(hosts)) as executor:
+            latencias = list(executor.map(self._medir, hosts))
+        agora = time.monotonic()
+        for host, latencia in zip(hosts, latencias):
+            if latencia is None:
+                self.registrar_falha(host)
+            else:
+                self.registrar_sucesso(host, latencia)
+            host.medido_em = agora
+
+    def _check_se_preciso(self) -> None:
+        if len(self.hosts) <= 1:
+            return
+        # uma thread mede; as outras seguem com as medidas que já existem
+        if not self._lock_check.acquire(blocking=False):
+            return
+        try:
+            agora = time.monotonic()
+            vencidos = [
+                h for h in self.hosts
+                if h.medido_em is None or agora - h.medido_em >= self.intervalo_check
+            ]
+            self.health_check(vencidos)
+        finally:
+            self._lock_check.release()
+
+    # ----------------------------
+    # Registro de resultados
+    # ----------------------------
+    def registrar_sucesso(self, host: HostSIGP, latencia: Optional[float] = None) -> None:
+        with self._lock:
+            host.falhas = 0
+            host.indisponivel_ate = 0.0
+            if latencia is not None:
+                if host.latencia is None:
+                    host.latencia = latencia
+                else:
+                    host.latencia = self.alpha * latencia + (1 - self.alpha) * host.latencia
+
+    def registrar_falha(self, host: HostSIGP) -> None:
+        with self._lock:
+            host.falhas += 1
+            # Cooldown cresce com falhas consecutivas (limite de 8x)
+            host.indisponivel_ate = time.monotonic() + self.cooldown * min(host.falhas, 8)
+
+    # ----------------------------
+    # Seleção
+    # ----------------------------
+    def _peso(self, host: HostSIGP) -> float:
+        # Host ainda não medido recebe o peso de uma latência de 100ms
+        latencia = host.latencia if host.latencia is not None else 0.1
+        return 1.0 / max(latencia, 0.001)
+
+    def candidatos(self) -> List[HostSIGP]:
+        """
+        Ordem de tentativa para uma nova sessão: hosts disponíveis sorteados
+        por peso (latência menor = mais chance de vir primeiro), seguidos dos
+        hosts em cooldown, do que volta antes para o que volta depois.
+        """
+        self._check_se_preciso()
+        agora = time.monotonic()
+
+        with self._lock:
+            disponiveis = [h for h in self.hosts if h.disponivel(agora)]
+            em_cooldown = sorted(
+                (h for h in self.hosts if not h.disponivel(agora)),
+                key=lambda h: h.indisponivel_ate,
+            )
+
+            ordem: List[HostSIGP] = []
+            while disponiveis:
+                pesos = [self._peso(h) for h in disponiveis]
+                escolhido = random.choices(disponiveis, weights=pesos, k=1)[0]
+                ordem.append(escolhido)
+                disponiveis.remove(escolhido)
+
+        return ordem + em_cooldown
+
+    def escolher(self) -> HostSIGP:
+        return self.candidatos()[0]
@@ -1,6 +1,156 @@
-from fastapi import FastAPI
+import asyncio
+import itertools
+import json
+import logging
+import os
+import re
+import unicodedata
+import zipfile
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import asynccontextmanager
+from dataclasses import asdict
+from datetime import datetime
+from functools import partial
+from typing import Any, Dict, List, Optional
+from urllib.parse import quote
+
+from fastapi import FastAPI, HTTPException
+from fastapi.responses import Response, StreamingResponse
+from pydantic import BaseModel, Field, field_validator
+
+from diaria_calculator import calcular_diarias, processar_viagens, viagem_kwargs
+from pdf_generator import ExtratoRenderer, generate_pdf_bytes
+
+# Processos que renderizam PDFs (o reportlab é limitado por CPU e não pode
+# rodar no event loop). PDF_WORKERS limita o pool; PDF_FILA limita quantos
+# extratos podem estar aguardando/renderizando ao mesmo tempo.
+try:
+    PDF_WORKERS = int(os.getenv("PDF_WORKERS", str(os.cpu_count() or 1)))
+except ValueError:
+    PDF_WORKERS = os.cpu_count() or 1
+try:
+    PDF_FILA = int(os.getenv("PDF_FILA", str(PDF_WORKERS * 2)))
+except ValueError:
+    PDF_FILA = PDF_WORKERS * 2
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    app.state.pool = ProcessPoolExecutor(max_workers=PDF_WORKERS)
+    app.state.vagas = asyncio.Semaphore(PDF_FILA)
+    try:
+        yield
+    finally:
+        app.state.pool.shutdown(wait=False, cancel_futures=True)
+
+
+app = FastAPI(lifespan=lifespan)
+
+
+class ExtratoEntrada(BaseModel):
+    telas: Dict[str, str] = Field(..., description='{"Tela IP": "...", "Tela DB": "...", "Tela FU": "...", "Tela FU 2": "..."}')
+    nsbm: Optional[str] = None
+
+
+class OpcoesRender(BaseModel):
+    render_mode: str = "canvas"
+    compact: bool = True
+
+
+class PedidoExtrato(OpcoesRender):
+    extrato: ExtratoEntrada
+
+
+class PedidoLote(OpcoesRender):
+    extratos: List[ExtratoEntrada] = Field(..., min_length=1)
+
+
+class Viagem(BaseModel):
+    graduacao: str = Field(..., description="Ex.: CAP, 1TEN, SD1CL (como no CLI)")
+    municipio: str
+    inicio: datetime
+    fim: datetime
+    quinquenios: int = 0
+    ade: Optional[float] = None
+    trintenario: str = "Não"
+    outro_estado: bool = False
+    pousada: bool = False
+    ajuda_custo: float = 74.98
+
+    @field_validator("inicio", "fim")
+    @classmethod
+    def _sem_fuso(cls, valor: datetime) -> datetime:
+        # horário local, como no lote (processar_viagens também recusa fuso)
+        if valor.tzinfo is not None:
+            raise ValueError("data/hora com fuso horário; use o horário local sem fuso")
+        return valor
+
+
+class PedidoDiariasLote(BaseModel):
+    # Registros como no "diaria_calculator.py lote": cada viagem é validada
+    # no cálculo e uma inválida (inclusive o que nem é objeto) vira uma linha
+    # com "erro", sem derrubar o lote.
+    viagens: List[Any] = Field(..., min_length=1)
+    bloco: int = Field(1000, ge=1, le=20000, description="Viagens calculadas por vez")
+
+
+def _validar_modo(opcoes: OpcoesRender):
+    if opcoes.render_mode not in ExtratoRenderer.RENDER_MODES:
+        raise HTTPException(
+            status_code=422,
+            detail=f"render_mode inválido: {opcoes.render_mode!r} (use {', '.join(ExtratoRenderer.RENDER_MODES)})",
+        )
+
+
+_RE_NOME_PROIBIDO = re.compile(r'[/\\\x00-\x1f\x7f-\x9f]')
+
+
+def _nome_seguro(nome: str) -> str:
+    """Nome de arquivo sem separadores de diretório nem caracteres de controle (o NS/BM vem do pedido)."""
+    nome = _RE_NOME_PROIBIDO.sub("_", nome).strip(" .")
+    return nome or "extrato.pdf"
+
+
+def _content_disposition(nome: str) -> Dict[str, str]:
+    """Cabeçalho de download com nome ASCII (clientes antigos) e o nome em UTF-8 (RFC 5987)."""
+    ascii_ = unicodedata.normalize("NFKD", nome).encode("ascii", "ignore").decode("ascii")
+    ascii_ = re.sub(r'[^\w .()-]', "_", ascii_) or "extrato.pdf"
+    return {"Content-Disposition": f"attachment; filename=\"{ascii_}\"; filename*=UTF-8''{quote(nome, safe='')}"}
+
+
+async def _renderizar(extrato: ExtratoEntrada, opcoes: OpcoesRender):
+    """Renderiza um extrato no pool, respeitando o limite de extratos em andamento."""
+    tarefa = partial(
+        generate_pdf_bytes,
+        extrato.telas,
+        nsbm_override=extrato.nsbm,
+        render_mode=opcoes.render_mode,
+        compact=opcoes.compact,
+    )
+    async with app.state.vagas:
+        nome, pdf = await asyncio.get_running_loop().run_in_executor(app.state.pool, tarefa)
+    return _nome_seguro(nome), pdf
+
+
+class _SaidaZip:
+    """Destino não pesquisável para o zipfile: acumula o que foi escrito até o próximo envio."""
+
+    def __init__(self):
+        self.partes: List[bytes] = []
+
+    def write(self, dados) -> int:
+        self.partes.append(bytes(dados))
+        return len(dados)
+
+    def flush(self):
+        pass
+
+    def retirar(self) -> bytes:
+        dados = b"".join(self.partes)
+        self.partes.clear()
+        return dados
 
-app = FastAPI()
 
 @app.get("/dados")
 def obter_dados(numero: int):
@@ -9,3 +159,102 @@ def obter_dados(numero: int):
         "status": "ok",
         "descricao": "dado ficticio"
     }
+
+
+@app.post("/diarias")
+def diarias(viagem: Viagem):
+    """Uma viagem -> Resultado de calcular_diarias (validada como uma linha do lote)."""
+    try:
+        return asdict(calcular_diarias(**viagem_kwargs(viagem.model_dump())))
+    except (ValueError, LookupError) as e:  # KeyError é LookupError
+        raise HTTPException(status_code=422, detail=e.args[0] if e.args else str(e))
+
+
+@app.post("/diarias/lote")
+def diarias_lote(pedido: PedidoDiariasLote):
+    """
+    Várias viagens -> NDJSON, uma linha por viagem na ordem recebida (mesmos
+    campos do "diaria_calculator.py lote": linha, entrada, resultado e erro).
+
+    O cálculo é o de processar_viagens (calcular_diarias_lote, `bloco`
+    viagens por vez) e cada bloco é enviado assim que fica pronto; o
+    StreamingResponse consome o gerador numa thread, fora do event loop.
+    """
+    resultados = processar_viagens(pedido.viagens, bloco=pedido.bloco)
+
+    def gerar_ndjson():
+        enviadas = 0
+        while True:
+            linhas = []
+            try:
+                for r in itertools.islice(resultados, pedido.bloco):
+                    linhas.append(json.dumps(r, ensure_ascii=False, default=str) + "\n")
+            except Exception as e:
+                # o status 200 já foi enviado: o erro vai como a última linha do NDJSON
+                logging.exception("Falha no cálculo em lote")
+                erro = {"linha": enviadas + len(linhas) + 1, "erro": f"falha no processamento do lote: {e}"}
+                linhas.append(json.dumps(erro, ensure_ascii=False) + "\n")
+                yield "".join(linhas).encode("utf-8")
+                return
+            if not linhas:
+                return
+            enviadas += len(linhas)
+            yield "".join(linhas).encode("utf-8")
+
+    return StreamingResponse(gerar_ndjson(), media_type="application/x-ndjson")
+
+
+@app.post("/extratos/pdf")
+async def extrato_pdf(pedido: PedidoExtrato):
+    """Um extrato -> PDF."""
+    _validar_modo(pedido)
+    nome, pdf = await _renderizar(pedido.extrato, pedido)
+    return Response(
+        content=pdf,
+        media_type="application/pdf",
+        headers=_content_disposition(nome),
+    )
+
+
+@app.post("/extratos/lote")
+async def extratos_lote(pedido: PedidoLote):
+    """
+    Vários extratos -> zip com um PDF por extrato, na ordem recebida.
+
+    Os extratos são renderizados em paralelo no pool e o zip é enviado à
+    medida que cada PDF fica pronto (sem montar o arquivo inteiro em memória).
+    No máximo PDF_WORKERS extratos do pedido ficam em andamento: o próximo só
+    começa quando o mais antigo entra no zip, para que PDFs prontos não se
+    acumulem enquanto um anterior ainda renderiza.
+    Um extrato com erro vira um .txt com a mensagem dentro do zip.
+    """
+    _validar_modo(pedido)
+
+    async def gerar_zip():
+        pendentes = enumerate(pedido.extratos, start=1)
+        janela: deque = deque()
+        saida = _SaidaZip()
+        try:
+            with zipfile.ZipFile(saida, "w", compression=zipfile.ZIP_STORED) as zf:
+                while True:
+                    for i, extrato in itertools.islice(pendentes, PDF_WORKERS - len(janela)):
+                        janela.append((i, asyncio.create_task(_renderizar(extrato, pedido))))
+                    if not janela:
+                        break
+                    i, tarefa = janela.popleft()
+                    try:
+                        nome, pdf = await tarefa
+                        zf.writestr(f"{i:03d} - {nome}", pdf)
+                    except Exception as e:
+                        zf.writestr(f"{i:03d} - ERRO.txt", f"Falha ao renderizar o extrato {i}: {e}")
+                    yield saida.retirar()
+            yield saida.retirar()
+        finally:
+            for _, tarefa in janela:
+                tarefa.cancel()
+
+    return StreamingResponse(
+        gerar_zip(),
+        media_type="application/zip",
+        headers={"Content-Disposition": 'attachment; filename="extratos.zip"'},
+    )
@@ -0,0 +1,163 @@
+"""
+Índice de municípios para a classificação do destino das diárias.
+
+Os relatórios do SEI trazem o município como foi digitado: com acento,
+caixa variável, UF no fim ("Uberlândia/MG") ou abreviado ("BH"). O índice
+é montado uma vez, na importação de diaria_calculator, com os 853
+municípios de MG (municipios_mg.txt, relação do IBGE) e as capitais:
+
+    chave dobrada (sem acento, minúsculas, sem pontuação) -> chave canônica
+    apelidos ("bh", "bhte", "jf", ...)                   -> chave canônica
+    variações com até 2 letras removidas                 -> chaves canônicas
+
+Um nome exato (ou apelido) é resolvido por dicionário. Se não houver,
+procura um erro de digitação: até 1 edição em nomes curtos e 2 nos longos,
+aceitando só quando há um único candidato mais próximo. A tabela de
+variações (~80 mil entradas) só é montada na primeira busca aproximada. Como todos os
+municípios de MG estão no índice, um município real não é "corrigido"
+para um vizinho parecido (Congonhal continua Congonhal, não Congonhas).
+"""
+
+from __future__ import annotations
+
+import re
+import unicodedata
+from collections import defaultdict
+from functools import cached_property, lru_cache
+from pathlib import Path
+from typing import Dict, Iterable, List, Mapping, Optional, Set
+
+ARQUIVO_MUNICIPIOS_MG = Path(__file__).with_name("municipios_mg.txt")
+
+UFS = {
+    "AC", "AL", "AM", "AP", "BA", "CE", "DF", "ES", "GO", "MA", "MG", "MS", "MT", "PA",
+    "PB", "PE", "PI", "PR", "RJ", "RN", "RO", "RR", "RS", "SC", "SE", "SP", "TO",
+}
+
+# Apelidos usados nos relatórios -> chave canônica (dobrada)
+APELIDOS = {
+    "bh": "belo horizonte",
+    "bhte": "belo horizonte",
+    "b hte": "belo horizonte",
+    "b horizonte": "belo horizonte",
+    "jf": "juiz de fora",
+    "moc": "montes claros",
+    "gv": "governador valadares",
+    "sjdr": "sao joao del rei",
+    "sao joao del rey": "sao joao del rei",
+    "lafaiete": "conselheiro lafaiete",
+    "conselheiro lafayette": "conselheiro lafaiete",
+    "bsb": "brasilia",
+    "sp": "sao paulo",
+    "sampa": "sao paulo",
+    "rj": "rio de janeiro",
+    "poa": "porto alegre",
+    "floripa": "florianopolis",
+}
+
+_RE_UF = re.compile(r"\s*[-/(,]\s*([A-Za-z]{2})\s*\)?\s*$")
+_RE_NAO_ALNUM = re.compile(r"[^a-z0-9]+")
+
+# Tamanho mínimo da consulta para aceitar 1 / 2 edições
+_MIN_1_EDICAO = 5
+_MIN_2_EDICOES = 9
+
+
+def dobrar(texto: str) -> str:
+    """
+    Chave de comparação: sem UF no fim, sem acentos, minúsculas, pontuação
+    vira espaço e apóstrofo some ("Olhos-d'Água/MG" -> "olhos dagua").
+    """
+    texto = (texto or "").strip()
+    m = _RE_UF.search(texto)
+    if m and m.group(1).upper() in UFS:
+        texto = texto[: m.start()]
+    texto = unicodedata.normalize("NFKD", texto.lower())
+    texto = "".join(c for c in texto if not unicodedata.combining(c))
+    texto = texto.replace("'", "").replace("’", "")
+    return " ".join(_RE_NAO_ALNUM.sub(" ", texto).split())
+
+
+def uf(texto: str) -> Optional[str]:
+    """UF informada no fim do nome ("Vitória/ES" -> "ES"), se houver."""
+    m = _RE_UF.search((texto or "").strip())
+    return m.group(1).upper() if m and m.group(1).upper() in UFS else None
+
+
+def carregar_municipios(caminho: str | Path = ARQUIVO_MUNICIPIOS_MG) -> List[str]:
+    """Nomes de um arquivo texto, um por linha (linhas vazias e # são ignoradas)."""
+    with open(caminho, encoding="utf-8") as f:
+        return [linha.strip() for linha in f if linha.strip() and not linha.lstrip().startswith("#")]
+
+
+def _delecoes(chave: str, maximo: int) -> Set[str]:
+    """A chave e todas as variações com até `maximo` letras removidas."""
+    saida = {chave}
+    nivel = {chave}
+    for _ in range(maximo):
+        nivel = {v[:i] + v[i + 1:] for v in nivel for i in range(len(v))}
+        saida |= nivel
+    return saida
+
+
+def _distancia(a: str, b: str) -> int:
+    """Distância de edição com transposição de letras vizinhas (OSA)."""
+    anterior2: List[int] = []
+    anterior = list(range(len(b) + 1))
+    for i, ca in enumerate(a, start=1):
+        atual = [i] + [0] * len(b)
+        for j, cb in enumerate(b, start=1):
+            atual[j] = min(anterior[j] + 1, atual[j - 1] + 1, anterior[j - 1] + (ca != cb))
+            if i > 1 and j > 1 and ca == b[j - 2] and a[i - 2] == cb:
+                atual[j] = min(atual[j], anterior2[j - 2] + 1)
+        anterior2, anterior = anterior, atual
+    return anterior[-1]
+
+
+class IndiceMunicipios:
+    """Resolve nomes digitados para a chave canônica de um município conhecido."""
+
+    def __init__(self, nomes: Iterable[str], apelidos: Mapping[str, str] | None = None):
+        self.chaves: Set[str] = {dobrar(n) for n in nomes}
+        self.apelidos: Dict[str, str] = {dobrar(a): dobrar(c) for a, c in (apelidos or {}).items()}
+        self.resolver = lru_cache(maxsize=4096)(self._resolver)
+
+    @cached_property
+    def _variacoes(self) -> Dict[str, Set[str]]:
+        variacoes: Dict[str, Set[str]] = defaultdict(set)
+        for chave in self.chaves:
+            for v in _delecoes(chave, 2):
+                variacoes[v].add(chave)
+        return variacoes
+
+    def __contains__(self, nome: str) -> bool:
+        return self.resolver(nome) is not None
+
+    def _resolver(self, nome: str) -> Optional[str]:
+        """Chave canônica de `nome` (exato, apelido ou erro de digitação) ou None."""
+        chave = dobrar(nome)
+        if chave in self.chaves:
+            return chave
+        if chave in self.apelidos:
+            return self.apelidos[chave]
+        return self.aproximado(chave)
+
+    def aproximado(self, chave: str) -> Optional[str]:
+        """Chave conhecida mais próxima de `chave` (já dobrada), se for única e perto o bastante."""
+        if len(chave) < _MIN_1_EDICAO:
+            return None
+        maximo = 2 if len(chave) >= _MIN_2_EDICOES else 1
+
+        variacoes = self._variacoes
+        candidatos: Set[str] = set()
+        for v in _delecoes(chave, maximo):
+            candidatos |= variacoes.get(v, set())
+
+        melhor, empate, menor = None, False, maximo + 1
+        for c in candidatos:
+            d = _distancia(chave, c)
+            if d < menor:
+                melhor, empate, menor = c, False, d
+            elif d == menor:
+                empate = True
+        return None if empate else melhor
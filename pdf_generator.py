@@ -1,17 +1,30 @@
 from __future__ import annotations
 
+import io
 import re
 import os
+import hashlib
+import json
+import shutil
+import threading
+import time
+from contextlib import contextmanager
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
 from datetime import datetime
 from pathlib import Path
-from typing import Dict, Optional, List, Any, Tuple
+from types import SimpleNamespace
+from typing import Dict, Optional, List, Any, Tuple, Iterable
 
 from pypdf import PdfWriter
+from pypdf.generic import NameObject
+from reportlab import rl_config
 from reportlab.lib.pagesizes import A4
 from reportlab.lib.units import mm
 from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
 from reportlab.lib.enums import TA_CENTER
 from reportlab.lib import colors
+from reportlab.pdfgen.canvas import Canvas
 
 from reportlab.platypus import (
     SimpleDocTemplate,
@@ -20,226 +33,250 @@ from reportlab.platypus import (
     Table,
     TableStyle,
     Preformatted,  # mantém colunas fixas (não bagunça 3270)
+    PageBreak,
+    Flowable,
 )
 
+from screen_metadata import extract_metadata
+from screen_reflow import reflow_lines
+
 
 # ============================================================
 # 1) Máscara + limpeza (SEM destruir espaçamento do terminal)
 # ============================================================
-def mask_sensitive(text: str) -> str:
-    # CPF 000.000.000-00 -> ***.***.***-**
-    text = re.sub(r"\b\d{3}\.\d{3}\.\d{3}-\d{2}\b", "***.***.***-**", text)
-
-    # PIS/PASEP (ex.: 1292809110-8) -> **********-*
-    text = re.sub(r"\b\d{10}-\d\b", "**********-*", text)
-
+def _rg_mask(m: re.Match) -> str:
     # RG tipo MG-19674285 -> MG-******85 (mantém final)
-    def rg_mask(m: re.Match) -> str:
-        uf = m.group(1)
-        num = m.group(2)
-        return f"{uf}-******{num[-2:]}" if len(num) >= 2 else f"{uf}-******"
+    uf = m.group("rg_uf")
+    num = m.group("rg_num")
+    return f"{uf}-******{num[-2:]}"
 
-    text = re.sub(r"\b([A-Z]{1,3})-?(\d{4,10})\b", rg_mask, text)
 
+# Tabela de regras: (nome, padrão, substituição). A substituição pode ser texto
+# fixo, texto com \g<grupo> ou função que recebe o Match. Grupos internos devem
+# ser nomeados com prefixo próprio da regra (ex.: rg_uf) para não colidir.
+MASK_RULES: List[Tuple[str, str, Any]] = [
+    # CPF 000.000.000-00 -> ***.***.***-**
+    ("cpf", r"\b\d{3}\.\d{3}\.\d{3}-\d{2}\b", "***.***.***-**"),
+    # PIS/PASEP (ex.: 1292809110-8) -> **********-*
+    ("pis", r"\b\d{10}-\d\b", "**********-*"),
+    # Id do terminal no cabeçalho ("SIGP  S142924") fica como está; precisa vir
+    # antes da regra de RG, que o mascararia como S-******24
+    ("terminal", r"SIGP\s+S\d+\b", lambda m: m.group(0)),
+    # RG com prefixo de letras: MG-19674285 -> MG-******85, M-12345 -> M-******45
+    ("rg", r"\b(?P<rg_uf>[A-Z]{1,3})-?(?P<rg_num>\d{4,10})\b", _rg_mask),
     # Conta (conservador): CONTA :12725 -> CONTA :****
-    text = re.sub(r"(CONTA\s*:)\s*\d+", r"\1 ****", text, flags=re.IGNORECASE)
-
-    return text
+    ("conta", r"(?P<conta_rot>(?i:CONTA)\s*:)\s*\d+", r"\g<conta_rot> ****"),
+]
 
 
-def normalize_screen_text(screen: str) -> str:
-    """
-    Normaliza EOL e reduz excesso de linhas vazias, sem mexer em espaços internos.
+class MaskEngine:
     """
-    screen = (screen or "").replace("\r\n", "\n").replace("\r", "\n")
-    screen = re.sub(r"\n{3,}", "\n\n", screen)
-    return mask_sensitive(screen).rstrip("\n")
-
+    Compila todas as regras numa única alternação e aplica em uma só passada:
+    o callback despacha pela regra que casou (`Match.lastgroup`).
 
-# ============================================================
-# 2) Correção de "wrap" do 3270 (C + LEYTON, C + HEFE, etc.)
-# ============================================================
-def _repair_wrapped_word_lines(lines: List[str], max_cols: int) -> List[str]:
+    `gate` é um lookahead posto na frente da alternação: posições que não podem
+    iniciar nenhuma regra são descartadas sem testar as alternativas. O padrão
+    (?=\\w) vale enquanto todas as regras começarem por caractere de palavra.
     """
-    Corrige quebras típicas do terminal (wrap no limite de coluna):
-      "... -C" + "\n" + "LEYTON ..."  -> "... -CLEYTON ..." e "LEYTON" vira espaços na linha de baixo
-      "...  C" + "\n" + "HEFE ..."    -> "...  CHEFE ..."   e "HEFE" vira espaços na linha de baixo
 
-    Importante: NÃO desloca a linha de baixo para a esquerda (preserva colunas).
-    """
-    out = lines[:]  # cópia
+    def __init__(self, rules: List[Tuple[str, str, Any]], gate: str = r"(?=\w)"):
+        self._handlers: Dict[str, Any] = {}
+        partes = []
+        for nome, padrao, repl in rules:
+            partes.append(f"(?P<{nome}>{padrao})")
+            if callable(repl):
+                self._handlers[nome] = repl
+            elif "\\" in repl:
+                self._handlers[nome] = lambda m, tpl=repl: m.expand(tpl)
+            else:
+                self._handlers[nome] = lambda m, fixo=repl: fixo
 
-    for i in range(len(out) - 1):
-        a = out[i]
-        b = out[i + 1]
+        self.pattern = re.compile(f"{gate}(?:{'|'.join(partes)})")
 
-        if not a or not b:
-            continue
+    def _dispatch(self, m: re.Match) -> str:
+        return self._handlers[m.lastgroup](m)
 
-        a_rstrip = a.rstrip()
-        if not a_rstrip:
-            continue
+    def mask(self, text: str) -> str:
+        return self.pattern.sub(self._dispatch, text)
 
-        # Só mexe se a linha A estiver "cheia" (perto do limite)
-        # wrap costuma ocorrer no final da linha
-        end_idx = len(a_rstrip)
-        if end_idx < max_cols - 6:
-            continue
+    def mask_batch(self, texts: Iterable[str]) -> List[str]:
+        """Mascara um lote de telas reaproveitando o padrão e o callback já resolvidos."""
+        sub = self.pattern.sub
+        dispatch = self._dispatch
+        return [sub(dispatch, t) for t in texts]
 
-        # token inicial da linha B (primeira palavra)
-        m_b = re.match(r"([A-Z0-9/.\-]{2,})(.*)$", b)
-        if not m_b:
-            continue
 
-        token = m_b.group(1)
-        rest = m_b.group(2)
+_MASK_ENGINE = MaskEngine(MASK_RULES)
 
-        # Caso 1: termina com "-X" (ex: "-C")
-        dash_tail = re.search(r"(-[A-Z])$", a_rstrip)
 
-        # Caso 2: termina com letra solta " X" (ex: "... C")
-        one_tail = re.search(r"([A-Z])$", a_rstrip)
-        one_tail_ok = bool(one_tail and len(a_rstrip) >= 2 and a_rstrip[-2] == " ")
+def mask_sensitive(text: str) -> str:
+    return _MASK_ENGINE.mask(text)
 
-        if not dash_tail and not one_tail_ok:
-            continue
 
-        # Aplica fix: concatena token na linha A
-        a_fixed = a_rstrip + token
+def mask_sensitive_batch(texts: Iterable[str]) -> List[str]:
+    return _MASK_ENGINE.mask_batch(texts)
 
-        # E substitui o token no início da linha B por espaços do mesmo tamanho
-        b_fixed = (" " * len(token)) + rest
 
-        out[i] = a_fixed
-        out[i + 1] = b_fixed
+_RE_MULTI_NL = re.compile(r"\n{3,}")
 
-    return out
+
+def normalize_screen_text(screen: str, mask: bool = True) -> str:
+    """
+    Normaliza EOL e reduz excesso de linhas vazias, sem mexer em espaços internos.
+    """
+    screen = (screen or "").replace("\r\n", "\n").replace("\r", "\n")
+    screen = _RE_MULTI_NL.sub("\n\n", screen)
+    if mask:
+        screen = mask_sensitive(screen)
+    return screen.rstrip("\n")
 
 
+# ============================================================
+# 2) Correção de "wrap" do 3270 (C + LEYTON, C + HEFE, etc.)
+# ============================================================
 def format_terminal_text(text: str, max_cols: int = 92) -> str:
     """
     Formata texto 3270 preservando layout:
-    - corrige wrap de tokens sem deslocar colunas
+    - reúne tokens cortados na coluna 80 sem deslocar colunas (screen_reflow)
     - padroniza largura de cada linha (corta / completa)
     """
-    text = (text or "").replace("\r\n", "\n").replace("\r", "\n")
-    lines = text.split("\n")
-
-    # 1) corrige tokens quebrados pelo wrap
-    lines = _repair_wrapped_word_lines(lines, max_cols=max_cols)
-
-    # 2) padroniza largura e mantém espaços
-    out_lines: List[str] = []
-    for line in lines:
-        line = line.replace("\t", "    ").rstrip("\n\r")
-
-        if len(line) > max_cols:
-            line = line[:max_cols]
-        else:
-            line = line.ljust(max_cols)
-
-        out_lines.append(line)
-
-    return "\n".join(out_lines)
+    lines = reflow_lines(text, max_cols=max_cols)
+    return "\n".join(line[:max_cols].ljust(max_cols) for line in lines)
 
 
 # ============================================================
 # 3) Extrações úteis (NS/BM, data/hora, etc.)
 # ============================================================
+# Mantidas como atalhos para screen_metadata.extract_metadata (uma passada por tela)
 def derive_nsbm_from_any_screen(screens: Dict[str, str]) -> Optional[str]:
     """
     SERVIDOR:142924-0-... -> 1429240
     """
-    for txt in screens.values():
-        if not txt:
-            continue
-        m = re.search(r"SERVIDOR:\s*(\d{3,})-(\d)\b", txt)
-        if m:
-            return f"{m.group(1)}{m.group(2)}"
-    return None
+    return extract_metadata(screens).nsbm
 
 
 def extract_sigp_datetime(screens: Dict[str, str]) -> Optional[datetime]:
     """
     Pega PRODEMGE 06/02/2026 + SIGP 10:12:00 e monta datetime.
     """
-    for txt in screens.values():
-        if not txt:
-            continue
-
-        m_date = (
-            re.search(r"PRODEMGE\s*0?(\d{2}/\d{2}/\d{4})", txt)
-            or re.search(r"PRODEMGE\s*(\d{2}/\d{2}/\d{4})", txt)
-        )
-        m_time = re.search(r"\bSIGP\s+(\d{2}:\d{2}:\d{2})\b", txt)
-
-        if m_date and m_time:
-            try:
-                return datetime.strptime(f"{m_date.group(1)} {m_time.group(1)}", "%d/%m/%Y %H:%M:%S")
-            except ValueError:
-                pass
-    return None
+    return extract_metadata(screens).sigp_dt
 
 
 def extract_servidor_unidade(screens: Dict[str, str]) -> Tuple[Optional[str], Optional[str]]:
-    servidor = None
-    unidade = None
+    meta = extract_metadata(screens)
+    return meta.servidor, meta.unidade
 
-    for txt in screens.values():
-        if not txt:
-            continue
 
-        if not servidor:
-            # Captura tudo após "SERVIDOR:" até o fim da linha
-            m_serv = re.search(r"SERVIDOR:\s*(.+)", txt)
-            if m_serv:
-                raw = m_serv.group(1).strip()
-                # Remove campos que vem depois (UNIDADE, NOME, etc.)
-                # Corta antes de "UNIDADE" se aparecer na mesma linha
-                cut = re.split(r"\s{2,}UNIDADE", raw)[0]
-                servidor = re.sub(r"\s{2,}", " ", cut).strip()
+# ============================================================
+# 4) Layout / PDF
+# ============================================================
+# "Gerado em" dos PDFs guardados no RenderCache: trocado pela data/hora real
+# ao entregar o PDF (carimbar). Só dígitos, que no Helvetica têm a mesma
+# largura: o número da página fica na mesma posição depois da troca.
+CARIMBO_CACHE = "00/00/0000 00:00"
 
-        if not unidade:
-            m_uni = re.search(r"UNIDADE\s*:\s*(.+)", txt)
-            if m_uni:
-                raw = m_uni.group(1).strip()
-                # Corta antes de campos seguintes como DATA, NOME, etc.
-                cut = re.split(r"\s{3,}(?:DATA|NOME|NUM|OPCAO)", raw)[0]
-                unidade = re.sub(r"\s{2,}", " ", cut).strip()
 
-        if servidor and unidade:
-            break
+def header_footer(canvas, doc, title: str, generated_dt: datetime | str | None):
+    """
+    Cabeçalho "<título> • Gerado em ... • Página N" (sem "Gerado em" se
+    generated_dt for None). generated_dt pode vir já formatado (CARIMBO_CACHE).
 
-    return servidor, unidade
+    A parte fixa é desenhada uma única vez por documento como form XObject
+    (beginForm/endForm) e cada página só a referencia (doForm); por página,
+    só o número é escrito.
+    """
+    _, h = A4
+    if generated_dt is None:
+        prefixo = f"{title} • Página "
+    else:
+        quando = generated_dt if isinstance(generated_dt, str) else generated_dt.strftime("%d/%m/%Y %H:%M")
+        prefixo = f"{title} • Gerado em {quando} • Página "
+    nome = "Cab" + hashlib.md5(prefixo.encode("utf-8")).hexdigest()[:6]
 
+    if not canvas.hasForm(nome):
+        w, _ = A4
+        canvas.beginForm(nome, lowerx=0, lowery=h - 16 * mm, upperx=w, uppery=h)
+        canvas.setFont("Helvetica", 9)
+        canvas.drawString(18 * mm, h - 12 * mm, prefixo)
+        canvas.endForm()
 
-# ============================================================
-# 4) Layout / PDF
-# ============================================================
-def header_footer(canvas, doc, title: str, generated_dt: datetime):
     canvas.saveState()
-    _, h = A4
-    top = f"{title} • Gerado em {generated_dt.strftime('%d/%m/%Y %H:%M')} • Página {doc.page}"
+    canvas.doForm(nome)
     canvas.setFont("Helvetica", 9)
-    canvas.drawString(18 * mm, h - 12 * mm, top)
+    canvas.drawString(18 * mm + canvas.stringWidth(prefixo, "Helvetica", 9), h - 12 * mm, str(doc.page))
     canvas.restoreState()
 
 
-def _screen_box(story: List[Any], label: str, text: str, mono_style: ParagraphStyle):
+# Seções do extrato, na ordem do documento: (título, chave no dicionário de telas)
+SECOES_EXTRATO: List[Tuple[str, str]] = [
+    ("1) DB - Dados Basicos", "Tela DB"),
+    ("2) FU - Cargos/Funcoes/Encargos Tela FU", "Tela FU"),
+    ("3) IP - Informacao de Pagamento", "Tela IP"),
+    ("4) FU - Cargos/Funcoes/Encargos Tela FU 2", "Tela FU 2"),
+]
+
+TITULO_EXTRATO = "EXTRATO DB FU IP"
+TITULO_ANEXO = "Anexo EXTRATO DB FU IP"
+
+
+class ExtratoRenderer:
     """
-    Caixa alinhada (texto começa no início do quadro):
-    - padding baixo
-    - Preformatted mantém colunas fixas
+    Monta estilos, fontes e TableStyles uma única vez e reaproveita em todos os
+    extratos renderizados. Em lote, crie um renderer e chame `render()` várias
+    vezes (ou use `generate_pdf_from_screens`, que reaproveita um por max_cols).
     """
-    label_style = ParagraphStyle("lbl", fontName="Helvetica", fontSize=10, spaceAfter=4)
-    story.append(Paragraph(f"<b>{label}</b>", label_style))
 
-    content = Preformatted(text, mono_style)
+    RENDER_MODES = ("platypus", "canvas")
+
+    def __init__(self, max_cols: int = 92, mode: str = "platypus", compact: bool = False):
+        if mode not in self.RENDER_MODES:
+            raise ValueError(f"Modo de renderização inválido: {mode!r} (use {', '.join(self.RENDER_MODES)})")
+        self.max_cols = max_cols
+        self.mode = mode
+        self.compact = compact
+
+        styles = getSampleStyleSheet()
+
+        self.title_style = ParagraphStyle(
+            "TitleCenter",
+            parent=styles["Title"],
+            alignment=TA_CENTER,
+            spaceAfter=8,
+        )
+
+        self.h_style = ParagraphStyle(
+            "Heading2Tight",
+            parent=styles["Heading2"],
+            spaceBefore=10,
+            spaceAfter=6,
+        )
+
+        # Mono: ajuste para caber melhor em A4
+        self.mono_style = ParagraphStyle(
+            "Mono",
+            parent=styles["Code"],
+            fontName="Courier",
+            fontSize=8.0,
+            leading=9.5,
+        )
+
+        self.label_style = ParagraphStyle("lbl", fontName="Helvetica", fontSize=10, spaceAfter=4)
+        self.italic_style = styles["Italic"]
+
+        self.meta_table_style = TableStyle(
+            [
+                ("FONT", (0, 0), (-1, -1), "Helvetica", 9),
+                ("VALIGN", (0, 0), (-1, -1), "TOP"),
+                ("LINEBELOW", (0, 0), (-1, -1), 0.25, colors.lightgrey),
+                ("BACKGROUND", (0, 0), (0, -1), colors.whitesmoke),
+                ("LEFTPADDING", (0, 0), (-1, -1), 6),
+                ("RIGHTPADDING", (0, 0), (-1, -1), 6),
+                ("TOPPADDING", (0, 0), (-1, -1), 4),
+                ("BOTTOMPADDING", (0, 0), (-1, -1), 4),
+            ]
+        )
 
-    # Ajuste fino: 170mm costuma caber bem com margens 18mm
-    box = Table([[content]], colWidths=[170 * mm])
-    box.setStyle(
-        TableStyle(
+        self.box_style = TableStyle(
             [
                 ("BOX", (0, 0), (-1, -1), 0.8, colors.black),
                 ("BACKGROUND", (0, 0), (-1, -1), colors.whitesmoke),
@@ -251,9 +288,658 @@ def _screen_box(story: List[Any], label: str, text: str, mono_style: ParagraphSt
                 ("BOTTOMPADDING", (0, 0), (-1, -1), 2),
             ]
         )
-    )
-    story.append(box)
-    story.append(Spacer(1, 8))
+
+        self._init_canvas_geometry()
+
+    # ----------------------------
+    # Preparação dos dados
+    # ----------------------------
+    def prepare(self, screens: Dict[str, str], nsbm_override: Optional[str] = None) -> Dict[str, Any]:
+        """Normaliza/formata as telas e extrai os metadados do cabeçalho."""
+        # Normaliza + formata como terminal (colunas fixas). A máscara vem depois
+        # do reflow: ela muda o tamanho das linhas e o reflow depende da coluna 80
+        # (e um CPF cortado na margem só é reconhecido depois de reunido).
+        screens_norm: Dict[str, str] = {}
+        for k, v in screens.items():
+            txt = normalize_screen_text(v, mask=False)
+            txt = format_terminal_text(txt, max_cols=self.max_cols)
+            screens_norm[k] = mask_sensitive(txt)
+
+        meta = extract_metadata(screens_norm)
+        return {
+            "screens": screens_norm,
+            "nsbm": nsbm_override or meta.nsbm or "SEM_REFERENCIA",
+            "sigp_dt": meta.sigp_dt,
+            "servidor": meta.servidor,
+            "unidade": meta.unidade,
+        }
+
+    @staticmethod
+    def filename_for(dados: Dict[str, Any]) -> str:
+        # Timestamp no nome: preferir data/hora da captura (SIGP); fallback para agora
+        base_dt = dados["sigp_dt"] if dados["sigp_dt"] else datetime.now()
+        timestamp = base_dt.strftime("%Y-%m-%d_%H-%M-%S")
+        return f"EXTRATO DB FU IP _ {dados['nsbm']} _ {timestamp}.pdf"
+
+    # ----------------------------
+    # Story (platypus)
+    # ----------------------------
+    def _screen_box(self, story: List[Any], label: str, text: str):
+        """
+        Caixa alinhada (texto começa no início do quadro):
+        - padding baixo
+        - Preformatted mantém colunas fixas
+        """
+        story.append(Paragraph(f"<b>{label}</b>", self.label_style))
+
+        content = Preformatted(text, self.mono_style)
+
+        # Ajuste fino: 170mm costuma caber bem com margens 18mm
+        box = Table([[content]], colWidths=[170 * mm])
+        box.setStyle(self.box_style)
+        story.append(box)
+        story.append(Spacer(1, 8))
+
+    def build_story(self, dados: Dict[str, Any]) -> List[Any]:
+        sigp_dt = dados["sigp_dt"]
+
+        story: List[Any] = []
+        story.append(Paragraph(TITULO_EXTRATO, self.title_style))
+
+        # Metadados (SEM “Observação”)
+        meta_rows = [
+            ["Data/Hora da Captura (referência)", sigp_dt.strftime("%d/%m/%Y %H:%M") if sigp_dt else "-"],
+            ["NS/BM (referência)", dados["nsbm"]],
+            ["Servidor (SIGP)", dados["servidor"] or "-"],
+            ["Unidade", dados["unidade"] or "-"],
+        ]
+
+        meta_table = Table(meta_rows, colWidths=[65 * mm, 105 * mm])
+        meta_table.setStyle(self.meta_table_style)
+        story.append(meta_table)
+        story.append(Spacer(1, 10))
+
+        # ===== Seções obedecendo exatamente os keys =====
+        for heading, key in SECOES_EXTRATO:
+            story.append(Paragraph(heading, self.h_style))
+            text = dados["screens"].get(key, "")
+            if text.strip():
+                self._screen_box(story, key, text)
+            else:
+                story.append(Paragraph(f"Conteúdo '{key}' não encontrado no dicionário.", self.italic_style))
+                story.append(Spacer(1, 8))
+
+        return story
+
+    # ----------------------------
+    # Modo "canvas": desenho direto, sem layout do platypus
+    # ----------------------------
+    def _init_canvas_geometry(self):
+        """
+        Pré-calcula as coordenadas usadas pelo modo canvas, reproduzindo o que o
+        SimpleDocTemplate/Frame fazem no modo platypus (margens, padding de 6pt
+        do frame, tabelas de 170mm centralizadas, espaçamentos dos estilos).
+        """
+        page_w, page_h = A4
+        pad = 6  # padding padrão do Frame
+
+        self._cv_x = 18 * mm + pad
+        self._cv_w = page_w - 36 * mm - 2 * pad
+        self._cv_top = page_h - 18 * mm - pad
+        self._cv_bottom = 16 * mm + pad
+
+        # Tabelas (caixa da tela e metadados) são centralizadas no frame
+        self._cv_box_w = 170 * mm
+        self._cv_box_x = self._cv_x + (self._cv_w - self._cv_box_w) / 2.0
+
+        # Metadados: FONT Helvetica 9 (leading 1.2 * 9) + padding 4/4
+        self._cv_meta_cols = (65 * mm, 105 * mm)
+        self._cv_meta_row_h = 9 * 1.2 + 4 + 4
+
+        # O rótulo é "<b>label</b>" no modo platypus
+        self._cv_label_style = ParagraphStyle("lblBold", parent=self.label_style, fontName="Helvetica-Bold")
+
+    def _cv_para(self, flow: Dict[str, Any], text: str, style: ParagraphStyle, centered: bool = False):
+        """Parágrafo de uma linha (títulos, rótulos, avisos)."""
+        top = self._cv_place(flow, style.leading, style.spaceBefore, style.spaceAfter)
+        c = flow["canvas"]
+        c.setFont(style.fontName, style.fontSize)
+        y = top - style.fontSize
+        if centered:
+            c.drawCentredString(self._cv_x + self._cv_w / 2.0, y, text)
+        else:
+            c.drawString(self._cv_x, y, text)
+
+    def _cv_spacer(self, flow: Dict[str, Any], height: float):
+        self._cv_place(flow, height, 0, 0)
+
+    def _cv_place(self, flow: Dict[str, Any], height: float, space_before: float, space_after: float) -> float:
+        """
+        Reserva `height` pontos no fluxo e devolve o topo do bloco.
+        Mesma regra do Frame: spaceBefore é ignorado no topo da página e
+        descontado do spaceAfter anterior; se não couber, quebra a página.
+        """
+        before = 0 if flow["at_top"] else max(space_before - flow["prev_after"], 0)
+        if not flow["at_top"] and flow["y"] - before - height < self._cv_bottom:
+            self._cv_new_page(flow)
+            before = 0
+
+        top = flow["y"] - before
+        flow["y"] = top - height - space_after
+        flow["prev_after"] = space_after
+        flow["at_top"] = False
+        return top
+
+    def _cv_new_page(self, flow: Dict[str, Any]):
+        c = flow["canvas"]
+        if flow["doc"].page:
+            c.showPage()
+        flow["doc"].page += 1
+        header_footer(c, flow["doc"], TITULO_EXTRATO, flow["generated_dt"])
+        flow["y"] = self._cv_top
+        flow["prev_after"] = 0
+        flow["at_top"] = True
+
+    def _cv_meta_table(self, flow: Dict[str, Any], rows: List[List[str]]):
+        row_h = self._cv_meta_row_h
+        top = self._cv_place(flow, row_h * len(rows), 0, 0)
+        c = flow["canvas"]
+        x0 = self._cv_box_x
+        w0, w1 = self._cv_meta_cols
+
+        c.saveState()
+        c.setFillColor(colors.whitesmoke)
+        c.rect(x0, top - row_h * len(rows), w0, row_h * len(rows), stroke=0, fill=1)
+        c.setStrokeColor(colors.lightgrey)
+        c.setLineWidth(0.25)
+        for i in range(1, len(rows) + 1):
+            y = top - row_h * i
+            c.line(x0, y, x0 + w0 + w1, y)
+        c.restoreState()
+
+        c.setFont("Helvetica", 9)
+        for i, (k, v) in enumerate(rows):
+            y = top - row_h * i - 4 - 9
+            c.drawString(x0 + 6, y, k)
+            c.drawString(x0 + w0 + 6, y, v)
+
+    def _cv_screen_box(self, flow: Dict[str, Any], label: str, text: str):
+        self._cv_para(flow, label, self._cv_label_style)
+
+        style = self.mono_style
+        lines = text.split("\n")
+        pad = 2
+
+        page_lines = int((self._cv_top - self._cv_bottom - 2 * pad) // style.leading)
+
+        while lines:
+            # Quantas linhas cabem no espaço que resta na página
+            avail = flow["y"] - self._cv_bottom - 2 * pad
+            fit = int(avail // style.leading)
+
+            # Caixa que cabe numa página inteira vai inteira para a próxima;
+            # caixa maior que a página é dividida a partir de onde está
+            if fit < len(lines) and not flow["at_top"] and (len(lines) <= page_lines or fit < 1):
+                self._cv_new_page(flow)
+                continue
+
+            take = max(min(fit, len(lines)), 1)
+            chunk, lines = lines[:take], lines[take:]
+
+            height = len(chunk) * style.leading + 2 * pad
+            top = self._cv_place(flow, height, 0, 0)
+            c = flow["canvas"]
+
+            c.saveState()
+            c.setFillColor(colors.whitesmoke)
+            c.setStrokeColor(colors.black)
+            c.setLineWidth(0.8)
+            c.rect(self._cv_box_x, top - height, self._cv_box_w, height, stroke=1, fill=1)
+            c.restoreState()
+
+            tx = c.beginText(self._cv_box_x + pad + style.leftIndent, top - pad - style.fontSize)
+            tx.setFont(style.fontName, style.fontSize, style.leading)
+            for line in chunk:
+                tx.textLine(line)
+            c.drawText(tx)
+
+            if lines:
+                self._cv_new_page(flow)
+
+        self._cv_spacer(flow, 8)
+
+    def _cv_open(self, target: Any, generated_dt: datetime | str | None, title: str) -> Dict[str, Any]:
+        c = Canvas(target, pagesize=A4, pageCompression=1 if self.compact else None)
+        c.setTitle(title)
+        return {
+            "canvas": c,
+            "doc": SimpleNamespace(page=0),
+            "generated_dt": generated_dt,
+        }
+
+    def _cv_draw_extract(self, flow: Dict[str, Any], dados: Dict[str, Any]):
+        sigp_dt = dados["sigp_dt"]
+        self._cv_para(flow, TITULO_EXTRATO, self.title_style, centered=True)
+        self._cv_meta_table(
+            flow,
+            [
+                ["Data/Hora da Captura (referência)", sigp_dt.strftime("%d/%m/%Y %H:%M") if sigp_dt else "-"],
+                ["NS/BM (referência)", dados["nsbm"]],
+                ["Servidor (SIGP)", dados["servidor"] or "-"],
+                ["Unidade", dados["unidade"] or "-"],
+            ],
+        )
+        self._cv_spacer(flow, 10)
+
+        for heading, key in SECOES_EXTRATO:
+            self._cv_para(flow, heading, self.h_style)
+            text = dados["screens"].get(key, "")
+            if text.strip():
+                self._cv_screen_box(flow, key, text)
+            else:
+                self._cv_para(flow, f"Conteúdo '{key}' não encontrado no dicionário.", self.italic_style)
+                self._cv_spacer(flow, 8)
+
+    def _render_canvas(self, lote: List[Dict[str, Any]], target: Any, generated_dt: datetime | str | None, title: str):
+        flow = self._cv_open(target, generated_dt, title)
+        c = flow["canvas"]
+
+        for i, dados in enumerate(lote):
+            self._cv_new_page(flow)
+            if len(lote) > 1:
+                key = f"extrato_{i}"
+                c.bookmarkPage(key)
+                c.addOutlineEntry(outline_title(dados), key, level=0)
+            self._cv_draw_extract(flow, dados)
+
+        if len(lote) > 1:
+            c.showOutline()
+        c.save()
+
+    # ----------------------------
+    # Saída
+    # ----------------------------
+    def _new_doc(self, target: Any, title: str = TITULO_EXTRATO) -> SimpleDocTemplate:
+        return SimpleDocTemplate(
+            target,
+            pagesize=A4,
+            leftMargin=18 * mm,
+            rightMargin=18 * mm,
+            topMargin=18 * mm,
+            bottomMargin=16 * mm,
+            title=title,
+            pageCompression=1 if self.compact else None,
+        )
+
+    def _build(self, lote: List[Dict[str, Any]], target: Any, title: str = TITULO_EXTRATO, carimbo: bool = True):
+        """
+        Um único build (platypus ou canvas) com todos os extratos do lote.
+        carimbo=False grava CARIMBO_CACHE no "Gerado em" (PDF reaproveitável
+        pelo cache, carimbado na entrega).
+        """
+        generated_dt = datetime.now() if carimbo else CARIMBO_CACHE
+        if self.compact:
+            with _streams_sem_a85():
+                self._build_lote(lote, target, title, generated_dt)
+        else:
+            self._build_lote(lote, target, title, generated_dt)
+
+    def _build_lote(self, lote: List[Dict[str, Any]], target: Any, title: str, generated_dt: datetime | str):
+
+        if self.mode == "canvas":
+            self._render_canvas(lote, target, generated_dt, title)
+            return
+
+        story: List[Any] = []
+        for i, dados in enumerate(lote):
+            if len(lote) > 1:
+                if i:
+                    story.append(PageBreak())
+                story.append(_OutlineEntry(outline_title(dados), f"extrato_{i}"))
+            story.extend(self.build_story(dados))
+
+        doc = self._new_doc(target, title)
+        doc.build(
+            story,
+            onFirstPage=lambda c, d: header_footer(c, d, TITULO_EXTRATO, generated_dt),
+            onLaterPages=lambda c, d: header_footer(c, d, TITULO_EXTRATO, generated_dt),
+        )
+
+    def render(
+        self,
+        screens: Dict[str, str],
+        output_dir: str | Path,
+        nsbm_override: Optional[str] = None,
+        cache: Optional["RenderCache"] = None,
+    ) -> Path:
+        """
+        Renderiza um extrato em `output_dir` e devolve o caminho do PDF.
+        Com `cache`, reaproveita o PDF já gerado para as mesmas telas.
+        """
+        output_dir = Path(output_dir)
+        output_dir.mkdir(parents=True, exist_ok=True)
+
+        dados = self.prepare(screens, nsbm_override)
+        out_path = output_dir / self.filename_for(dados)
+
+        if cache is None:
+            self._build([dados], str(out_path))
+            return out_path
+
+        key = self.cache_key(dados)
+        data = cache.read(key)
+        if data is None:
+            buf = io.BytesIO()
+            self._build([dados], buf, carimbo=False)
+            data = buf.getvalue()
+            cache.write(key, data)
+        out_path.write_bytes(carimbar(data))
+        return out_path
+
+    def render_bytes(
+        self,
+        screens: Dict[str, str],
+        nsbm_override: Optional[str] = None,
+        cache: Optional["RenderCache"] = None,
+    ) -> Tuple[str, bytes]:
+        """
+        Renderiza um extrato em memória, sem tocar em output_dir.
+        Devolve (nome sugerido do arquivo, conteúdo do PDF).
+        """
+        dados = self.prepare(screens, nsbm_override)
+        key = self.cache_key(dados) if cache is not None else None
+
+        if key is None:
+            buf = io.BytesIO()
+            self._build([dados], buf)
+            return self.filename_for(dados), buf.getvalue()
+
+        data = cache.read(key)
+        if data is None:
+            buf = io.BytesIO()
+            self._build([dados], buf, carimbo=False)
+            data = buf.getvalue()
+            cache.write(key, data)
+        return self.filename_for(dados), carimbar(data)
+
+    def cache_key(self, dados: Dict[str, Any]) -> str:
+        """Hash estável das telas normalizadas/mascaradas + parâmetros que mudam o PDF."""
+        payload = {
+            "versao": RenderCache.VERSAO,
+            "max_cols": self.max_cols,
+            "mode": self.mode,
+            "compact": self.compact,
+            "nsbm": dados["nsbm"],
+            "screens": dados["screens"],
+        }
+        return hashlib.sha256(
+            json.dumps(payload, sort_keys=True, ensure_ascii=False).encode("utf-8")
+        ).hexdigest()
+
+    def render_batch(
+        self,
+        screens_list: Iterable[Dict[str, str]],
+        output_path: str | Path,
+        nsbm_overrides: Optional[Iterable[Optional[str]]] = None,
+    ) -> Path:
+        """
+        Renderiza vários extratos num único PDF (um build só), na ordem recebida.
+        Cada extrato começa numa página nova e ganha uma entrada no sumário
+        (outline) do PDF. Substitui o fluxo "um PDF por NS + merge_pdfs_in_folder".
+        """
+        output_path = Path(output_path)
+        output_path.parent.mkdir(parents=True, exist_ok=True)
+
+        screens_list = list(screens_list)
+        overrides = list(nsbm_overrides) if nsbm_overrides is not None else [None] * len(screens_list)
+        if len(overrides) != len(screens_list):
+            raise ValueError("nsbm_overrides deve ter o mesmo tamanho de screens_list")
+
+        lote = [self.prepare(screens, ns) for screens, ns in zip(screens_list, overrides)]
+        if not lote:
+            raise ValueError("Nenhum extrato para renderizar.")
+
+        self._build(lote, str(output_path), title=TITULO_ANEXO)
+        return output_path
+
+
+class _OutlineEntry(Flowable):
+    """Marcador sem tamanho: registra a página atual no sumário (outline) do PDF."""
+
+    _ZEROSIZE = True
+
+    def __init__(self, title: str, key: str):
+        super().__init__()
+        self.title = title
+        self.key = key
+
+    def wrap(self, availWidth, availHeight):
+        return 0, 0
+
+    def draw(self):
+        self.canv.bookmarkPage(self.key)
+        self.canv.addOutlineEntry(self.title, self.key, level=0)
+        self.canv.showOutline()
+
+
+def outline_title(dados: Dict[str, Any]) -> str:
+    """
+    Título do extrato no sumário do PDF: "NS/BM 1429240". É o mesmo formato
+    das seções do AnexoIncremental, que refaz o sumário a partir do manifesto.
+    """
+    return f"NS/BM {dados['nsbm']}"
+
+
+_A85_LOCK = threading.Lock()
+_A85_DESLIGADO = 0
+_A85_ANTERIOR = None
+
+
+@contextmanager
+def _streams_sem_a85():
+    """
+    Desliga o ASCII85 dos streams do reportlab (Flate puro, ~25% menor) durante
+    o build. A opção é global (rl_config), então o contador mantém desligado
+    enquanto houver algum build compacto em andamento em outra thread; ao sair
+    o último, o valor que estava configurado antes é restaurado.
+    """
+    global _A85_DESLIGADO, _A85_ANTERIOR
+    with _A85_LOCK:
+        if not _A85_DESLIGADO:
+            _A85_ANTERIOR = rl_config.useA85
+            rl_config.useA85 = 0
+        _A85_DESLIGADO += 1
+    try:
+        yield
+    finally:
+        with _A85_LOCK:
+            _A85_DESLIGADO -= 1
+            if not _A85_DESLIGADO:
+                rl_config.useA85 = _A85_ANTERIOR
+
+
+_RENDERERS: Dict[Tuple[int, str, bool], ExtratoRenderer] = {}
+
+
+def get_renderer(max_cols: int = 92, mode: str = "platypus", compact: bool = False) -> ExtratoRenderer:
+    """Renderer compartilhado por largura de tela e modo (estilos montados uma vez por processo)."""
+    chave = (max_cols, mode, compact)
+    renderer = _RENDERERS.get(chave)
+    if renderer is None:
+        renderer = _RENDERERS[chave] = ExtratoRenderer(max_cols=max_cols, mode=mode, compact=compact)
+    return renderer
+
+
+def carimbar(data: bytes, generated_dt: Optional[datetime] = None) -> bytes:
+    """
+    Troca CARIMBO_CACHE pela data/hora de geração (agora, por padrão) num PDF
+    renderizado com carimbo=False. O cabeçalho fica num form XObject
+    compartilhado pelas páginas (header_footer): só esse stream é reescrito.
+    """
+    antigo = f"Gerado em {CARIMBO_CACHE}".encode("latin-1")
+    novo = f"Gerado em {(generated_dt or datetime.now()).strftime('%d/%m/%Y %H:%M')}".encode("latin-1")
+    writer = PdfWriter(clone_from=io.BytesIO(data))
+    vistos = set()
+    for page in writer.pages:
+        xobjetos = page.get("/Resources", {}).get("/XObject", {})
+        for nome in xobjetos:
+            ref = xobjetos.raw_get(nome)
+            chave = getattr(ref, "idnum", id(ref))
+            if chave in vistos:
+                continue
+            vistos.add(chave)
+            xobj = xobjetos[nome]
+            if xobj.get("/Subtype") != "/Form":
+                continue
+            conteudo = xobj.get_data()
+            if antigo in conteudo:
+                # o stream volta só com Flate (o modo normal usa ASCII85 + Flate)
+                xobj[NameObject("/Filter")] = NameObject("/FlateDecode")
+                xobj.pop("/DecodeParms", None)
+                xobj.set_data(conteudo.replace(antigo, novo))
+    buf = io.BytesIO()
+    writer.write(buf)
+    return buf.getvalue()
+
+
+class RenderCache:
+    """
+    Cache de PDFs de extrato endereçado pelo conteúdo (ExtratoRenderer.cache_key).
+
+    Cada PDF fica em `<diretorio>/<hash>.pdf`. O acesso atualiza o mtime do
+    arquivo, que serve de ordem LRU (inclusive entre execuções). O limite de
+    `limite_bytes` é conferido pelo conteúdo do diretório (varrido depois de
+    cada ~1/20 do limite gravado), e não por contadores do processo: vale
+    também com vários processos (pool) gravando no mesmo diretório. Os PDFs do cache guardam CARIMBO_CACHE no
+    lugar do "Gerado em"; quem entrega o PDF troca pela data/hora da entrega
+    (carimbar), então o cache não muda o que o usuário recebe.
+    """
+
+    VERSAO = 4  # incrementar quando o layout do PDF mudar
+
+    def __init__(self, diretorio: str | Path, limite_bytes: int = 256 * 1024 * 1024):
+        self.diretorio = Path(diretorio)
+        self.diretorio.mkdir(parents=True, exist_ok=True)
+        self.limite_bytes = limite_bytes
+        self._lock = threading.Lock()
+        # bytes gravados por este processo desde a última varredura; começa
+        # no limite para a primeira gravação já conferir o diretório
+        self._desde_varredura = limite_bytes
+
+    def _path(self, key: str) -> Path:
+        return self.diretorio / f"{key}.pdf"
+
+    def get(self, key: str, destino: str | Path) -> bool:
+        """Copia o PDF em cache para `destino`. Devolve False se não houver."""
+        path = self._path(key)
+        try:
+            shutil.copyfile(path, destino)
+        except FileNotFoundError:
+            return False  # nunca gravado ou removido pelo _evict de outro processo
+        self._tocar(path)
+        return True
+
+    def read(self, key: str) -> Optional[bytes]:
+        """Conteúdo do PDF em cache, ou None."""
+        path = self._path(key)
+        try:
+            data = path.read_bytes()
+        except FileNotFoundError:
+            return None  # nunca gravado ou removido pelo _evict de outro processo
+        self._tocar(path)
+        return data
+
+    @staticmethod
+    def _tocar(path: Path) -> None:
+        """Atualiza o mtime (ordem LRU); o arquivo pode ter sido removido nesse meio-tempo."""
+        try:
+            os.utime(path)
+        except FileNotFoundError:
+            pass
+
+    def _tmp(self, path: Path) -> Path:
+        return path.with_name(f"{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+
+    def put(self, key: str, origem: str | Path) -> None:
+        path = self._path(key)
+        tmp = self._tmp(path)
+        shutil.copyfile(origem, tmp)
+        os.replace(tmp, path)
+        self._gravado(path.stat().st_size)
+
+    def write(self, key: str, data: bytes) -> None:
+        path = self._path(key)
+        tmp = self._tmp(path)
+        tmp.write_bytes(data)
+        os.replace(tmp, path)
+        self._gravado(len(data))
+
+    def _gravado(self, tamanho: int) -> None:
+        # Varre o diretório a cada ~1/20 do limite gravado por este processo, e
+        # não a cada gravação: com N processos o diretório passa do limite em
+        # no máximo N/20 dele antes de uma varredura
+        with self._lock:
+            self._desde_varredura += tamanho
+            if self._desde_varredura < self.limite_bytes // 20:
+                return
+            self._desde_varredura = 0
+        self._evict()
+
+    def _evict(self):
+        """
+        Remove os PDFs usados há mais tempo até o diretório caber no limite.
+
+        Outros processos podem estar gravando, lendo ou removendo ao mesmo
+        tempo (sem trava entre processos): arquivos que somem no meio são
+        ignorados, e os gravados/acessados depois do início da varredura
+        ficam, para não apagar um PDF que outro processo acabou de gravar.
+        """
+        inicio = time.time_ns()
+        arquivos = []
+        with os.scandir(self.diretorio) as it:
+            for e in it:
+                if e.name.endswith(".pdf"):
+                    try:
+                        st = e.stat()
+                    except FileNotFoundError:
+                        continue  # removido por outro processo
+                    arquivos.append((st.st_mtime_ns, st.st_size, e.path))
+        tamanho = sum(a[1] for a in arquivos)
+        if tamanho <= self.limite_bytes:
+            return
+        arquivos.sort()
+        for mtime, tam, path in arquivos:
+            if mtime >= inicio:
+                break  # daqui em diante, tudo é mais novo que a varredura
+            try:
+                os.unlink(path)
+            except FileNotFoundError:
+                pass  # outro processo removeu antes
+            tamanho -= tam
+            if tamanho <= self.limite_bytes:
+                break
+
+
+_RENDER_CACHE: Optional[RenderCache] = None
+
+
+def get_render_cache() -> Optional[RenderCache]:
+    """
+    Cache padrão do processo (opcional), configurado por variáveis de ambiente:
+      CACHE_EXTRATOS_DIR (ex.: ./.cache_extratos; vazio ou ausente = sem cache)
+      CACHE_EXTRATOS_MB  (padrão 256)
+    """
+    global _RENDER_CACHE
+    if _RENDER_CACHE is None:
+        diretorio = os.getenv("CACHE_EXTRATOS_DIR", "")
+        if not diretorio:
+            return None
+        try:
+            limite_mb = float(os.getenv("CACHE_EXTRATOS_MB", "256"))
+        except ValueError:
+            limite_mb = 256.0
+        _RENDER_CACHE = RenderCache(diretorio, int(limite_mb * 1024 * 1024))
+    return _RENDER_CACHE
 
 
 def generate_pdf_from_screens(
@@ -261,6 +947,9 @@ def generate_pdf_from_screens(
     output_dir: str | Path,
     nsbm_override: Optional[str] = None,
     max_cols: int = 92,
+    render_mode: str = "platypus",
+    use_cache: bool = True,
+    compact: bool = False,
 ) -> Path:
     """
     Entrada:
@@ -275,147 +964,207 @@ def generate_pdf_from_screens(
       1) IP  -> Tela IP
       2) DB  -> Tela DB
       3) FU  -> Tela FU + Tela FU 2
-    """
-    output_dir = Path(output_dir)
-    output_dir.mkdir(parents=True, exist_ok=True)
-
-    # Normaliza + formata como terminal (colunas fixas)
-    screens_norm: Dict[str, str] = {}
-    for k, v in screens.items():
-        txt = normalize_screen_text(v)
-        txt = format_terminal_text(txt, max_cols=max_cols)
-        screens_norm[k] = txt
 
-    nsbm = nsbm_override or derive_nsbm_from_any_screen(screens_norm) or "SEM_REFERENCIA"
-    sigp_dt = extract_sigp_datetime(screens_norm)
-    servidor, unidade = extract_servidor_unidade(screens_norm)
+    render_mode:
+      "platypus" -> layout com flowables (Preformatted dentro de Table)
+      "canvas"   -> desenho direto no canvas com coordenadas pré-calculadas
+                    (mesmo resultado visual, bem mais rápido em lote)
 
-    title = "EXTRATO DB FU IP"
+    use_cache:
+      reaproveita o PDF já renderizado para as mesmas telas normalizadas e
+      mascaradas e os mesmos parâmetros, se o cache estiver configurado
+      (CACHE_EXTRATOS_DIR; ver RenderCache / get_render_cache)
 
-    # Timestamp no nome: preferir data/hora da captura (SIGP); fallback para agora
-    base_dt = sigp_dt if sigp_dt else datetime.now()
-    timestamp = base_dt.strftime("%Y-%m-%d_%H-%M-%S")
-    filename = f"EXTRATO DB FU IP _ {nsbm} _ {timestamp}.pdf"
-    out_path = Path(output_dir) / filename
+    compact:
+      streams só com Flate (sem ASCII85) e compressão de página explícita,
+      para reduzir o que vai para o SEI
+    """
+    cache = get_render_cache() if use_cache else None
+    return get_renderer(max_cols, render_mode, compact).render(
+        screens, output_dir, nsbm_override=nsbm_override, cache=cache
+    )
 
-    styles = getSampleStyleSheet()
 
-    title_style = ParagraphStyle(
-        "TitleCenter",
-        parent=styles["Title"],
-        alignment=TA_CENTER,
-        spaceAfter=8,
+def generate_pdf_bytes(
+    screens: Dict[str, str],
+    nsbm_override: Optional[str] = None,
+    max_cols: int = 92,
+    render_mode: str = "platypus",
+    use_cache: bool = False,
+    compact: bool = False,
+) -> Tuple[str, bytes]:
+    """
+    Como generate_pdf_from_screens, mas renderiza num buffer em memória:
+    devolve (nome sugerido do arquivo, bytes do PDF) para upload ou resposta
+    HTTP sem passar pelo disco. Por isso o RenderCache (em disco) só é usado
+    com use_cache=True explícito.
+    """
+    cache = get_render_cache() if use_cache else None
+    return get_renderer(max_cols, render_mode, compact).render_bytes(
+        screens, nsbm_override=nsbm_override, cache=cache
     )
 
-    h_style = ParagraphStyle(
-        "Heading2Tight",
-        parent=styles["Heading2"],
-        spaceBefore=10,
-        spaceAfter=6,
-    )
 
-    # Mono: ajuste para caber melhor em A4
-    mono_style = ParagraphStyle(
-        "Mono",
-        parent=styles["Code"],
-        fontName="Courier",
-        fontSize=8.0,
-        leading=9.5,
+def generate_pdf_batch(
+    screens_list: Iterable[Dict[str, str]],
+    output_path: str | Path,
+    nsbm_overrides: Optional[Iterable[Optional[str]]] = None,
+    max_cols: int = 92,
+    render_mode: str = "platypus",
+    compact: bool = False,
+) -> Path:
+    """
+    Gera o Anexo com vários extratos num único build, com uma seção e uma
+    entrada de sumário por NS/BM (sem PDFs intermediários nem merge).
+    """
+    return get_renderer(max_cols, render_mode, compact).render_batch(
+        screens_list, output_path, nsbm_overrides=nsbm_overrides
     )
 
-    doc = SimpleDocTemplate(
-        str(out_path),
-        pagesize=A4,
-        leftMargin=18 * mm,
-        rightMargin=18 * mm,
-        topMargin=18 * mm,
-        bottomMargin=16 * mm,
-        title=title,
-    )
 
-    generated_dt = datetime.now()
+def _render_worker(args: Tuple[Dict[str, str], Optional[str], int, str, bool, bool]) -> Tuple[str, bytes]:
+    screens, nsbm_override, max_cols, render_mode, compact, use_cache = args
+    return generate_pdf_bytes(
+        screens,
+        nsbm_override=nsbm_override,
+        max_cols=max_cols,
+        render_mode=render_mode,
+        use_cache=use_cache,
+        compact=compact,
+    )
 
-    story: List[Any] = []
-    story.append(Paragraph(title, title_style))
 
-    # Metadados (SEM “Observação”)
-    meta_rows = [
-        ["Data/Hora da Captura (referência)", sigp_dt.strftime("%d/%m/%Y %H:%M") if sigp_dt else "-"],
-        ["NS/BM (referência)", nsbm],
-        ["Servidor (SIGP)", servidor or "-"],
-        ["Unidade", unidade or "-"],
+def _nome_unico(nome: str, usados: set) -> str:
+    """Nome ainda não usado no lote: repetições ganham sufixo "_ 2", "_ 3"..."""
+    if nome not in usados:
+        usados.add(nome)
+        return nome
+    base, ext = os.path.splitext(nome)
+    n = 2
+    while f"{base} _ {n}{ext}" in usados:
+        n += 1
+    nome = f"{base} _ {n}{ext}"
+    usados.add(nome)
+    return nome
+
+
+def generate_pdfs_parallel(
+    screens_list: Iterable[Dict[str, str]],
+    output_dir: str | Path | None,
+    nsbm_overrides: Optional[Iterable[Optional[str]]] = None,
+    max_cols: int = 92,
+    render_mode: str = "platypus",
+    max_workers: Optional[int] = None,
+    compact: bool = False,
+) -> List[Path] | List[Tuple[str, bytes]]:
+    """
+    Gera um PDF por extrato (como generate_pdf_from_screens) distribuindo o
+    lote entre processos, e devolve os caminhos na mesma ordem da entrada.
+    Com output_dir=None, os PDFs voltam em memória, como em generate_pdf_bytes:
+    lista de (nome sugerido, bytes).
+
+    Os processos só renderizam; quem grava em output_dir é o processo
+    principal, na ordem da entrada. O nome vem do NS/BM e da data/hora da
+    captura, então extratos repetidos no lote (mesma captura duas vezes)
+    teriam o mesmo nome: a partir da segunda ocorrência o nome ganha o
+    sufixo "_ 2", "_ 3"... em vez de um sobrescrever o outro.
+
+    O layout do reportlab é limitado por CPU, então threads não ajudam; cada
+    processo monta seus próprios estilos uma vez (get_renderer). Com
+    max_workers=1 (ou um único extrato) roda no próprio processo.
+    """
+    screens_list = list(screens_list)
+    overrides = list(nsbm_overrides) if nsbm_overrides is not None else [None] * len(screens_list)
+    if len(overrides) != len(screens_list):
+        raise ValueError("nsbm_overrides deve ter o mesmo tamanho de screens_list")
+
+    # Mesmo cache de generate_pdf_from_screens quando o destino é o disco
+    use_cache = output_dir is not None
+    tarefas = [
+        (screens, ns, max_cols, render_mode, compact, use_cache)
+        for screens, ns in zip(screens_list, overrides)
     ]
-
-    meta_table = Table(meta_rows, colWidths=[65 * mm, 105 * mm])
-    meta_table.setStyle(
-        TableStyle(
-            [
-                ("FONT", (0, 0), (-1, -1), "Helvetica", 9),
-                ("VALIGN", (0, 0), (-1, -1), "TOP"),
-                ("LINEBELOW", (0, 0), (-1, -1), 0.25, colors.lightgrey),
-                ("BACKGROUND", (0, 0), (0, -1), colors.whitesmoke),
-                ("LEFTPADDING", (0, 0), (-1, -1), 6),
-                ("RIGHTPADDING", (0, 0), (-1, -1), 6),
-                ("TOPPADDING", (0, 0), (-1, -1), 4),
-                ("BOTTOMPADDING", (0, 0), (-1, -1), 4),
-            ]
+    if output_dir is not None:
+        output_dir = Path(output_dir)
+        output_dir.mkdir(parents=True, exist_ok=True)
+
+    def coletar(resultados: Iterable[Tuple[str, bytes]]):
+        usados: set = set()
+        saida = []
+        for nome, data in resultados:
+            nome = _nome_unico(nome, usados)
+            if output_dir is None:
+                saida.append((nome, data))
+            else:
+                path = output_dir / nome
+                path.write_bytes(data)
+                saida.append(path)
+        return saida
+
+    max_workers = max_workers or os.cpu_count() or 1
+    if max_workers == 1 or len(tarefas) <= 1:
+        return coletar(_render_worker(t) for t in tarefas)
+
+    # Lotes por processo para diluir o custo de enviar as telas (pickle)
+    chunksize = max(1, len(tarefas) // (max_workers * 4))
+    with ProcessPoolExecutor(max_workers=max_workers) as pool:
+        return coletar(pool.map(_render_worker, tarefas, chunksize=chunksize))
+
+
+@dataclass
+class RelatorioTamanho:
+    arquivo: Path
+    antes: int
+    depois: int
+
+    @property
+    def economia(self) -> float:
+        return 1 - self.depois / self.antes if self.antes else 0.0
+
+    def __str__(self) -> str:
+        return (
+            f"{self.arquivo.name}: {self.antes / 1024:.0f} KiB -> {self.depois / 1024:.0f} KiB "
+            f"({self.economia:.0%} menor)"
         )
-    )
-    story.append(meta_table)
-    story.append(Spacer(1, 10))
 
-    # ===== Seções obedecendo exatamente os keys =====
-    
-    # 1) DB
-    story.append(Paragraph("1) DB - Dados Basicos", h_style))
-    db_text = screens_norm.get("Tela DB", "")
-    if db_text.strip():
-        _screen_box(story, "Tela DB", db_text, mono_style)
-    else:
-        story.append(Paragraph("Conteúdo 'Tela DB' não encontrado no dicionário.", styles["Italic"]))
-        story.append(Spacer(1, 8))
 
-    # 2) FU (Tela 1)
-    story.append(Paragraph("2) FU - Cargos/Funcoes/Encargos Tela FU", h_style))
-    fu_text = screens_norm.get("Tela FU", "")
-    if fu_text.strip():
-        _screen_box(story, "Tela FU", fu_text, mono_style)
-    else:
-        story.append(Paragraph("Conteúdo 'Tela FU' não encontrado no dicionário.", styles["Italic"]))
-        story.append(Spacer(1, 8))
+def compact_writer(writer: PdfWriter) -> None:
+    """
+    Recomprime os content streams (Flate, sem ASCII85) e unifica objetos
+    idênticos: cada extrato traz suas próprias fontes/recursos, que no Anexo
+    mesclado passam a existir uma vez só.
+    """
+    for page in writer.pages:
+        page.compress_content_streams()
+    writer.compress_identical_objects(remove_identicals=True, remove_orphans=True)
 
-    # 3) IP
-    story.append(Paragraph("3) IP - Informacao de Pagamento", h_style))
-    ip_text = screens_norm.get("Tela IP", "")
-    if ip_text.strip():
-        _screen_box(story, "Tela IP", ip_text, mono_style)
-    else:
-        story.append(Paragraph("Conteúdo 'Tela IP' não encontrado no dicionário.", styles["Italic"]))
-        story.append(Spacer(1, 8))
 
-    # 4) FU (Tela 2)
-    story.append(Paragraph("4) FU - Cargos/Funcoes/Encargos Tela FU 2", h_style))
-    fu2_text = screens_norm.get("Tela FU 2", "")
-    if fu2_text.strip():
-        _screen_box(story, "Tela FU 2", fu2_text, mono_style)
-    else:
-        story.append(Paragraph("Conteúdo 'Tela FU 2' não encontrado no dicionário.", styles["Italic"]))
-        story.append(Spacer(1, 8))
+def compact_pdf(path: str | Path, output_path: str | Path | None = None) -> RelatorioTamanho:
+    """Reescreve um PDF já gerado em modo compacto (no lugar, se output_path não for dado)."""
+    path = Path(path)
+    output_path = Path(output_path) if output_path else path
+    antes = path.stat().st_size
 
-    doc.build(
-        story,
-        onFirstPage=lambda c, d: header_footer(c, d, title, generated_dt),
-        onLaterPages=lambda c, d: header_footer(c, d, title, generated_dt),
-    )
+    writer = PdfWriter(clone_from=path)
+    compact_writer(writer)
 
-    return out_path
+    tmp = output_path.with_name(output_path.name + ".tmp")
+    with open(tmp, "wb") as f_out:
+        writer.write(f_out)
+    os.replace(tmp, output_path)
+    return RelatorioTamanho(output_path, antes, output_path.stat().st_size)
 
 
-def merge_pdfs_in_folder(source_folder: str | Path, output_filename: str = "Anexo EXTRATO DB FU IP.pdf"):
+def merge_pdfs_in_folder(
+    source_folder: str | Path,
+    output_filename: str = "Anexo EXTRATO DB FU IP.pdf",
+    compact: bool = True,
+):
     """
     Mescla todos os PDFs da pasta source_folder que terminam com .pdf 
     (exceto o próprio arquivo de saída se ele já existir lá)
     e salva como output_filename nessa mesma pasta.
+    Com compact, remove fontes/objetos duplicados e informa o tamanho final.
     """
     source_path = Path(source_folder)
     writer = PdfWriter()
@@ -443,11 +1192,15 @@ def merge_pdfs_in_folder(source_folder: str | Path, output_filename: str = "Anex
         except Exception as e:
             print(f" X Erro ao adicionar {pdf_file.name}: {e}")
 
+    if compact:
+        compact_writer(writer)
+
     output_path = source_path / output_filename
     try:
         with open(output_path, "wb") as f_out:
             writer.write(f_out)
         print(f"PDF Unificado gerado com sucesso: {output_path}")
+        print(RelatorioTamanho(output_path, sum(f.stat().st_size for f in pdf_files), output_path.stat().st_size))
     except Exception as e:
         print(f"Erro ao salvar PDF unificado: {e}")
 
@@ -0,0 +1,322 @@
+"""
+Arquivo compactado de telas capturadas do SIGP (.sgpa).
+
+Guarda as telas brutas (como saem de `get_tela_atual`) para reprocessar ou
+regerar extratos sem voltar ao mainframe.
+
+Formato:
+    MAGIC
+    quadro | quadro | ...                  (cabeçalho + payload, um por captura)
+    quadro de trailer                      (JSON comprimido: tabela de linhas + índice)
+    offset do trailer (8 bytes) | tamanho (8 bytes) | MAGIC_FIM
+
+- Quadro: "SGPF", tipo (registro/trailer), tamanho e CRC32 do payload. O
+  payload de um registro é 1 byte de codec + JSON comprimido com NS, data,
+  as linhas novas desta captura e os ids das linhas de cada tela.
+- Deduplicação: cada linha distinta (cabeçalhos "SISTEMAGESTODEPESSOAS",
+  rodapés "PF1- HELP", rótulos de campos...) entra uma única vez, no
+  primeiro registro em que aparece; os ids seguem a ordem de entrada.
+- Acréscimo: novos quadros vão depois dos dados existentes (o trailer antigo
+  fica para trás, sem uso) e um trailer novo é gravado no close(). Um
+  arquivo sem trailer válido (processo interrompido antes do close) é
+  recuperado percorrendo os quadros até o último íntegro.
+- Compressão: codecs da biblioteca padrão (zlib, bz2, lzma).
+- Leitura: o arquivo é mapeado com mmap; o índice por NS/BM e por data de
+  captura permite descomprimir só o registro pedido.
+"""
+
+from __future__ import annotations
+
+import bisect
+import bz2
+import json
+import logging
+import lzma
+import mmap
+import os
+import struct
+import zlib
+from dataclasses import dataclass
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Iterator, List, Mapping, Optional
+
+from screen_metadata import extract_metadata
+
+MAGIC = b"SGPA2\n"
+MAGIC_FIM = b"SGPAEND2"
+RODAPE = struct.Struct("<QQ8s")
+QUADRO = struct.Struct("<4sBII")  # marca, tipo, tamanho do payload, crc32
+MARCA_QUADRO = b"SGPF"
+TIPO_REGISTRO = 0
+TIPO_TRAILER = 1
+
+CODECS = {
+    "zlib": (0, lambda b: zlib.compress(b, 6), zlib.decompress),
+    "bz2": (1, bz2.compress, bz2.decompress),
+    "lzma": (2, lzma.compress, lzma.decompress),
+}
+DESCOMPRESSORES = {cid: dec for cid, _, dec in CODECS.values()}
+
+
+class ArquivoTelasError(Exception):
+    """Arquivo .sgpa inválido ou corrompido."""
+
+
+@dataclass
+class CapturaArquivada:
+    ns: str
+    capturado_em: Optional[datetime]
+    telas: Dict[str, str]
+
+
+@dataclass
+class _Entrada:
+    ns: str
+    capturado_em: Optional[str]  # ISO 8601
+    offset: int  # início do payload do registro
+    tamanho: int
+
+
+def _descomprimir_registro(bruto: bytes) -> dict:
+    return json.loads(DESCOMPRESSORES[bruto[0]](bruto[1:]))
+
+
+def _ler_trailer(mm) -> Optional[tuple[List[str], List[_Entrada]]]:
+    """Tabela de linhas e índice do trailer no fim do arquivo, ou None se não houver um válido."""
+    if len(mm) < len(MAGIC) + QUADRO.size + RODAPE.size:
+        return None
+    offset, tamanho, magic_fim = RODAPE.unpack(mm[len(mm) - RODAPE.size:])
+    if magic_fim != MAGIC_FIM or offset + tamanho != len(mm) - RODAPE.size:
+        return None
+    trailer = mm[offset: offset + tamanho]
+    try:
+        dados = json.loads(zlib.decompress(trailer))
+    except (ValueError, zlib.error):
+        return None
+    return dados["linhas"], [_Entrada(*e) for e in dados["indice"]]
+
+
+def _varrer_quadros(mm) -> tuple[List[str], List[_Entrada], int]:
+    """
+    Recupera linhas e índice lendo os quadros em sequência; devolve também
+    onde termina o último quadro íntegro (o resto é uma gravação incompleta).
+    """
+    linhas: List[str] = []
+    entradas: List[_Entrada] = []
+    pos = fim_valido = len(MAGIC)
+    while pos + QUADRO.size <= len(mm):
+        marca, tipo, tamanho, crc = QUADRO.unpack(mm[pos: pos + QUADRO.size])
+        inicio = pos + QUADRO.size
+        payload = mm[inicio: inicio + tamanho]
+        if marca != MARCA_QUADRO or len(payload) != tamanho or zlib.crc32(payload) != crc:
+            break
+        pos = inicio + tamanho
+        if tipo == TIPO_TRAILER:
+            pos += RODAPE.size  # o rodapé vem colado no trailer
+        else:
+            try:
+                registro = _descomprimir_registro(payload)
+            except (KeyError, ValueError, zlib.error, lzma.LZMAError, OSError):
+                break
+            linhas.extend(registro["novas"])
+            entradas.append(_Entrada(registro["ns"], registro["em"], inicio, tamanho))
+        fim_valido = min(pos, len(mm))
+    return linhas, entradas, fim_valido
+
+
+def _carregar(mm, path: Path) -> tuple[List[str], List[_Entrada], int]:
+    """(linhas, índice, fim dos dados) pelo trailer, ou varrendo os quadros se ele faltar."""
+    if len(mm) < len(MAGIC) or mm[: len(MAGIC)] != MAGIC:
+        raise ArquivoTelasError(f"{path}: arquivo de telas inválido (cabeçalho).")
+    lidos = _ler_trailer(mm)
+    if lidos is not None:
+        return lidos[0], lidos[1], len(mm)
+    linhas, entradas, fim = _varrer_quadros(mm)
+    logging.warning(f"{path}: sem trailer válido; {len(entradas)} capturas recuperadas dos quadros.")
+    return linhas, entradas, fim
+
+
+class ScreenArchiveWriter:
+    """
+    Escreve (ou acrescenta a) um arquivo .sgpa. Use como context manager:
+
+        with ScreenArchiveWriter("capturas.sgpa") as arq:
+            arq.add(dicio_tela, ns="1429240")
+
+    Cada captura é gravada (e enviada ao sistema operacional) no add(); o
+    close() só grava o trailer que acelera a abertura.
+    """
+
+    def __init__(self, path: str | Path, codec: str = "zlib") -> None:
+        if codec not in CODECS:
+            raise ValueError(f"Codec '{codec}' não suportado. Use um de: {', '.join(CODECS)}")
+        self.path = Path(path)
+        self.codec_id, self._comprimir, _ = CODECS[codec]
+
+        self.linhas: List[str] = []
+        self._ids: Dict[str, int] = {}
+        self.entradas: List[_Entrada] = []
+
+        if self.path.exists() and self.path.stat().st_size > 0:
+            self._f = open(self.path, "r+b")
+            with mmap.mmap(self._f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                self.linhas, self.entradas, fim = _carregar(mm, self.path)
+            self._ids = {linha: i for i, linha in enumerate(self.linhas)}
+            # Só uma gravação incompleta (após o último quadro íntegro) é descartada
+            self._f.truncate(fim)
+            self._f.seek(fim)
+        else:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self._f = open(self.path, "w+b")
+            self._f.write(MAGIC)
+
+    def _escrever_quadro(self, tipo: int, payload: bytes) -> int:
+        """Grava um quadro e devolve o offset do payload."""
+        self._f.write(QUADRO.pack(MARCA_QUADRO, tipo, len(payload), zlib.crc32(payload)))
+        offset = self._f.tell()
+        self._f.write(payload)
+        return offset
+
+    def add(
+        self,
+        screens: Mapping[str, str],
+        ns: Optional[str] = None,
+        capturado_em: Optional[datetime] = None,
+    ) -> None:
+        """Acrescenta uma captura. NS e data/hora são lidos das telas se não informados."""
+        if not ns or not capturado_em:
+            meta = extract_metadata(screens)
+            ns = ns or meta.nsbm or "SEM_REFERENCIA"
+            capturado_em = capturado_em or meta.sigp_dt
+
+        primeira_nova = len(self.linhas)
+        telas = {}
+        for nome, texto in screens.items():
+            ids = []
+            for linha in (texto or "").split("\n"):
+                i = self._ids.get(linha)
+                if i is None:
+                    i = self._ids[linha] = len(self.linhas)
+                    self.linhas.append(linha)
+                ids.append(i)
+            telas[nome] = ids
+
+        em = capturado_em.isoformat() if capturado_em else None
+        registro = {"ns": ns, "em": em, "novas": self.linhas[primeira_nova:], "telas": telas}
+        payload = bytes([self.codec_id]) + self._comprimir(
+            json.dumps(registro, ensure_ascii=False, separators=(",", ":")).encode()
+        )
+        offset = self._escrever_quadro(TIPO_REGISTRO, payload)
+        self._f.flush()
+        self.entradas.append(_Entrada(ns, em, offset, len(payload)))
+
+    def close(self) -> None:
+        if self._f.closed:
+            return
+        trailer = zlib.compress(
+            json.dumps(
+                {"linhas": self.linhas, "indice": [list(vars(e).values()) for e in self.entradas]},
+                ensure_ascii=False,
+                separators=(",", ":"),
+            ).encode()
+        )
+        offset = self._escrever_quadro(TIPO_TRAILER, trailer)
+        self._f.write(RODAPE.pack(offset, len(trailer), MAGIC_FIM))
+        self._f.flush()
+        os.fsync(self._f.fileno())
+        self._f.close()
+
+    def __enter__(self) -> "ScreenArchiveWriter":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+class ScreenArchive:
+    """
+    Leitura com acesso aleatório (mmap) de um arquivo .sgpa.
+
+        arq = ScreenArchive("capturas.sgpa")
+        arq.ultima("1429240").telas   # dict pronto para generate_pdf_from_screens
+        arq.entre(datetime(2026, 2, 1), datetime(2026, 2, 28))
+    """
+
+    def __init__(self, path: str | Path) -> None:
+        self.path = Path(path)
+        try:
+            self._f = open(self.path, "rb")
+        except FileNotFoundError:
+            raise ArquivoTelasError(f"{self.path}: arquivo de telas não encontrado.") from None
+        try:
+            if os.fstat(self._f.fileno()).st_size == 0:
+                raise ArquivoTelasError(f"{self.path}: arquivo de telas vazio.")
+            self._mm = mmap.mmap(self._f.fileno(), 0, access=mmap.ACCESS_READ)
+            self.linhas, self.entradas, _ = _carregar(self._mm, self.path)
+        except BaseException:
+            if hasattr(self, "_mm"):
+                self._mm.close()
+            self._f.close()
+            raise
+
+        self._por_ns: Dict[str, List[int]] = {}
+        for i, e in enumerate(self.entradas):
+            self._por_ns.setdefault(e.ns, []).append(i)
+
+        # Índice temporal ordenado (capturas sem data ficam de fora)
+        datadas = sorted(
+            (e.capturado_em, i) for i, e in enumerate(self.entradas) if e.capturado_em
+        )
+        self._datas = [d for d, _ in datadas]
+        self._por_data = [i for _, i in datadas]
+
+    def __len__(self) -> int:
+        return len(self.entradas)
+
+    def __getitem__(self, i: int) -> CapturaArquivada:
+        e = self.entradas[i]
+        bruto = self._mm[e.offset: e.offset + e.tamanho]
+        try:
+            registro = _descomprimir_registro(bruto)["telas"]
+        except (KeyError, ValueError, zlib.error, lzma.LZMAError, OSError) as err:
+            raise ArquivoTelasError(f"Registro {i} corrompido: {err}") from err
+
+        linhas = self.linhas
+        telas = {nome: "\n".join(linhas[j] for j in ids) for nome, ids in registro.items()}
+        return CapturaArquivada(
+            e.ns,
+            datetime.fromisoformat(e.capturado_em) if e.capturado_em else None,
+            telas,
+        )
+
+    def __iter__(self) -> Iterator[CapturaArquivada]:
+        for i in range(len(self.entradas)):
+            yield self[i]
+
+    def ns_disponiveis(self) -> List[str]:
+        return list(self._por_ns)
+
+    def por_ns(self, ns: str) -> List[CapturaArquivada]:
+        """Todas as capturas de um NS/BM, na ordem em que foram gravadas."""
+        return [self[i] for i in self._por_ns.get(ns, [])]
+
+    def ultima(self, ns: str) -> Optional[CapturaArquivada]:
+        idx = self._por_ns.get(ns)
+        return self[idx[-1]] if idx else None
+
+    def entre(self, inicio: datetime, fim: datetime) -> List[CapturaArquivada]:
+        """Capturas com data/hora do SIGP em [inicio, fim], em ordem cronológica."""
+        lo = bisect.bisect_left(self._datas, inicio.isoformat())
+        hi = bisect.bisect_right(self._datas, fim.isoformat())
+        return [self[i] for i in self._por_data[lo:hi]]
+
+    def close(self) -> None:
+        self._mm.close()
+        self._f.close()
+
+    def __enter__(self) -> "ScreenArchive":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
@@ -0,0 +1,93 @@
+"""
+Metadados do cabeçalho das telas do SIGP, extraídos numa única passada.
+
+    SERVIDOR:142924-0-CAP     -QOBM      -CLEYTON ...   -> nsbm "1429240", servidor
+    UNIDADE :000009405-DLF/SDTS2 TELECOMUNICACOES ...   -> unidade
+    PRODEMGE06/02/2026 ... SIGP    10:20:07             -> sigp_dt
+
+Um único regex (alternação com grupos nomeados) percorre cada tela uma vez;
+a varredura para assim que todos os campos foram encontrados. Não depende do
+reportlab: serve para o PDF, para o arquivo de telas e para exportações.
+"""
+
+from __future__ import annotations
+
+import re
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Mapping, Optional
+
+_RE_CABECALHO = re.compile(
+    r"(?=[SUP])(?:"
+    # SERVIDOR: termina no fim da linha ou antes de um UNIDADE na mesma linha
+    # (lookahead, para o UNIDADE ainda ser encontrado pela varredura)
+    r"SERVIDOR:\s*(?P<servidor>.*?)(?=\s{2,}UNIDADE|$)"
+    r"|UNIDADE\s*:\s*(?P<unidade>.+)"
+    r"|PRODEMGE\s*0?(?P<data>\d{2}/\d{2}/\d{4})"
+    r"|\bSIGP\s+(?P<hora>\d{2}:\d{2}:\d{2})\b"
+    r")",
+    re.M,
+)
+_RE_NSBM = re.compile(r"(\d{3,})-(\d)\b")
+_RE_FIM_UNIDADE = re.compile(r"\s{3,}(?:DATA|NOME|NUM|OPCAO)")
+_RE_ESPACOS = re.compile(r"\s{2,}")
+
+
+@dataclass
+class ScreenMetadata:
+    nsbm: Optional[str] = None
+    sigp_dt: Optional[datetime] = None
+    servidor: Optional[str] = None
+    unidade: Optional[str] = None
+
+    def completo(self) -> bool:
+        return bool(self.nsbm and self.sigp_dt and self.servidor and self.unidade)
+
+
+def extract_metadata(screens: Mapping[str, str]) -> ScreenMetadata:
+    """
+    NS/BM, data/hora da captura, servidor e unidade das telas de um extrato.
+
+    Cada campo vem da primeira tela (na ordem do dicionário) em que aparece;
+    a data/hora exige PRODEMGE e SIGP na mesma tela.
+    """
+    meta = ScreenMetadata()
+
+    for txt in screens.values():
+        if not txt:
+            continue
+
+        data = hora = None
+        for m in _RE_CABECALHO.finditer(txt):
+            grupo = m.lastgroup
+
+            if grupo == "servidor":
+                raw = m.group("servidor").strip()
+                if meta.nsbm is None:
+                    m_ns = _RE_NSBM.match(raw)
+                    if m_ns:
+                        meta.nsbm = f"{m_ns.group(1)}{m_ns.group(2)}"
+                if meta.servidor is None and raw:
+                    meta.servidor = _RE_ESPACOS.sub(" ", raw).strip()
+
+            elif grupo == "unidade":
+                if meta.unidade is None:
+                    cut = _RE_FIM_UNIDADE.split(m.group("unidade").strip(), 1)[0]
+                    meta.unidade = _RE_ESPACOS.sub(" ", cut).strip()
+
+            elif grupo == "data":
+                if data is None:
+                    data = m.group("data")
+            elif hora is None:
+                hora = m.group("hora")
+
+            if meta.sigp_dt is None and data and hora:
+                try:
+                    meta.sigp_dt = datetime.strptime(f"{data} {hora}", "%d/%m/%Y %H:%M:%S")
+                except ValueError:
+                    data = hora = ""  # só a primeira data/hora de cada tela conta
+
+            if meta.completo():
+                return meta
+
+    return meta
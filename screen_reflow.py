@@ -0,0 +1,64 @@
+"""
+Reconstrução das linhas da tela 3270 a partir do texto capturado.
+
+`get_tela_atual` devolve a tela como linhas físicas de 80 colunas sem os
+espaços à direita. O conteúdo do SIGP, porém, é um fluxo contínuo: um campo
+que passa da coluna 80 continua no início da linha seguinte
+("...-C" + "LEYTON", "... C" + "HEFE"). Como a largura do terminal é
+conhecida, a quebra é determinística:
+
+    a linha i continua na linha i+1  <=>  len(linha_i.rstrip()) == 80
+                                          e linha_i+1 não começa com espaço
+
+Não há heurística por "letra solta" ou "linha quase cheia".
+"""
+
+from __future__ import annotations
+
+from typing import List
+
+COLUNAS_TERMINAL = 80
+
+
+def reflow_lines(text: str, max_cols: int = 92, cols: int = COLUNAS_TERMINAL) -> List[str]:
+    """
+    Linhas da tela com as palavras cortadas pela margem do terminal reunidas.
+
+    O pedaço que caiu na linha de baixo é anexado à linha de cima (que pode
+    passar de `cols`, até `max_cols`) e vira espaços na linha de baixo, sem
+    deslocar as demais colunas. Se o pedaço não couber em `max_cols`, as
+    duas linhas ficam como estão. Uma passada, sem cópias da lista.
+    """
+    text = (text or "").replace("\r\n", "\n").replace("\r", "\n").replace("\t", "    ")
+    lines = text.split("\n")
+    folga = max_cols - cols
+
+    for i in range(len(lines) - 1):
+        a = lines[i]
+        if len(a) < cols:
+            continue
+        a = a.rstrip()
+        b = lines[i + 1]
+        if len(a) != cols or not b or b[0] == " ":
+            continue
+
+        fim = b.find(" ")
+        if fim < 0:
+            fim = len(b)
+        if fim > folga:
+            continue
+
+        lines[i] = a + b[:fim]
+        lines[i + 1] = " " * fim + b[fim:]
+
+    return lines
+
+
+def unwrap_text(text: str, cols: int = COLUNAS_TERMINAL) -> str:
+    """
+    Fluxo contínuo da tela (linhas completadas até `cols` e concatenadas), para
+    busca de campos por regex: "PERCENTUAL" + "ADIC." volta a ser
+    "PERCENTUAL ADIC." quando o espaço da quebra foi aparado pelo rstrip.
+    """
+    text = (text or "").replace("\r\n", "\n").replace("\r", "\n")
+    return "".join(line.ljust(cols) for line in text.split("\n"))
@@ -0,0 +1,182 @@
+"""
+Cliente do protocolo "scriptport" do c3270/s3270.
+
+Cada comando enviado ao scriptport gera uma resposta em linhas terminadas por "\\n":
+
+    data: <linha 1>
+    data: <linha 2>
+    ...
+    <linha de status: 12 campos separados por espaço>
+    ok | error
+
+O leitor acumula os bytes num único bytearray e separa as linhas de forma
+incremental (cada byte é varrido uma vez), reconhecendo o terminador apenas
+quando uma linha inteira é exatamente "ok" ou "error". Assim telas que
+contenham "ok" no texto não encerram a leitura antes da hora.
+"""
+
+from __future__ import annotations
+
+import socket
+from dataclasses import dataclass, field
+from typing import List, Optional, Tuple
+
+DATA_PREFIX = b"data:"
+TERMINADOR_OK = b"ok"
+TERMINADOR_ERRO = b"error"
+
+# Tamanho do bloco lido do socket a cada recv_into
+CHUNK_SIZE = 64 * 1024
+
+
+class ScriptPortError(Exception):
+    """Falha de comunicação com o scriptport (conexão fechada antes do terminador)."""
+
+
+@dataclass
+class ScriptPortReply:
+    """
+    Resposta de um comando do scriptport.
+
+    As linhas de dados não são copiadas: `spans` guarda (início, fim) de cada
+    linha dentro de `buffer`, e `data_lines()` devolve memoryviews desse buffer.
+    """
+
+    buffer: bytearray
+    spans: List[Tuple[int, int]] = field(default_factory=list)
+    status: str = ""
+    ok: bool = False
+
+    def data_lines(self) -> List[memoryview]:
+        """Linhas de dados (sem o prefixo "data: "), como memoryviews do buffer."""
+        view = memoryview(self.buffer)
+        return [view[ini:fim] for ini, fim in self.spans]
+
+    def lines(self, encoding: str = "utf-8") -> List[str]:
+        """Linhas de dados decodificadas."""
+        buf = self.buffer
+        return [buf[ini:fim].decode(encoding, errors="ignore") for ini, fim in self.spans]
+
+    def text(self, encoding: str = "utf-8") -> str:
+        """Linhas de dados unidas por "\\n"."""
+        return "\n".join(self.lines(encoding))
+
+    def raw(self, encoding: str = "utf-8") -> str:
+        """Resposta completa como veio do socket (equivalente ao antigo send_command)."""
+        return self.buffer.decode(encoding, errors="ignore")
+
+    @property
+    def connected(self) -> bool:
+        """
+        Campo 4 da linha de status: "C(host)" quando conectado, "N" quando não.
+        """
+        campos = self.status.split()
+        return len(campos) >= 4 and campos[3].startswith("C(")
+
+
+class ReplyParser:
+    """
+    Parser incremental: recebe blocos com `feed()` e indica quando a resposta
+    terminou. Cada linha é analisada uma única vez, a partir de `_scan`.
+    """
+
+    def __init__(self) -> None:
+        self.buffer = bytearray()
+        self._scan = 0  # posição a partir da qual ainda não há linha completa
+        self._status: Optional[Tuple[int, int]] = None
+        self.reply = ScriptPortReply(self.buffer)
+        self.done = False
+
+    def feed(self, chunk: bytes | bytearray | memoryview) -> bool:
+        """Acrescenta bytes recebidos. Retorna True quando o terminador foi lido."""
+        if self.done:
+            return True
+
+        buf = self.buffer
+        buf += chunk
+
+        pos = self._scan
+        while True:
+            nl = buf.find(b"\n", pos)
+            if nl == -1:
+                break
+
+            end = nl
+            if end > pos and buf[end - 1] == 0x0D:  # tolera "\r\n"
+                end -= 1
+
+            self._handle_line(pos, end)
+            pos = nl + 1
+
+            if self.done:
+                break
+
+        self._scan = pos
+        return self.done
+
+    def _handle_line(self, ini: int, fim: int) -> None:
+        buf = self.buffer
+        tam = fim - ini
+
+        if buf.startswith(DATA_PREFIX, ini, fim):
+            ini += len(DATA_PREFIX)
+            if ini < fim and buf[ini] == 0x20:  # "data: " -> remove o espaço
+                ini += 1
+            self.reply.spans.append((ini, fim))
+            return
+
+        if tam == len(TERMINADOR_OK) and buf.startswith(TERMINADOR_OK, ini, fim):
+            self._finish(ok=True)
+            return
+
+        if tam == len(TERMINADOR_ERRO) and buf.startswith(TERMINADOR_ERRO, ini, fim):
+            self._finish(ok=False)
+            return
+
+        # Qualquer outra linha é a de status (a última antes do terminador vale)
+        self._status = (ini, fim)
+
+    def _finish(self, ok: bool) -> None:
+        self.done = True
+        self.reply.ok = ok
+        if self._status is not None:
+            ini, fim = self._status
+            self.reply.status = self.buffer[ini:fim].decode("ascii", errors="ignore")
+
+
+def parse_reply(data: bytes | bytearray) -> ScriptPortReply:
+    """Analisa uma resposta completa já lida (útil para testes e reprocessamento)."""
+    parser = ReplyParser()
+    parser.feed(data)
+    return parser.reply
+
+
+class ScriptPortClient:
+    """
+    Cliente do scriptport. Abre uma conexão por comando, como o c3270 espera
+    quando iniciado com `-scriptport <porta>`.
+    """
+
+    def __init__(self, porta: int = 5000, host: str = "localhost", timeout: float = 30) -> None:
+        self.porta = porta
+        self.host = host
+        self.timeout = timeout
+
+    def execute(self, command: str) -> ScriptPortReply:
+        """Envia o comando e lê a resposta até a linha "ok"/"error"."""
+        parser = ReplyParser()
+        chunk = bytearray(CHUNK_SIZE)
+        view = memoryview(chunk)
+
+        with socket.create_connection((self.host, self.porta), timeout=self.timeout) as sock:
+            sock.sendall((command + "\n").encode())
+            while True:
+                n = sock.recv_into(chunk)
+                if not n:
+                    break
+                if parser.feed(view[:n]):
+                    break
+
+        if not parser.done:
+            raise ScriptPortError(f"Conexão encerrada antes do terminador ({command!r}).")
+        return parser.reply
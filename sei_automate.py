@@ -179,8 +179,13 @@ def extrair_militares_relatorio(texto):
         num_militar = num_militar_match.group(1)
         resto = resto[num_militar_match.end():].strip()
         
-        # NOME e POSTO/GRAD (procura pelo posto/grad conhecido)
-        posto_grad_pattern = r'(Capitão|Tenente|Major|Coronel|1° Tenente|2° Tenente|Sargento|Cabo|Soldado|Subtenente|General)'
+        # NOME e POSTO/GRAD (procura pelo posto/grad conhecido), com o ordinal ou a
+        # classe quando o relatório traz ("1° Sargento", "Soldado 1ª Classe", "Tenente-Coronel")
+        posto_grad_pattern = (
+            r'((?:[1-3]\s*[°º]\s*)?(?:Tenente[\s-]+Coronel|Tenente|Sargento)'
+            r'|Soldado(?:\s+(?:de\s+)?[12]\s*[ªº°]?\s*Classe)?'
+            r'|Capitão|Major|Coronel|Cabo|Subtenente|Aspirante(?:\s+a\s+Oficial)?|General)'
+        )
         posto_match = re.search(posto_grad_pattern, resto)
         if not posto_match:
             continue
@@ -0,0 +1,227 @@
+"""
+Tabelas de diárias com vigência, lidas de arquivos JSON e recarregadas sem
+reiniciar o processo.
+
+Cada arquivo *.json do diretório (TABELAS_DIARIAS_DIR, padrão
+./tabelas_diarias) é uma versão:
+
+    {
+      "vigencia": "2026-03-01",
+      "descricao": "Reajuste de março/2026",
+      "valor_dia_por_graduacao": {"CEL": 684.24, ...},
+      "pisos_localidade": {"Capital": 470.0, "Município Especial": 362.0, "Demais Municípios": 258.0},
+      "municipios_especiais_mg": ["Alfenas", "Araxá", ...]
+    }
+
+A seção que faltar é herdada da versão anterior. "valor_dia_por_graduacao"
+é mesclado por graduação: um reajuste pode trazer só as graduações que
+mudaram ({"CEL": ..., "CAP": ...}) e as demais seguem com o valor anterior.
+"pisos_localidade" precisa ter exatamente as LOCALIDADES. Uma viagem usa a versão vigente na data de
+início: bisect sobre as vigências ordenadas, O(log n) por consulta.
+
+O diretório é verificado (nome, tamanho e mtime dos arquivos) no máximo a
+cada `intervalo` segundos, durante as consultas. Se mudou, as tabelas são
+relidas; um arquivo inválido é registrado no log e as tabelas anteriores
+continuam valendo.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import os
+import re
+import threading
+import time
+from bisect import bisect_right
+from dataclasses import dataclass
+from datetime import date, datetime
+from pathlib import Path
+from typing import Dict, FrozenSet, List, Optional, Tuple
+
+from municipios import dobrar
+
+SECOES = ("valor_dia_por_graduacao", "pisos_localidade", "municipios_especiais_mg")
+# Localidades de pisos_localidade, na ordem dos códigos do cálculo em lote
+LOCALIDADES: Tuple[str, ...] = ("Capital", "Município Especial", "Demais Municípios")
+_RE_CHAVE_GRAD = re.compile(r"^[A-Z0-9]+$")
+
+
+class TabelaError(ValueError):
+    pass
+
+
+@dataclass(frozen=True)
+class TabelaDiarias:
+    vigencia: date
+    valor_dia_por_graduacao: Dict[str, float]
+    pisos_localidade: Dict[str, float]
+    municipios_especiais_mg: FrozenSet[str]
+    descricao: str = ""
+    origem: str = ""
+
+
+def _data(valor) -> date:
+    if isinstance(valor, datetime):
+        return valor.date()
+    if isinstance(valor, date):
+        return valor
+    return date.fromisoformat(str(valor))
+
+
+def _valores(dados, secao: str, origem: str) -> Dict[str, float]:
+    if not isinstance(dados, dict) or not dados:
+        raise TabelaError(f"{origem}: {secao} deve ser um objeto não vazio")
+    saida = {}
+    for chave, valor in dados.items():
+        if isinstance(valor, bool) or not isinstance(valor, (int, float)) or valor <= 0:
+            raise TabelaError(f"{origem}: {secao}[{chave!r}] inválido ({valor!r})")
+        saida[str(chave)] = float(valor)
+    return saida
+
+
+def ler_versoes(diretorio: str | Path) -> List[TabelaDiarias]:
+    """Versões do diretório, em ordem de vigência, com as seções herdadas já resolvidas."""
+    brutas = []
+    for caminho in sorted(Path(diretorio).glob("*.json")):
+        try:
+            dados = json.loads(caminho.read_text(encoding="utf-8"))
+            vigencia = _data(dados["vigencia"])
+        except (OSError, ValueError, KeyError, TypeError) as e:
+            raise TabelaError(f"{caminho.name}: {e}") from e
+        brutas.append((vigencia, caminho.name, dados))
+    brutas.sort(key=lambda b: b[0])
+
+    versoes: List[TabelaDiarias] = []
+    for vigencia, origem, dados in brutas:
+        if versoes and versoes[-1].vigencia == vigencia:
+            raise TabelaError(f"{origem}: vigência {vigencia} repetida em {versoes[-1].origem}")
+        anterior = versoes[-1] if versoes else None
+        if anterior is None and any(s not in dados for s in SECOES):
+            raise TabelaError(f"{origem}: a primeira versão precisa de {', '.join(SECOES)}")
+
+        if "valor_dia_por_graduacao" in dados:
+            valor_dia = _valores(dados["valor_dia_por_graduacao"], "valor_dia_por_graduacao", origem)
+            invalidas = [k for k in valor_dia if not _RE_CHAVE_GRAD.match(k)]
+            if invalidas:
+                raise TabelaError(f"{origem}: chaves de graduação fora do padrão (ex.: 1TEN): {invalidas}")
+            if anterior is not None:
+                valor_dia = {**anterior.valor_dia_por_graduacao, **valor_dia}
+        else:
+            valor_dia = anterior.valor_dia_por_graduacao
+
+        pisos = (
+            _valores(dados["pisos_localidade"], "pisos_localidade", origem)
+            if "pisos_localidade" in dados
+            else anterior.pisos_localidade
+        )
+        if set(pisos) != set(LOCALIDADES):
+            raise TabelaError(
+                f"{origem}: pisos_localidade deve ter exatamente {', '.join(LOCALIDADES)} "
+                f"(recebido: {', '.join(pisos)})"
+            )
+
+        if "municipios_especiais_mg" in dados:
+            especiais = frozenset(dobrar(m) for m in dados["municipios_especiais_mg"])
+        else:
+            especiais = anterior.municipios_especiais_mg
+
+        versoes.append(
+            TabelaDiarias(
+                vigencia=vigencia,
+                valor_dia_por_graduacao=valor_dia,
+                pisos_localidade=pisos,
+                municipios_especiais_mg=especiais,
+                descricao=str(dados.get("descricao", "")),
+                origem=origem,
+            )
+        )
+    return versoes
+
+
+class TabelasVigentes:
+    """Versões de um diretório, com consulta por data e recarga automática."""
+
+    def __init__(self, diretorio: str | Path, intervalo: float = 2.0):
+        self.diretorio = Path(diretorio)
+        self.intervalo = intervalo
+        self._lock = threading.Lock()
+        self._assinatura: Optional[tuple] = None
+        self._proxima_verificacao = 0.0
+        # (vigências, versões) trocados juntos, numa única atribuição
+        self._estado: Tuple[Tuple[date, ...], Tuple[TabelaDiarias, ...]] = ((), ())
+        self.recarregar()
+
+    def _assinatura_atual(self) -> tuple:
+        with os.scandir(self.diretorio) as it:
+            return tuple(sorted(
+                (e.name, e.stat().st_mtime_ns, e.stat().st_size) for e in it if e.name.endswith(".json")
+            ))
+
+    def recarregar(self) -> bool:
+        """Relê o diretório se ele mudou; devolve True se as tabelas foram trocadas."""
+        with self._lock:
+            self._proxima_verificacao = time.monotonic() + self.intervalo
+            try:
+                assinatura = self._assinatura_atual()
+            except OSError:
+                # diretório removido/renomeado ou sem permissão: tenta de novo no próximo intervalo
+                if not self._estado[1]:
+                    raise
+                logging.exception(f"Falha ao ler {self.diretorio}; mantendo as tabelas anteriores")
+                return False
+            if assinatura == self._assinatura:
+                return False
+            try:
+                versoes = ler_versoes(self.diretorio)
+                if not versoes:
+                    raise TabelaError(f"nenhuma tabela em {self.diretorio}")
+            except (TabelaError, OSError):
+                if not self._estado[1]:
+                    raise
+                logging.exception("Tabelas de diárias inválidas; mantendo as anteriores")
+                self._assinatura = assinatura  # não tenta de novo até o próximo ajuste
+                return False
+            self._estado = (tuple(v.vigencia for v in versoes), tuple(versoes))
+            self._assinatura = assinatura
+            logging.info(f"Tabelas de diárias carregadas: {len(versoes)} versões de {self.diretorio}")
+            return True
+
+    def _verificar(self) -> None:
+        if time.monotonic() >= self._proxima_verificacao:
+            self.recarregar()
+
+    def versoes(self) -> Tuple[Tuple[date, ...], Tuple[TabelaDiarias, ...]]:
+        """(vigências, versões) atuais, coerentes entre si, para consultas em lote."""
+        self._verificar()
+        return self._estado
+
+    def vigente(self, data: date | datetime) -> TabelaDiarias:
+        vigencias, versoes = self.versoes()
+        i = bisect_right(vigencias, _data(data)) - 1
+        if i < 0:
+            raise LookupError(f"Nenhuma tabela de diárias vigente em {_data(data):%d/%m/%Y}")
+        return versoes[i]
+
+
+_TABELAS: Optional[TabelasVigentes] = None
+
+
+def get_tabelas() -> Optional[TabelasVigentes]:
+    """
+    Tabelas padrão do processo, configuradas por variáveis de ambiente:
+      TABELAS_DIARIAS_DIR      (padrão ./tabelas_diarias ao lado deste módulo;
+                                vazio ou inexistente usa as tabelas embutidas)
+      TABELAS_DIARIAS_INTERVALO (segundos entre verificações, padrão 2)
+    """
+    global _TABELAS
+    if _TABELAS is None:
+        diretorio = os.getenv("TABELAS_DIARIAS_DIR", str(Path(__file__).with_name("tabelas_diarias")))
+        if not diretorio or not Path(diretorio).is_dir():
+            return None
+        try:
+            intervalo = float(os.getenv("TABELAS_DIARIAS_INTERVALO", "2"))
+        except ValueError:
+            intervalo = 2.0
+        _TABELAS = TabelasVigentes(diretorio, intervalo)
+    return _TABELAS
@@ -0,0 +1,150 @@
+"""
+calcular_diarias_lote (colunas NumPy) x calcular_diarias (viagem a viagem):
+os resultados têm de ser idênticos, campo a campo.
+
+Cobre uma amostra aleatória com semente fixa e os casos de borda do cálculo
+em colunas: pontos médios x,xx5 no arredondamento (_round2), resto de
+exatamente 6h00 para o PA (_PA_LIMIAR_US), ADE NaN e viagens inválidas com
+estrito=False.
+
+Uso: python test_diarias_lote.py (ou pytest)
+"""
+
+import random
+from dataclasses import fields
+from datetime import datetime, timedelta
+
+import numpy as np
+
+import diaria_calculator as dc
+
+MUNICIPIOS = ["Belo Horizonte", "Betim", "Uberlândia", "Ouro Preto", "Teófilo Otoni", "Recife", "São Paulo"]
+GRADUACOES = list(dc.VALOR_DIA_POR_GRADUACAO) + ["1ºTen", "Ten-Cel", "Sd1ªCl."]
+
+
+def _viagens_aleatorias(n, seed=45):
+    rng = random.Random(seed)
+    viagens = []
+    for _ in range(n):
+        inicio = datetime(2025, 1, 1) + timedelta(seconds=rng.randrange(0, 365 * 86400))
+        duracao = rng.choice([
+            rng.randrange(1, 20 * 86400),
+            rng.randrange(21500, 21700) + 86400 * rng.randrange(0, 3),  # resto perto de 6h
+            rng.randrange(1, 86400),
+        ])
+        viagens.append(dict(
+            graduacao=rng.choice(GRADUACOES),
+            municipio=rng.choice(MUNICIPIOS),
+            outro_estado=rng.random() < 0.2,
+            inicio=inicio,
+            fim=inicio + timedelta(seconds=duracao),
+            quinquenios=rng.randrange(0, 8),
+            ade=rng.choice([None, rng.randrange(0, 100) / 1.0, rng.random() * 90]),
+            trintenario=rng.choice(list(dc.TRINTENARIOS) + ["qualquer"]),
+            pousada=rng.random() < 0.5,
+            ajuda_custo=rng.choice([74.98, 0.0, round(rng.random() * 100, 2)]),
+        ))
+    return viagens
+
+
+def _lote(viagens, estrito=True):
+    col = {k: [v[k] for v in viagens] for k in viagens[0]}
+    fora = col.pop("outro_estado", False)
+    localidade = dc.classificar_destinos(col.pop("municipio"), fora, datas=col["inicio"])
+    col["ade"] = [np.nan if a is None else a for a in col["ade"]]
+    return dc.calcular_diarias_lote(localidade=localidade, estrito=estrito, **col)
+
+
+def _comparar(viagens, res):
+    for i, v in enumerate(viagens):
+        if i in res.erros:
+            continue
+        esperado = dc.calcular_diarias(**v)
+        obtido = res.linha(i)
+        for campo in fields(dc.Resultado):
+            a, b = getattr(obtido, campo.name), getattr(esperado, campo.name)
+            assert a == b and type(a) is type(b), (i, v, campo.name, a, b)
+
+
+def test_amostra_aleatoria():
+    viagens = _viagens_aleatorias(3000)
+    res = _lote(viagens)
+    assert not res.erros
+    _comparar(viagens, res)
+
+
+def test_round2_pontos_medios():
+    centavos = np.arange(0, 200000)
+    x = np.concatenate([
+        (2 * centavos + 1) / 200.0,  # x,xx5 (k/2 com k em centavos ímpares)
+        np.nextafter((2 * centavos + 1) / 200.0, 0),
+        np.nextafter((2 * centavos + 1) / 200.0, np.inf),
+        np.array([0.125, 0.375, 1.005, 2.675, 509.225, 1048.115, 254.61 / 2, 470.0 * 1.1]),
+    ])
+    obtido = dc._round2(np, x)
+    esperado = np.array([round(float(v), 2) for v in x])
+    assert np.array_equal(obtido, esperado), x[obtido != esperado][:5]
+
+
+def test_pa_exatamente_seis_horas():
+    base = datetime(2025, 3, 10, 8, 0)
+    restos = [
+        timedelta(hours=6),
+        timedelta(hours=6) - timedelta(microseconds=1),  # arredonda para 6,00h
+        timedelta(hours=5, minutes=59, seconds=42),  # round(5.995, 2)
+        timedelta(hours=5, minutes=59, seconds=41),
+        timedelta(hours=5, minutes=59, seconds=59),
+        timedelta(hours=6, seconds=1),
+    ]
+    viagens = [
+        dict(graduacao="CAP", municipio="Betim", inicio=base, fim=base + timedelta(days=d) + r)
+        for d in (0, 2) for r in restos
+    ]
+    col = {k: [v[k] for v in viagens] for k in ("graduacao", "inicio", "fim")}
+    res = dc.calcular_diarias_lote(localidade="Município Especial", **col)
+    for i, v in enumerate(viagens):
+        assert int(res.pa[i]) == dc.calcular_di_pa_planilha(v["inicio"], v["fim"])[1], v
+    assert int(res.pa[0]) == 1 and int(res.pa[3]) == 0  # 6h00 conta; 5h59m41s (5,99h) não
+    assert dc._PA_LIMIAR_US <= 6 * 3600 * 10**6
+
+
+def test_ade_nan_usa_quinquenios():
+    base = datetime(2025, 5, 5, 7, 30)
+    viagens = [
+        dict(graduacao="1SGT", municipio="Uberlândia", inicio=base, fim=base + timedelta(days=2, hours=7),
+             quinquenios=q, ade=a)
+        for q in (0, 3, 7) for a in (None, 0.0, 35.0)
+    ]
+    res = _lote(viagens)
+    _comparar(viagens, res)
+    assert res.g[3] == 3.0 and res.g[4] == 0.0  # ADE NaN -> quinquênios; ADE 0 -> 0
+
+
+def test_invalidas_com_estrito_falso():
+    viagens = _viagens_aleatorias(50, seed=7)
+    inicio = viagens[3]["inicio"]
+    viagens[3] = dict(viagens[3], fim=inicio)  # fim == inicio
+    viagens[10] = dict(viagens[10], graduacao="XYZ")
+    viagens[20] = dict(viagens[20], fim=viagens[20]["inicio"] - timedelta(hours=1))
+    res = _lote(viagens, estrito=False)
+    assert set(res.erros) == {3, 10, 20}, res.erros
+    assert "fim deve ser maior" in res.erros[3] and "graduação" in res.erros[10]
+    assert all(np.isnan(res.total[i]) for i in res.erros)
+    _comparar(viagens, res)
+
+    col = {"graduacao": ["CAP", "CAP"], "inicio": [inicio] * 2, "fim": [inicio + timedelta(days=1)] * 2}
+    res = dc.calcular_diarias_lote(localidade=["Capital", "Lua"], estrito=False, **col)
+    assert list(res.erros) == [1] and "localidade" in res.erros[1]
+    try:
+        dc.calcular_diarias_lote(localidade=["Capital", "Lua"], **col)
+    except KeyError:
+        pass
+    else:
+        raise AssertionError("estrito=True deveria levantar KeyError")
+
+
+if __name__ == "__main__":
+    for nome, teste in list(globals().items()):
+        if nome.startswith("test_"):
+            teste()
+            print(f"ok  {nome}")
@@ -0,0 +1,89 @@
+"""
+Posto/graduação dos relatórios de viagem do SEI -> chave de VALOR_DIA_POR_GRADUACAO.
+
+Os valores de "posto_grad" vêm de sei_automate.extrair_militares_relatorio,
+aplicado a linhas no formato da tabela do relatório.
+
+Uso: python test_graduacao_sei.py (ou pytest)
+"""
+
+from diaria_calculator import VALOR_DIA_POR_GRADUACAO
+from diarias_itinerario import calcular_itinerario_militar, graduacao_sei
+
+LINHA_RELATORIO = (
+    "{seq} BOA 123.456.789-00 167.493-6 João Paulo do Carmo Souza {posto} - 30 "
+    "Belo Horizonte - MG Teófilo Otoni 450 km 1 - - Banco do Brasil - 001 1234 56789"
+)
+
+# posto como aparece no relatório -> graduação esperada (None = ambíguo, pede graduacao=)
+POSTOS = {
+    "Coronel": "CEL",
+    "Tenente-Coronel": "TENCEL",
+    "Tenente Coronel": "TENCEL",
+    "Major": "MAJ",
+    "Capitão": "CAP",
+    "1° Tenente": "1TEN",
+    "2º Tenente": "2TEN",
+    "Aspirante a Oficial": "ASP",
+    "Subtenente": "SUBTEN",
+    "1° Sargento": "1SGT",
+    "2º Sargento": "2SGT",
+    "3° Sargento": "3SGT",
+    "Cabo": "CB",
+    "Soldado 1ª Classe": "SD1CL",
+    "Soldado de 2ª Classe": "SD2CL",
+    "Tenente": None,
+    "Sargento": None,
+    "Soldado": None,
+}
+
+DETALHES = {
+    "01": {"l_partida": "Belo Horizonte", "d_partida": "23/12/2025", "h_partida": "10:01",
+           "l_destino": "Teófilo Otoni", "d_destino": "23/12/2025", "h_destino": "11:24"},
+    "02": {"l_partida": "Teófilo Otoni", "d_partida": "23/12/2025", "h_partida": "17:00",
+           "l_destino": "Belo Horizonte", "d_destino": "23/12/2025", "h_destino": "18:34"},
+}
+
+
+def _posto_grad_do_relatorio():
+    from sei_automate import extrair_militares_relatorio
+
+    texto = "\n".join(LINHA_RELATORIO.format(seq=f"{i:02d}", posto=p) for i, p in enumerate(POSTOS, start=1))
+    militares = extrair_militares_relatorio(texto)
+    return [militares[f"{i:02d}"]["posto_grad"] for i in range(1, len(POSTOS) + 1)]
+
+
+def test_relatorio_traz_ordinal_e_classe():
+    assert _posto_grad_do_relatorio() == list(POSTOS)
+
+
+def test_graduacao_sei_com_postos_do_relatorio():
+    for posto, esperada in zip(_posto_grad_do_relatorio(), POSTOS.values()):
+        if esperada is None:
+            try:
+                graduacao_sei(posto)
+            except ValueError as e:
+                assert "informe a graduação" in str(e), posto
+            else:
+                raise AssertionError(f"{posto!r} deveria pedir a graduação explícita")
+        else:
+            assert graduacao_sei(posto) == esperada, posto
+            assert esperada in VALOR_DIA_POR_GRADUACAO, posto
+
+
+def test_itinerario_com_posto_ambiguo():
+    militar = {"numero": "167.493-6", "posto_grad": "Sargento", "details": DETALHES}
+    try:
+        calcular_itinerario_militar(militar)
+    except ValueError as e:
+        assert "167.493-6" in str(e) and "1SGT" in str(e)
+    else:
+        raise AssertionError("posto ambíguo deveria levantar ValueError")
+    assert calcular_itinerario_militar(militar, graduacao="2SGT").total > 0
+
+
+if __name__ == "__main__":
+    for nome, teste in list(globals().items()):
+        if nome.startswith("test_"):
+            teste()
+            print(f"ok  {nome}")
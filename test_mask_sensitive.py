@@ -0,0 +1,64 @@
+"""
+Máscara de dados pessoais das telas (pdf_generator.mask_sensitive): fixa
+exatamente quais formas são mascaradas e quais ficam como estão.
+
+Uso: python test_mask_sensitive.py (ou pytest)
+"""
+
+from pdf_generator import mask_sensitive, mask_sensitive_batch
+
+MASCARADOS = {
+    # CPF e PIS/PASEP
+    "NUMERO CPF ........:087.617.246-02": "NUMERO CPF ........:***.***.***-**",
+    "NUMERO PIS/PASEP:1292809110-8 DATA": "NUMERO PIS/PASEP:**********-* DATA",
+    # RG: 1 a 3 letras, hífen opcional, 4 a 10 dígitos (mantém os 2 finais)
+    "REGISTRO GERAL :MG-19674285 ": "REGISTRO GERAL :MG-******85 ",
+    "REGISTRO GERAL :MG19674285": "REGISTRO GERAL :MG-******85",
+    "RG M-12345 ": "RG M-******45 ",
+    "RG M-1234": "RG M-******34",
+    "RG SP-123456789": "RG SP-******89",
+    "RG ABC-1234567890": "RG ABC-******90",
+    "RG X12345": "RG X-******45",
+    # id de terminal fora do cabeçalho do SIGP continua mascarado
+    "TERMINAL S142924": "TERMINAL S-******24",
+    # conta bancária
+    "SHOPPICONTA :12725   5D": "SHOPPICONTA : ****   5D",
+    "conta: 998877": "conta: ****",
+}
+
+INALTERADOS = [
+    # id do terminal no cabeçalho do SIGP
+    "                  SIGP  S142924        CARGOS/FU",
+    "SIGP S1",
+    # não são documentos
+    "ORGAO EMISSOR R.G.:SSP-MG",
+    "SIGP    10:20:03",
+    "SERVIDOR:142924-0-CAP     -QOBM",
+    "PF12- SAIR",
+    "RG MG-123",          # menos de 4 dígitos
+    "RG ABCD-12345",      # mais de 3 letras
+    "RG MG-12345678901",  # mais de 10 dígitos
+    "CODIGO CARGO .....:828",
+]
+
+
+def test_formas_mascaradas():
+    for original, esperado in MASCARADOS.items():
+        assert mask_sensitive(original) == esperado, (original, mask_sensitive(original))
+
+
+def test_formas_inalteradas():
+    for texto in INALTERADOS:
+        assert mask_sensitive(texto) == texto, (texto, mask_sensitive(texto))
+
+
+def test_lote_igual_a_uma_a_uma():
+    textos = list(MASCARADOS) + INALTERADOS
+    assert mask_sensitive_batch(textos) == [mask_sensitive(t) for t in textos]
+
+
+if __name__ == "__main__":
+    for nome, teste in list(globals().items()):
+        if nome.startswith("test_"):
+            teste()
+            print(f"ok  {nome}")
@@ -0,0 +1,74 @@
+"""
+Índice de municípios (municipios.IndiceMunicipios) e classificação do destino
+(diaria_calculator.classificar_destino / classificar_destinos).
+
+Uso: python test_municipios.py (ou pytest)
+"""
+
+from diaria_calculator import (
+    INDICE_MUNICIPIOS,
+    LOCALIDADES,
+    TABELA_EMBUTIDA,
+    classificar_destino,
+    classificar_destinos,
+)
+from municipios import dobrar, uf
+
+ESPECIAIS = TABELA_EMBUTIDA.municipios_especiais_mg
+
+
+def test_indice_exato_apelido_e_erro_de_digitacao():
+    casos = {
+        # exato (acento, caixa, espaços)
+        "Uberlândia": "uberlandia",
+        "  TEÓFILO   OTONI ": "teofilo otoni",
+        "Olhos-d'Água": "olhos dagua",
+        # apelidos
+        "BH": "belo horizonte",
+        "b. hte": "belo horizonte",
+        "JF": "juiz de fora",
+        # erros de digitação
+        "Uberlandai": "uberlandia",
+        "Teofilo Otôni": "teofilo otoni",
+        "Governador Valadres": "governador valadares",
+    }
+    for nome, chave in casos.items():
+        assert INDICE_MUNICIPIOS.resolver(nome) == chave, (nome, INDICE_MUNICIPIOS.resolver(nome))
+    assert INDICE_MUNICIPIOS.resolver("Xyzwvut") is None
+
+
+def test_municipio_real_nao_e_corrigido_para_vizinho():
+    assert INDICE_MUNICIPIOS.resolver("Congonhal") == "congonhal"
+    assert INDICE_MUNICIPIOS.resolver("Congonhas") == "congonhas"
+    assert classificar_destino("Congonhal", False, ESPECIAIS) == "Demais Municípios"
+    assert classificar_destino("Congonhas", False, ESPECIAIS) == "Município Especial"
+
+
+def test_sufixo_de_uf():
+    assert uf("Uberlândia/MG") == "MG" and uf("Vitória - ES") == "ES" and uf("Vitória (ES)") == "ES"
+    assert uf("Mariana") is None and uf("Belo Horizonte/XX") is None
+    assert dobrar("Teófilo Otoni/MG") == "teofilo otoni"
+    assert INDICE_MUNICIPIOS.resolver("Uberlândia/MG") == "uberlandia"
+
+    # UF de MG não muda nada
+    assert classificar_destino("Congonhal/MG", False, ESPECIAIS) == "Demais Municípios"
+    # UF de outro estado vale como outro_estado=True, mesmo com o nome de um município de MG
+    assert classificar_destino("Congonhal/SP", False, ESPECIAIS) == "Município Especial"
+    assert classificar_destino("Congonhal - SP", False, ESPECIAIS) == "Município Especial"
+    assert classificar_destino("Mariana/SP", False, ESPECIAIS) == classificar_destino("Mariana", True, ESPECIAIS)
+    assert classificar_destino("Recife/PE", False, ESPECIAIS) == "Capital"
+
+
+def test_classificar_destinos_igual_a_um_a_um():
+    municipios = ["Congonhal", "Congonhal/SP", "Congonhas", "BH", "Uberlandai", "Recife/PE", "Mariana/SP", "Xyzwvut"]
+    fora = [False, False, False, False, False, False, False, True]
+    codigos = classificar_destinos(municipios, fora, municipios_especiais_mg=ESPECIAIS)
+    esperados = [classificar_destino(m, f, ESPECIAIS) for m, f in zip(municipios, fora)]
+    assert [LOCALIDADES[c] for c in codigos] == esperados
+
+
+if __name__ == "__main__":
+    for nome, teste in list(globals().items()):
+        if nome.startswith("test_"):
+            teste()
+            print(f"ok  {nome}")
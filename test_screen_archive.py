@@ -0,0 +1,79 @@
+"""
+Arquivo de telas (.sgpa): abertura de arquivos ausentes/vazios e recuperação
+de um arquivo cortado no meio de um quadro (processo interrompido).
+
+Uso: python test_screen_archive.py (ou pytest)
+"""
+
+import os
+import tempfile
+from datetime import datetime, timedelta
+from pathlib import Path
+
+from screen_archive import ArquivoTelasError, ScreenArchive, ScreenArchiveWriter
+
+INICIO = datetime(2026, 2, 10, 9, 30)
+
+
+def _telas(i):
+    return {
+        "tela_1": f"SISTEMA GESTAO DE PESSOAS\nNS/BM: {1429240 + i}\nNOME: MILITAR {i}",
+        "tela_2": f"SISTEMA GESTAO DE PESSOAS\nPF1- HELP\nVALOR: {i},00",
+    }
+
+
+def _gravar(path, n):
+    with ScreenArchiveWriter(path) as arq:
+        for i in range(n):
+            arq.add(_telas(i), ns=str(1429240 + i), capturado_em=INICIO + timedelta(minutes=i))
+        return [e.offset for e in arq.entradas]
+
+
+def _espera_erro(path):
+    try:
+        ScreenArchive(path)
+    except ArquivoTelasError:
+        return
+    raise AssertionError(f"{path} deveria levantar ArquivoTelasError")
+
+
+def test_arquivo_ausente_ou_vazio():
+    with tempfile.TemporaryDirectory() as d:
+        _espera_erro(Path(d) / "nao_existe.sgpa")
+        vazio = Path(d) / "vazio.sgpa"
+        vazio.touch()
+        _espera_erro(vazio)
+        lixo = Path(d) / "lixo.sgpa"
+        lixo.write_bytes(b"nao e um sgpa")
+        _espera_erro(lixo)
+
+
+def test_recupera_quadros_integros_apos_corte():
+    with tempfile.TemporaryDirectory() as d:
+        path = Path(d) / "telas.sgpa"
+        offsets = _gravar(path, 5)
+        # corta no meio do payload do 4º registro: trailer e 5º registro somem
+        with open(path, "r+b") as f:
+            f.truncate(offsets[3] + 7)
+
+        with ScreenArchive(path) as arq:
+            assert len(arq) == 3
+            for i, captura in enumerate(arq):
+                assert captura.ns == str(1429240 + i)
+                assert captura.capturado_em == INICIO + timedelta(minutes=i)
+                assert captura.telas == _telas(i)
+
+        # o writer descarta só o quadro incompleto e continua acrescentando
+        with ScreenArchiveWriter(path) as arq:
+            arq.add(_telas(9), ns="1429249", capturado_em=INICIO)
+        with ScreenArchive(path) as arq:
+            assert [c.ns for c in arq] == ["1429240", "1429241", "1429242", "1429249"]
+            assert arq.ultima("1429249").telas == _telas(9)
+            assert os.path.getsize(path) > offsets[2]
+
+
+if __name__ == "__main__":
+    for nome, teste in list(globals().items()):
+        if nome.startswith("test_"):
+            teste()
+            print(f"ok  {nome}")
@@ -1,16 +1,22 @@
+import atexit
 import os
-import socket
 import re
 import logging
 import subprocess
 import random
 import time
+from pathlib import Path
 from dotenv import load_dotenv
 import pexpect
 from time import sleep
 
 # lib para PDF
 from pdf_generator import *
+from scriptport import ScriptPortClient
+from host_pool import HostPool
+from diarias_sigp import calcular_diarias_servidores
+from screen_archive import ArquivoTelasError, ScreenArchive, ScreenArchiveWriter
+from anexo_incremental import AnexoIncremental
 
 # Configuração de Logs
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
@@ -32,6 +38,24 @@ except ValueError:
     INTERVALO_TECLAS_MS = 50
 INTERVALO_TECLAS_SEC = INTERVALO_TECLAS_MS / 1000.0
 
+# Arquivo com as telas brutas capturadas (reprocessamento sem mainframe)
+ARQUIVO_TELAS = os.getenv('ARQUIVO_TELAS', './capturas/telas_sigp.sgpa')
+
+# Anexo consolidado, atualizado a cada extrato gerado por consultar_ns
+ARQUIVO_ANEXO = os.getenv('ARQUIVO_ANEXO', './saida_extratos/Anexo EXTRATO DB FU IP.pdf')
+
+# PDFs compactos (sem ASCII85, objetos deduplicados) para envio ao SEI; PDF_COMPACTO=0 desliga
+PDF_COMPACTO = os.getenv('PDF_COMPACTO', '1') != '0'
+
+# Pool de hosts do SIGP (SIGP_HOSTS=host1,host2:porta); padrão 192.168.2.1.
+# Criado na primeira sessão (get_host_pool), não no import
+HOST_POOL = None
+
+try:
+    TIMEOUT_CONEXAO_SEC = float(os.getenv('TIMEOUT_CONEXAO', '15'))
+except ValueError:
+    TIMEOUT_CONEXAO_SEC = 15.0
+
 
 def liberar_porta(porta):
     """Mata processos que estejam ocupando a porta especificada."""
@@ -54,40 +78,84 @@ def liberar_porta(porta):
     except Exception as e:
         logging.error(f"Erro ao liberar porta {porta}: {e}")
 
-def iniciar_c3270(host='192.168.2.1', porta=5000):
-    liberar_porta(porta)  # 🔪 Libera a porta antes de iniciar
-    
+def _spawn_c3270(alvo, porta):
     # Inicia o c3270 com scriptport ativado
     # Adicionado try/except para capturar falhas no spawn
     try:
-        child = pexpect.spawn(f'c3270 -scriptport {porta} {host}')
+        child = pexpect.spawn(f'c3270 -scriptport {porta} {alvo}')
         time.sleep(1) # Aguarda inicialização
         return child
     except Exception as e:
         logging.error(f"Erro ao iniciar c3270: {e}")
         return None
 
-def send_command(command, porta=5000):
-    """Envia um comando para o c3270 via socket."""
+def aguardar_conexao(porta=5000, timeout=None):
+    """Consulta a linha de status do scriptport até o c3270 conectar (ou estourar o tempo)."""
+    timeout = TIMEOUT_CONEXAO_SEC if timeout is None else timeout
+    limite = time.monotonic() + timeout
+    while time.monotonic() < limite:
+        try:
+            # Qualquer comando devolve a linha de status; o campo 4 indica a conexão
+            if ScriptPortClient(porta, timeout=2).execute("Ascii(0,0,1)").connected:
+                return True
+        except Exception:
+            pass  # scriptport ainda subindo
+        time.sleep(0.2)
+    return False
+
+def get_host_pool():
+    """Pool de hosts do processo, lido de SIGP_HOSTS na primeira chamada."""
+    global HOST_POOL
+    if HOST_POOL is None:
+        HOST_POOL = HostPool.from_env()
+    return HOST_POOL
+
+def iniciar_c3270(host=None, porta=5000, pool=None):
+    """
+    Abre o c3270. Com `host` informado conecta direto nele; sem `host` usa o
+    pool (SIGP_HOSTS), tentando os hosts em ordem até um conectar.
+    """
+    liberar_porta(porta)  # 🔪 Libera a porta antes de iniciar
+
+    if host:
+        return _spawn_c3270(host, porta)
+
+    pool = pool or get_host_pool()
+    for candidato in pool.candidatos():
+        child = _spawn_c3270(candidato.alvo_c3270, porta)
+        if child and aguardar_conexao(porta):
+            # Só limpa as falhas: o tempo de abrir a sessão (spawn + espera)
+            # não é comparável à latência de conexão TCP medida no health check
+            pool.registrar_sucesso(candidato)
+            logging.info(f"Sessão aberta em {candidato.alvo_c3270}")
+            return child
+
+        logging.warning(f"Host {candidato.alvo_c3270} não conectou, tentando o próximo...")
+        pool.registrar_falha(candidato)
+        fechar_c3270(child)
+        liberar_porta(porta)
+
+    logging.error("Nenhum host do SIGP disponível.")
+    return None
+
+def send_command_reply(command, porta=5000):
+    """Envia um comando para o c3270 via socket e devolve a resposta estruturada."""
     try:
-        with socket.create_connection(('localhost', porta), timeout=30) as sock:
-            sock.sendall((command + '\n').encode())
-            result = b""
-            while True:
-                data = sock.recv(4096)
-                if not data:
-                    break
-                result += data
-                # O c3270 retorna "data: ..." e termina com "ok" ou "error"
-                if b'ok' in data or b'error' in data:
-                    break
-            return result.decode(errors="ignore")
+        return ScriptPortClient(porta).execute(command)
     except ConnectionRefusedError:
         logging.error(f"Não foi possível conectar na porta {porta}. O c3270 está rodando?")
-        return ""
+        return None
     except Exception as e:
         logging.error(f"Erro no send_command: {e}")
+        return None
+
+def send_command(command, porta=5000):
+    """Envia um comando para o c3270 via socket."""
+    # O c3270 retorna linhas "data: ...", a linha de status e termina com "ok" ou "error"
+    reply = send_command_reply(command, porta)
+    if reply is None:
         return ""
+    return reply.raw()
 
 def wait_unlock(porta=5000):
     """Aguarda o desbloqueio do terminal (X System)."""
@@ -95,18 +163,16 @@ def wait_unlock(porta=5000):
 
 def get_tela_atual():
     """Captura e formata a tela atual do terminal."""
-    raw = send_command('Ascii()')
-    linhas = []
+    reply = send_command_reply('Ascii()')
+    if reply is None:
+        return ""
 
-    for line in raw.splitlines():
-        if line.startswith("data: "):
-            # Remove o prefixo "data: " e mantém o conteúdo da linha
-            linhas.append(line[6:].rstrip())
-        elif line == "data:":
-            # Linha vazia retornada pelo c3270
-            linhas.append("")
+    # Linhas "data:" já chegam sem o prefixo; mantém o conteúdo de cada linha
+    linhas = [linha.rstrip() for linha in reply.lines()]
 
-    return '\n'.join(linhas).strip()
+    # Só apara linhas vazias no início: os espaços à esquerda da primeira linha
+    # fazem parte da geometria de 80 colunas usada pelo screen_reflow
+    return '\n'.join(linhas).lstrip('\n').rstrip()
 
 def escrever(texto):
     """Envia uma string para ser digitada."""
@@ -210,8 +276,8 @@ def digitar_dados(usuario_login, senha_login, sistema_login):
     
     logging.warning("Não foi possível confirmar o login após várias tentativas.")
 
-def consultar_ns(ns_bm):
-    """Consulta IP, DB e FU para um único NS/BM. Abre c3270, faz login, consulta e fecha."""
+def capturar_telas(ns_bm):
+    """Captura as telas IP, DB e FU de um único NS/BM. Abre c3270, faz login, consulta e fecha."""
     # 1. Abre o emulador
     terminal = iniciar_c3270()
     if not terminal:
@@ -293,27 +359,148 @@ def consultar_ns(ns_bm):
 
     dicio_tela["Tela FU 2"] = get_tela_atual()
 
-    # Gerar PDF
-    generate_pdf_from_screens(dicio_tela, output_dir="./saida_extratos", nsbm_override=ns_bm)
-    logging.info(f"Processo para NS/BM {ns_bm} concluído. PDF gerado.")
-
     # Fecha o c3270 completamente
     fechar_c3270(terminal)
     time.sleep(1)
 
+    return dicio_tela
+
+
+_ARQUIVO_SESSAO = None
+
+
+def fechar_arquivo_telas():
+    """Grava o índice do arquivo de telas da sessão (chamado também na saída do processo)."""
+    global _ARQUIVO_SESSAO
+    if _ARQUIVO_SESSAO is not None:
+        arquivo, _ARQUIVO_SESSAO = _ARQUIVO_SESSAO, None
+        try:
+            arquivo.close()
+        except Exception as e:
+            logging.error(f"Erro ao fechar o arquivo de telas {ARQUIVO_TELAS}: {e}")
+
+
+atexit.register(fechar_arquivo_telas)
+
+
+def arquivar_telas(ns_bm, dicio_tela):
+    """
+    Guarda as telas brutas para reprocessamento offline. O arquivo fica
+    aberto durante a sessão (cada captura já vai para o disco no add) e o
+    índice é gravado uma vez, em fechar_arquivo_telas.
+    """
+    global _ARQUIVO_SESSAO
+    try:
+        if _ARQUIVO_SESSAO is None:
+            _ARQUIVO_SESSAO = ScreenArchiveWriter(ARQUIVO_TELAS)
+        _ARQUIVO_SESSAO.add(dicio_tela, ns=ns_bm)
+    except Exception as e:
+        logging.error(f"Erro ao arquivar telas do NS/BM {ns_bm}: {e}")
+
+
+def consultar_ns(ns_bm):
+    """Consulta IP, DB e FU para um único NS/BM e gera o PDF do extrato."""
+    dicio_tela = capturar_telas(ns_bm)
+    if not dicio_tela:
+        return None
+
+    arquivar_telas(ns_bm, dicio_tela)
+
+    # Gerar PDF
+    pdf = generate_pdf_from_screens(
+        dicio_tela, output_dir="./saida_extratos", nsbm_override=ns_bm, compact=PDF_COMPACTO
+    )
+    logging.info(f"Processo para NS/BM {ns_bm} concluído. PDF gerado.")
+
+    try:
+        situacao = AnexoIncremental(ARQUIVO_ANEXO).adicionar(ns_bm, pdf)
+        logging.info(f"Anexo: NS/BM {ns_bm} {situacao}.")
+    except Exception as e:
+        logging.error(f"Erro ao atualizar o Anexo com o NS/BM {ns_bm}: {e}")
+
     return True
 
 
+def regerar_extratos(lista_ns=None, output_dir="./saida_extratos", max_workers=None):
+    """
+    Regera os PDFs a partir das telas arquivadas (sem acessar o mainframe),
+    usando todos os núcleos. Sem lista_ns, regera a última captura de cada NS/BM.
+    """
+    try:
+        arquivo = ScreenArchive(ARQUIVO_TELAS)
+    except ArquivoTelasError as e:
+        logging.error(f"Não foi possível regerar os extratos: {e}")
+        return []
+    with arquivo:
+        lista_ns = lista_ns or arquivo.ns_disponiveis()
+        capturas = [(ns, arquivo.ultima(ns)) for ns in lista_ns]
+
+    faltando = [ns for ns, c in capturas if c is None]
+    for ns in faltando:
+        logging.error(f"NS/BM {ns} não encontrado em {ARQUIVO_TELAS}")
+    capturas = [(ns, c) for ns, c in capturas if c is not None]
+
+    pdfs = generate_pdfs_parallel(
+        [c.telas for _, c in capturas],
+        output_dir,
+        nsbm_overrides=[ns for ns, _ in capturas],
+        max_workers=max_workers,
+        compact=PDF_COMPACTO,
+    )
+    logging.info(f"{len(pdfs)} extratos regerados em {output_dir}")
+    return pdfs
+
+
 def initialize_main(lista_ns):
-    for ns in lista_ns:
-        resultado = consultar_ns(ns)
-        if not resultado:
-            logging.error(f"Falha ao processar NS/BM: {ns}")
-        time.sleep(1)  # Pausa entre sessões
-    
-    # Ao final de todos, mescla os PDFs
-    logging.info("Unificando PDFs gerados...")
-    merge_pdfs_in_folder("./saida_extratos", "Anexo EXTRATO DB FU IP.pdf")
+    capturas = []
+    try:
+        for ns in lista_ns:
+            dicio_tela = capturar_telas(ns)
+            if not dicio_tela:
+                logging.error(f"Falha ao processar NS/BM: {ns}")
+            else:
+                arquivar_telas(ns, dicio_tela)
+                capturas.append((ns, dicio_tela))
+            time.sleep(1)  # Pausa entre sessões
+    finally:
+        fechar_arquivo_telas()
+
+    if not capturas:
+        logging.error("Nenhum extrato capturado.")
+        return
+
+    # Ao final de todos, gera o Anexo num único PDF (uma seção por NS/BM)
+    logging.info("Gerando Anexo unificado...")
+    # O manifesto antigo descreve o Anexo que vai ser sobrescrito: sai antes,
+    # para que uma falha no adotar não deixe páginas erradas registradas
+    AnexoIncremental.invalidar(ARQUIVO_ANEXO)
+    anexo = generate_pdf_batch(
+        [telas for _, telas in capturas],
+        ARQUIVO_ANEXO,
+        nsbm_overrides=[ns for ns, _ in capturas],
+        compact=PDF_COMPACTO,
+    )
+    logging.info(f"Anexo gerado: {anexo} ({anexo.stat().st_size / 1024:.0f} KiB)")
+
+    # Manifesto para que consultas posteriores (consultar_ns) atualizem o Anexo
+    try:
+        AnexoIncremental.adotar(anexo, [ns for ns, _ in capturas])
+    except Exception as e:
+        logging.error(
+            f"Erro ao criar o manifesto do Anexo {anexo}: {e}. "
+            "As próximas consultas não vão atualizar o Anexo até ele ser regerado."
+        )
+
+def calcular_diarias_lista(viagens):
+    """
+    Calcula as diárias de uma lista de viagens ({"ns": ..., "municipio": ..., "inicio": ..., "fim": ...}),
+    capturando no SIGP graduação, quinquênios, ADE e trintenário de cada servidor.
+    """
+    resultados = calcular_diarias_servidores(viagens, capturar=capturar_telas)
+    for r in resultados:
+        if r.erro:
+            logging.error(f"Falha no cálculo de diárias do NS/BM {r.ns}: {r.erro}")
+    return resultados
 
 if __name__ == "__main__":
     ns_bm = ["1429240", "1363621"]